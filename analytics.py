@@ -0,0 +1,255 @@
+"""
+Utilization analytics over dense per-day arrays.
+
+Booked test slots and effective capacity are laid out per series
+(equipment or category) and day: bookings and capacity segments are added
+to difference arrays (two updates each) and turned into daily counts with
+one prefix sum per series, then summed into day, week or month periods.
+Results are cached per data version, so repeated dashboard loads cost
+nothing until the next write.
+
+Functions:
+- period_offsets: Start offsets of day/week/month periods in a window
+- compute_utilization: Aggregated utilization series from booking rows
+- get_utilization: Same for the database, cached per data version
+"""
+
+import bisect
+import datetime
+import logging
+import threading
+from collections import OrderedDict
+from itertools import accumulate
+from typing import Dict, List, Any, Iterable, Optional, Tuple
+from config import ANALYTICS_CACHE_SIZE
+from db import get_db_connection, get_data_version, get_reference_data, ReferenceData
+from occupancy import base_name_of
+from utils import reference_capacity_segments
+
+logger = logging.getLogger(__name__)
+
+GRANULARITIES = ('day', 'week', 'month')
+GROUPS = ('equipment', 'category')
+
+
+def period_offsets(start: datetime.date, end: datetime.date, granularity: str) -> List[int]:
+    """
+    Day offsets (from start) at which periods begin.
+
+    Weeks start on Monday and months on the 1st; the first period
+    always starts at offset 0, so edge periods may be partial.
+
+    Args:
+        start: First day of the window
+        end: Last day of the window
+        granularity: 'day', 'week' or 'month'
+
+    Returns:
+        List[int]: Ascending offsets, first is 0
+    """
+    days = (end - start).days + 1
+    if granularity == 'day':
+        return list(range(days))
+    offsets = [0]
+    for offset in range(1, days):
+        day = start + datetime.timedelta(days=offset)
+        if (granularity == 'week' and day.weekday() == 0) or (granularity == 'month' and day.day == 1):
+            offsets.append(offset)
+    return offsets
+
+
+def _period_sums(diff: List[int], bounds: List[int]) -> List[int]:
+    """
+    Turn a difference array into per-period sums.
+
+    The first prefix sum gives daily values, the second cumulative totals,
+    so each period is one subtraction (both prefix sums run in C).
+    """
+    days = bounds[-1]
+    daily = list(accumulate(diff[:days]))
+    if len(bounds) == days + 1:
+        return daily  # One period per day
+    totals = list(accumulate(daily, initial=0))
+    return [totals[last] - totals[first] for first, last in zip(bounds, bounds[1:])]
+
+
+def _parse_offset(day: str, first_ordinal: int, memo: Dict[str, Optional[int]]) -> Optional[int]:
+    """Day offset of an ISO date from first_ordinal (None if invalid), memoized."""
+    if day in memo:
+        return memo[day]
+    try:
+        offset = datetime.date.fromisoformat(day).toordinal() - first_ordinal
+    except (TypeError, ValueError):
+        offset = None
+    memo[day] = offset
+    return offset
+
+
+def _add_overlap(sums: List[int], bounds: List[int], first: int, last: int) -> None:
+    """Add the number of days of [first, last] that fall into each period."""
+    period = bisect.bisect_right(bounds, first) - 1
+    while first <= last:
+        period_last = bounds[period + 1] - 1
+        sums[period] += min(last, period_last) - first + 1
+        first = period_last + 1
+        period += 1
+
+
+def compute_utilization(start: datetime.date, end: datetime.date,
+                        bookings: Iterable[Tuple[str, Optional[str], str, str]],
+                        reference: ReferenceData, granularity: str = 'week',
+                        group: str = 'equipment') -> Dict[str, Any]:
+    """
+    Compute booked slots, capacity and utilization per period.
+
+    Args:
+        start: First day of the window
+        end: Last day of the window
+        bookings: Non-blocker bookings as (equipment_id, project_name,
+            start_date, end_date); bookings outside the window are ignored
+        reference: Equipment and capacity overrides (db.get_reference_data)
+        granularity: 'day', 'week' or 'month'
+        group: 'equipment' or 'category'
+
+    Returns:
+        Dict with 'periods' (ISO start of each period) and 'series', one per
+        equipment or category: capacity, booked and utilization lists
+        (booked / capacity, None where capacity is 0) and booked slots
+        split by project ('' for bookings without project)
+    """
+    days = (end - start).days + 1
+    first_ordinal = start.toordinal()
+    bounds = period_offsets(start, end, granularity) + [days]
+
+    # One difference array per series: +value on the first day, -value after the last
+    keys: Dict[str, Any] = {}
+    capacity_diffs: Dict[Any, List[int]] = {}
+    # Capacity from the snapshot passed in: one reference version per result
+    for name, equipment in reference.equipment.items():
+        segments = reference_capacity_segments(reference, name, first_ordinal, end.toordinal())
+        if segments is None:
+            continue
+        key = keys[name] = name if group == 'equipment' else equipment['category']
+        diff = capacity_diffs.get(key)
+        if diff is None:
+            diff = capacity_diffs[key] = [0] * (days + 1)
+        for segment_first, segment_last, max_tests in segments:
+            diff[segment_first - first_ordinal] += max_tests
+            diff[segment_last - first_ordinal + 1] -= max_tests
+
+    # Project split is sparse (few bookings per project and series), so for
+    # week/month each booking's overlap is added to period sums directly;
+    # daily periods keep difference arrays like the totals
+    periods = len(bounds) - 1
+    daily = periods == days
+    booked_diffs: Dict[Any, List[int]] = {key: [0] * (days + 1) for key in capacity_diffs}
+    project_sums: Dict[Any, Dict[str, List[int]]] = {key: {} for key in capacity_diffs}
+    # Few distinct equipment_ids and days: resolve each only once
+    key_of: Dict[str, Any] = {}
+    offset_of: Dict[str, Optional[int]] = {}
+    for equipment_id, project_name, start_date, end_date in bookings:
+        key = key_of.get(equipment_id, keys)
+        if key is keys:
+            key = key_of[equipment_id] = keys.get(base_name_of(equipment_id or ''))
+        if key is None:
+            continue  # Unknown equipment
+        first = _parse_offset(start_date, first_ordinal, offset_of)
+        last = _parse_offset(end_date, first_ordinal, offset_of)
+        if first is None or last is None:
+            continue
+        first = max(first, 0)
+        last = min(last, days - 1)
+        if first > last:
+            continue
+        booked = booked_diffs[key]
+        booked[first] += 1
+        booked[last + 1] -= 1
+        projects = project_sums[key]
+        sums = projects.get(project_name or '')
+        if sums is None:
+            sums = projects[project_name or ''] = [0] * (days + 1 if daily else periods)
+        if daily:
+            sums[first] += 1
+            sums[last + 1] -= 1
+        else:
+            _add_overlap(sums, bounds, first, last)
+
+    series = []
+    for key in sorted(capacity_diffs, key=lambda item: (item is None, item or '')):
+        capacity = _period_sums(capacity_diffs[key], bounds)
+        booked = _period_sums(booked_diffs[key], bounds)
+        row = {
+            'key': key,
+            'capacity': capacity,
+            'booked': booked,
+            'utilization': [round(slots / limit, 4) if limit else None
+                            for slots, limit in zip(booked, capacity)],
+            'by_project': {project: _period_sums(sums, bounds) if daily else sums
+                           for project, sums in sorted(project_sums[key].items())}
+        }
+        if group == 'equipment':
+            row['category'] = reference.equipment[key]['category']
+        series.append(row)
+
+    return {
+        'periods': [(start + datetime.timedelta(days=offset)).isoformat() for offset in bounds[:-1]],
+        'series': series
+    }
+
+
+_cache: 'OrderedDict[Tuple[Any, ...], Dict[str, Any]]' = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def get_utilization(start: datetime.date, end: datetime.date,
+                    granularity: str = 'week', group: str = 'equipment') -> Dict[str, Any]:
+    """
+    Utilization series for the current data, cached per data version.
+
+    Args:
+        start: First day of the window
+        end: Last day of the window
+        granularity: 'day', 'week' or 'month'
+        group: 'equipment' or 'category'
+
+    Returns:
+        Result of compute_utilization plus 'version', 'from', 'to',
+        'granularity' and 'group' (shared, do not modify)
+    """
+    # Version first: data read afterwards is at least as new
+    version = get_data_version()
+    key = (version, start, end, granularity, group)
+    with _cache_lock:
+        result = _cache.get(key)
+        if result is not None:
+            _cache.move_to_end(key)
+            return result
+
+    reference = get_reference_data()
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.row_factory = None  # Plain tuples, faster for bulk reads
+        rows = cursor.execute('''
+            SELECT equipment_id, project_name, start_date, end_date
+            FROM bookings
+            WHERE NOT COALESCE(is_blocker, 0) AND end_date >= ? AND start_date <= ?
+        ''', (start.isoformat(), end.isoformat())).fetchall()
+    result = compute_utilization(start, end, rows, reference, granularity, group)
+    result.update({
+        'version': version,
+        'from': start.isoformat(),
+        'to': end.isoformat(),
+        'granularity': granularity,
+        'group': group
+    })
+    logger.info(f"Computed utilization v{version} {start}..{end} by {granularity}/{group} "
+                f"from {len(rows)} bookings")
+
+    with _cache_lock:
+        # Older versions can never be requested again
+        for stale in [cached for cached in _cache if cached[0] < version]:
+            del _cache[stale]
+        _cache[key] = result
+        while len(_cache) > ANALYTICS_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return result
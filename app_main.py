@@ -8,18 +8,41 @@ Author: Your Name
 Version: 2.0.0
 """
 
-from flask import Flask, render_template, jsonify
+from flask import Flask, render_template, jsonify, request, make_response
 from routes.bookings import bookings_bp
 from routes.projects import projects_bp
 from routes.equipment import equipment_bp
 from routes.equipment_mgmt import equipment_mgmt_bp
-from db import load_equipment_db, load_bookings_db, load_projects_db
-from config import APP_HOST, APP_PORT, APP_DEBUG
+from routes.sync import sync_bp
+from routes.availability import availability_bp
+from routes.analytics import analytics_bp
+from routes.export import export_bp
+from routes.metrics import metrics_bp
+from routes.profiling import profiling_bp
+from db import (
+    load_equipment_db, load_bookings_db, load_projects_db, load_booking_rows,
+    get_db_connection, get_data_version, get_reference_cache_stats
+)
+from db_init import create_tables
+from compression import body_cache, compress_response, negotiate_encoding
+from fast_json import encode_data, encode_data_columnar
+from layout import get_lanes
+from utils import parse_date_window
+from config import APP_HOST, APP_PORT, APP_DEBUG, FAST_JSON
 
 app = Flask(__name__)
 app.config['JSON_AS_ASCII'] = False  # Support for Czech characters in JSON
 
 
+def init_database() -> None:
+    """Create missing tables (and backfill derived ones) before serving requests."""
+    with get_db_connection() as conn:
+        create_tables(conn)
+
+
+init_database()
+
+
 @app.route('/')
 def index():
     """Render main application page."""
@@ -31,27 +54,100 @@ def get_all_data():
     """
     Get all application data (equipment, bookings, projects).
     
+    Query parameters:
+        - from: str (optional, YYYY-MM-DD) - only bookings ending on/after this day
+        - to: str (optional, YYYY-MM-DD) - only bookings starting on/before this day
+        - format: str (optional) - 'rows' (default) or 'columnar' (bookings as
+          dictionary-encoded parallel arrays, see fast_json.columnar_bookings)
+    
+    Each booking carries its 'lane' within the equipment row (layout.get_lanes,
+    computed once per data version), so clients only position the bars.
+    
+    The response carries the global data version as ETag (weak when
+    compressed). A request with a matching If-None-Match gets 304 Not
+    Modified without loading or serializing any data. The body of each
+    data version is built once and compressed once per content coding,
+    then served from the compression body cache.
+    
     Returns:
-        JSON response with equipment, bookings, and projects lists
+        JSON response with data version, equipment, bookings, and projects lists
     """
     try:
-        equipment = load_equipment_db()
-        bookings = load_bookings_db()
-        projects = load_projects_db()
-        return jsonify({
-            "equipment": equipment,
-            "bookings": bookings,
-            "projects": projects
-        })
+        date_from, date_to = parse_date_window(request.args.get('from'), request.args.get('to'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    data_format = request.args.get('format', 'rows')
+    if data_format not in ('rows', 'columnar'):
+        return jsonify({"error": f"Neplatný formát dat: {data_format} (použijte rows nebo columnar)"}), 400
+    
+    try:
+        # Read version before data: a concurrent write can only make the
+        # ETag older than the body, which forces a refetch next time
+        version = get_data_version()
+        etag = f"data-{version}"
+        encoding = negotiate_encoding(request)
+        if request.if_none_match.contains_weak(etag):
+            response = make_response('', 304)
+        else:
+            def build_body() -> bytes:
+                lanes = get_lanes(date_from, date_to)
+                if data_format == 'columnar':
+                    return encode_data_columnar(version, load_equipment_db(),
+                                                load_booking_rows(date_from, date_to), load_projects_db(),
+                                                lanes=lanes)
+                if FAST_JSON:
+                    return encode_data(version, load_equipment_db(),
+                                       load_booking_rows(date_from, date_to), load_projects_db(),
+                                       lanes=lanes)
+                bookings = load_bookings_db(date_from, date_to)
+                for booking in bookings:
+                    booking['lane'] = lanes.get(booking['id'])
+                return jsonify({
+                    "version": version,
+                    "equipment": load_equipment_db(),
+                    "bookings": bookings,
+                    "projects": load_projects_db()
+                }).get_data()
+            
+            body = body_cache.get(request.full_path, etag, encoding, build_body)
+            response = app.response_class(body, mimetype='application/json')
+            if encoding:
+                response.headers['Content-Encoding'] = encoding
+        response.set_etag(etag, weak=encoding is not None)
+        response.vary.add('Accept-Encoding')
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
     except Exception as e:
         return jsonify({"error": f"Chyba při načítání dat: {str(e)}"}), 500
 
+@app.route('/api/cache/stats')
+def get_cache_stats():
+    """
+    Get hit/miss counters of the in-process caches (this process only).
+    
+    Returns:
+        JSON response with reference data and compressed body cache statistics
+    """
+    return jsonify({"reference": get_reference_cache_stats(), "compression": body_cache.stats()})
+
 # Register blueprints
 app.register_blueprint(bookings_bp)
 app.register_blueprint(projects_bp)
 app.register_blueprint(equipment_bp)
 app.register_blueprint(equipment_mgmt_bp)
+app.register_blueprint(sync_bp)
+app.register_blueprint(availability_bp)
+app.register_blueprint(analytics_bp)
+app.register_blueprint(export_bp)
+# Request timing hooks; registered before compress_response so they run after it
+app.register_blueprint(metrics_bp)
+# After metrics: its hooks run closest to the view
+app.register_blueprint(profiling_bp)
+
+# gzip/Brotli for API responses and static assets (see compression.py)
+app.after_request(compress_response)
 
 
 if __name__ == '__main__':
+    # Development server only; production: wsgi.py / gunicorn.conf.py
     app.run(host=APP_HOST, port=APP_PORT, debug=APP_DEBUG)
\ No newline at end of file
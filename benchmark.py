@@ -0,0 +1,339 @@
+"""
+Benchmarks for Booking Planner.
+
+Every benchmark runs against a fresh temporary database filled with
+synthetic data, so results do not depend on (or touch) the real database.
+
+Usage:
+    python benchmark.py requests [--threads 8] [--seconds 5]
+    python benchmark.py stress [--requests 500] [--threads 50]
+    python benchmark.py analytics [--equipment 200] [--years 5]
+    python benchmark.py serialize [--sizes 10000 100000]
+"""
+
+import argparse
+import datetime
+import http.client
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List
+
+# Must be set before the app (and config) is imported
+os.environ.setdefault('BOOKING_PLANNER_DB', os.path.join(tempfile.mkdtemp(), 'benchmark.db'))
+
+from config import DB_PATH  # noqa: E402
+from db import rebuild_daily_load  # noqa: E402
+from db_init import create_tables  # noqa: E402
+
+
+def seed_database(equipment_count: int, booking_count: int, years: int = 1,
+                  start: datetime.date = datetime.date(2025, 1, 1)) -> List[str]:
+    """
+    Fill the benchmark database with synthetic equipment and bookings.
+    
+    Args:
+        equipment_count: Number of equipment items
+        booking_count: Number of bookings spread over the period
+        years: Length of the period in years
+        start: First day of the period
+        
+    Returns:
+        List[str]: Equipment names
+    """
+    rng = random.Random(42)
+    conn = sqlite3.connect(DB_PATH)
+    create_tables(conn)
+    names = [f'BENCH-{i:03d}' for i in range(equipment_count)]
+    conn.executemany('INSERT OR REPLACE INTO equipment (name, category, max_tests, sides, status) VALUES (?, ?, ?, 1, ?)',
+                     [(name, f'Kategorie {i % 5}', rng.randint(2, 6), 'active') for i, name in enumerate(names)])
+    projects = [f'Projekt {i}' for i in range(10)]
+    conn.executemany('INSERT OR REPLACE INTO projects (name, color, textColor, active) VALUES (?, ?, ?, 1)',
+                     [(name, f'#{rng.randint(0, 0xFFFFFF):06x}', '#ffffff') for name in projects])
+    
+    rows = []
+    span = 365 * years
+    for i in range(booking_count):
+        first = start + datetime.timedelta(days=rng.randrange(span))
+        last = first + datetime.timedelta(days=rng.randint(0, 20))
+        project = rng.choice(projects)
+        rows.append((f'Benchmark {i}', f'{rng.randint(0, 999999):06d}', first.isoformat(), last.isoformat(),
+                     rng.choice(names), project, '#4a90e2', '', int(rng.random() < 0.1),
+                     json.dumps({'bold': rng.random() < 0.5})))
+    conn.executemany('''INSERT INTO bookings (description, tma_number, start_date, end_date, equipment_id,
+                        project_name, project_color, note, is_blocker, text_style)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''', rows)
+    conn.commit()
+    rebuild_daily_load(conn)
+    conn.close()
+    return names
+
+
+def start_server():
+    """Start the app on a random local port in a background thread."""
+    from werkzeug.serving import make_server
+    from app_main import app
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run_for(seconds: float, threads: int, worker: Callable[[http.client.HTTPConnection, random.Random], bool],
+            port: int) -> Dict[str, float]:
+    """
+    Run a request worker in parallel threads for a fixed time.
+    
+    Args:
+        seconds: Duration of the run
+        threads: Number of client threads
+        worker: Performs one request, returns True on success
+        port: Server port
+        
+    Returns:
+        Dict with total requests, errors and requests per second
+    """
+    deadline = time.perf_counter() + seconds
+    counts = [0] * threads
+    errors = [0] * threads
+    
+    def loop(index: int) -> None:
+        rng = random.Random(index)
+        conn = http.client.HTTPConnection('127.0.0.1', port)
+        while time.perf_counter() < deadline:
+            try:
+                ok = worker(conn, rng)
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                conn = http.client.HTTPConnection('127.0.0.1', port)
+                ok = False
+            counts[index] += 1
+            errors[index] += 0 if ok else 1
+        conn.close()
+    
+    started = time.perf_counter()
+    pool = [threading.Thread(target=loop, args=(i,)) for i in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    total = sum(counts)
+    return {'requests': total, 'errors': sum(errors), 'rps': total / elapsed}
+
+
+def bench_requests(args: argparse.Namespace) -> None:
+    """Measure req/s of reads, writes and a mixed workload."""
+    names = seed_database(args.equipment, args.bookings)
+    server = start_server()
+    port = server.server_port
+    
+    def read(conn, rng):
+        conn.request('GET', '/api/data?from=2025-01-01&to=2025-12-31')
+        response = conn.getresponse()
+        response.read()
+        return response.status == 200
+    
+    def read_day(conn, rng):
+        day = (datetime.date(2025, 1, 1) + datetime.timedelta(days=rng.randrange(365))).isoformat()
+        conn.request('GET', f'/api/bookings?from={day}&to={day}')
+        response = conn.getresponse()
+        response.read()
+        return response.status == 200
+    
+    def write(conn, rng):
+        first = datetime.date(2026, 1, 1) + datetime.timedelta(days=rng.randrange(365))
+        body = json.dumps({
+            'description': 'Benchmark write',
+            'equipment_id': rng.choice(names),
+            'start_date': first.isoformat(),
+            'end_date': (first + datetime.timedelta(days=rng.randint(0, 5))).isoformat(),
+            'is_blocker': rng.random() < 0.5
+        })
+        conn.request('POST', '/api/bookings', body, {'Content-Type': 'application/json'})
+        response = conn.getresponse()
+        response.read()
+        return response.status in (201, 409)
+    
+    def mixed(conn, rng):
+        return write(conn, rng) if rng.random() < 0.2 else read(conn, rng)
+    
+    print(f'Databáze: {args.equipment} zařízení, {args.bookings} rezervací, {args.threads} vláken')
+    try:
+        workloads = (('GET /api/data', read), ('GET /api/bookings 1 den', read_day),
+                     ('POST /api/bookings', write), ('mix 80/20', mixed))
+        for label, worker in workloads:
+            result = run_for(args.seconds, args.threads, worker, port)
+            print(f"  {label:20s} {result['rps']:8.1f} req/s  "
+                  f"({result['requests']} požadavků, {result['errors']} chyb)")
+    finally:
+        server.shutdown()
+
+
+def bench_stress(args: argparse.Namespace) -> int:
+    """
+    Fire parallel POSTs at a capacity-1 equipment and verify no overbooking.
+    
+    Returns:
+        int: Process exit code (1 if capacity was exceeded or ids collided)
+    """
+    conn = sqlite3.connect(DB_PATH)
+    create_tables(conn)
+    conn.execute("INSERT OR REPLACE INTO equipment (name, category, max_tests, sides, status) "
+                 "VALUES ('STRESS-1', 'Stress', 1, 1, 'active')")
+    conn.commit()
+    conn.close()
+    
+    server = start_server()
+    port = server.server_port
+    
+    def post(index: int) -> int:
+        # Overlapping 3-day windows within one month: most requests must lose
+        first = datetime.date(2031, 1, 1) + datetime.timedelta(days=index % 28)
+        body = json.dumps({
+            'description': f'Stress {index}',
+            'equipment_id': 'STRESS-1',
+            'start_date': first.isoformat(),
+            'end_date': (first + datetime.timedelta(days=2)).isoformat()
+        })
+        http_conn = http.client.HTTPConnection('127.0.0.1', port)
+        try:
+            http_conn.request('POST', '/api/bookings', body, {'Content-Type': 'application/json'})
+            response = http_conn.getresponse()
+            response.read()
+            return response.status
+        finally:
+            http_conn.close()
+    
+    try:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.threads) as executor:
+            statuses = list(executor.map(post, range(args.requests)))
+        elapsed = time.perf_counter() - started
+    finally:
+        server.shutdown()
+    
+    conn = sqlite3.connect(DB_PATH)
+    rows = conn.execute("SELECT id, start_date, end_date FROM bookings "
+                        "WHERE equipment_id = 'STRESS-1' AND NOT is_blocker").fetchall()
+    conn.close()
+    per_day: Dict[str, int] = {}
+    for _, first, last in rows:
+        day = datetime.date.fromisoformat(first)
+        while day <= datetime.date.fromisoformat(last):
+            per_day[day.isoformat()] = per_day.get(day.isoformat(), 0) + 1
+            day += datetime.timedelta(days=1)
+    overbooked = sum(1 for load in per_day.values() if load > 1)
+    
+    counts = {status: statuses.count(status) for status in sorted(set(statuses))}
+    print(f'{args.requests} souběžných POST ({args.threads} vláken) za {elapsed:.2f} s '
+          f'= {args.requests / elapsed:.1f} req/s')
+    print(f'  stavy odpovědí: {counts}')
+    print(f'  uložené rezervace: {len(rows)}, přeplněné dny: {overbooked}')
+    ok = overbooked == 0 and counts.get(201, 0) == len(rows) and 500 not in counts
+    print('✅ Žádné přeplnění' if ok else '✗ Kapacita překročena nebo chyby serveru')
+    return 0 if ok else 1
+
+
+def bench_analytics(args: argparse.Namespace) -> None:
+    """Measure /api/analytics/utilization computed from scratch and cached."""
+    seed_database(args.equipment, args.bookings, years=args.years)
+    from analytics import get_utilization
+    from db import get_reference_data
+    get_reference_data()  # Warm the reference cache, measure only analytics
+    
+    start = datetime.date(2025, 1, 1)
+    end = start + datetime.timedelta(days=365 * args.years - 1)
+    print(f'Databáze: {args.equipment} zařízení, {args.bookings} rezervací, {args.years} let')
+    for granularity in ('day', 'week', 'month'):
+        for group in ('equipment', 'category'):
+            started = time.perf_counter()
+            result = get_utilization(start, end, granularity, group)
+            cold = time.perf_counter() - started
+            started = time.perf_counter()
+            for _ in range(100):
+                get_utilization(start, end, granularity, group)
+            cached = (time.perf_counter() - started) / 100
+            print(f'  {granularity:5s} / {group:9s}  výpočet {cold * 1000:8.1f} ms   '
+                  f'z cache {cached * 1000:6.2f} ms   ({len(result["series"])} řad × '
+                  f'{len(result["periods"])} období)')
+
+
+def bench_serialize(args: argparse.Namespace) -> None:
+    """Compare /api/data payload building: jsonify vs. fast_json (stdlib, orjson)."""
+    from app_main import app
+    from flask import jsonify
+    from db import get_data_version, load_booking_rows, load_bookings_db, load_equipment_db, load_projects_db
+    from fast_json import HAS_ORJSON, encode_data
+    
+    def default_path() -> bytes:
+        with app.app_context():
+            return jsonify({"version": get_data_version(), "equipment": load_equipment_db(),
+                            "bookings": load_bookings_db(), "projects": load_projects_db()}).get_data()
+    
+    def fast_path(use_orjson: bool) -> Callable[[], bytes]:
+        return lambda: encode_data(get_data_version(), load_equipment_db(), load_booking_rows(),
+                                   load_projects_db(), use_orjson=use_orjson)
+    
+    paths = [('jsonify + dicts', default_path), ('fast_json stdlib', fast_path(False))]
+    if HAS_ORJSON:
+        paths.append(('fast_json orjson', fast_path(True)))
+    else:
+        print('orjson není nainstalován, měří se jen stdlib (pip install orjson)')
+    
+    seeded = 0
+    for size in sorted(args.sizes):
+        seed_database(args.equipment, size - seeded)
+        seeded = size
+        print(f'{size} rezervací (nejlepší z {args.repeat}):')
+        for label, build in paths:
+            best = float('inf')
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                body = build()
+                best = min(best, time.perf_counter() - started)
+            print(f'  {label:17s} {best * 1000:8.1f} ms   {len(body) / 1e6:6.2f} MB')
+
+
+def main() -> int:
+    """Parse arguments and run the selected benchmark."""
+    parser = argparse.ArgumentParser(description='Booking Planner benchmarks')
+    subparsers = parser.add_subparsers(dest='benchmark', required=True)
+    
+    requests_parser = subparsers.add_parser('requests', help='HTTP throughput (req/s)')
+    requests_parser.add_argument('--threads', type=int, default=8)
+    requests_parser.add_argument('--seconds', type=float, default=5)
+    requests_parser.add_argument('--equipment', type=int, default=20)
+    requests_parser.add_argument('--bookings', type=int, default=2000)
+    requests_parser.set_defaults(func=bench_requests)
+    
+    stress_parser = subparsers.add_parser('stress', help='parallel POSTs on a capacity-1 equipment')
+    stress_parser.add_argument('--requests', type=int, default=500)
+    stress_parser.add_argument('--threads', type=int, default=50)
+    stress_parser.set_defaults(func=bench_stress)
+    
+    analytics_parser = subparsers.add_parser('analytics', help='utilization analytics over a long period')
+    analytics_parser.add_argument('--equipment', type=int, default=200)
+    analytics_parser.add_argument('--bookings', type=int, default=40000)
+    analytics_parser.add_argument('--years', type=int, default=5)
+    analytics_parser.set_defaults(func=bench_analytics)
+    
+    serialize_parser = subparsers.add_parser('serialize', help='/api/data serialization paths')
+    serialize_parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000])
+    serialize_parser.add_argument('--equipment', type=int, default=50)
+    serialize_parser.add_argument('--repeat', type=int, default=5)
+    serialize_parser.set_defaults(func=bench_serialize)
+    
+    args = parser.parse_args()
+    return args.func(args) or 0
+
+
+if __name__ == '__main__':
+    import logging
+    logging.disable(logging.INFO)
+    sys.exit(main())
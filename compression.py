@@ -0,0 +1,227 @@
+"""
+Response compression with Accept-Encoding negotiation.
+
+Compressible responses (JSON, text, JS, CSS) are encoded with Brotli
+(when the optional brotli package is installed) or gzip, whichever the
+client prefers. Bodies of responses with an ETag (data snapshots of
+/api/data, static files) are compressed once per URL, ETag and encoding
+and served from a bounded in-process cache, so N clients fetching the
+same data version cost one compression. Compressed responses get a weak
+ETag, as the bytes differ from the identity representation.
+
+Classes:
+- CompressedBodyCache: LRU of encoded bodies with per-key single flight
+
+Functions:
+- negotiate_encoding: Pick the content coding for a request
+- compress: Encode bytes with gzip or Brotli
+- compress_response: Flask after_request hook
+"""
+
+import gzip
+import logging
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+from flask import Request, Response, request
+from config import (
+    COMPRESSION_BROTLI_QUALITY, COMPRESSION_CACHE_MAX_BYTES,
+    COMPRESSION_GZIP_LEVEL, COMPRESSION_MIN_SIZE
+)
+
+try:
+    import brotli
+except ImportError:  # Optional dependency, gzip only
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# Server preference on equal client quality
+SUPPORTED_ENCODINGS = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+COMPRESSIBLE_MIMETYPES = {
+    'application/json', 'application/javascript', 'application/x-ndjson',
+    'image/svg+xml', 'text/css', 'text/csv', 'text/html', 'text/javascript',
+    'text/plain'
+}
+
+
+def negotiate_encoding(req: Request) -> Optional[str]:
+    """
+    Pick the content coding for a request from its Accept-Encoding.
+
+    Args:
+        req: Incoming request
+
+    Returns:
+        'br', 'gzip' or None (identity)
+    """
+    return req.accept_encodings.best_match(SUPPORTED_ENCODINGS)
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    """
+    Encode a body.
+
+    Args:
+        data: Uncompressed bytes
+        encoding: 'br' or 'gzip'
+
+    Returns:
+        bytes: Encoded body
+    """
+    if encoding == 'br':
+        return brotli.compress(data, quality=COMPRESSION_BROTLI_QUALITY)
+    # mtime=0 keeps the output deterministic for the same input
+    return gzip.compress(data, compresslevel=COMPRESSION_GZIP_LEVEL, mtime=0)
+
+
+class CompressedBodyCache:
+    """
+    Bounded LRU of response bodies keyed by (url, etag, encoding).
+
+    The identity body is cached too, so a snapshot is built once and then
+    compressed once per encoding. Concurrent misses of one key wait for
+    a single build instead of repeating it. Storing a body drops bodies
+    of the same URL with a different ETag (superseded snapshots).
+    """
+
+    def __init__(self, max_bytes: int = COMPRESSION_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: 'OrderedDict[Tuple[str, str, Optional[str]], bytes]' = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._building: Dict[Tuple[str, str, Optional[str]], threading.Lock] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, url: str, etag: str, encoding: Optional[str],
+            build: Callable[[], bytes]) -> bytes:
+        """
+        Get a body, building and encoding it on a miss.
+
+        Args:
+            url: Request path with query string
+            etag: ETag of the identity representation
+            encoding: 'br', 'gzip' or None for the identity body
+            build: Returns the identity body (called at most once per miss)
+
+        Returns:
+            bytes: Body in the requested encoding
+        """
+        key = (url, etag, encoding)
+        with self._lock:
+            body = self._lookup(key)
+            if body is not None:
+                return body
+            key_lock = self._building.setdefault(key, threading.Lock())
+
+        with key_lock:
+            with self._lock:
+                body = self._lookup(key, count=False)
+            if body is not None:
+                return body
+            try:
+                if encoding is None:
+                    body = build()
+                else:
+                    data = self.get(url, etag, None, build)
+                    body = compress(data, encoding)
+                    logger.debug(f"Compressed {url} ({etag}) with {encoding}: {len(data)} -> {len(body)} bytes")
+                with self._lock:
+                    self.misses += 1
+                    self._store(key, body)
+            finally:
+                # Also when build() or compress() raised: the key is built anew next time
+                with self._lock:
+                    self._building.pop(key, None)
+            return body
+
+    def _lookup(self, key: Tuple[str, str, Optional[str]], count: bool = True) -> Optional[bytes]:
+        """Cached body or None; caller holds the lock."""
+        body = self._entries.get(key)
+        if body is not None:
+            self._entries.move_to_end(key)
+            if count:
+                self.hits += 1
+        return body
+
+    def _store(self, key: Tuple[str, str, Optional[str]], body: bytes) -> None:
+        """Insert a body and evict down to the byte budget; caller holds the lock."""
+        url, etag, _ = key
+        for stale in [cached for cached in self._entries if cached[0] == url and cached[1] != etag]:
+            self._size -= len(self._entries.pop(stale))
+        if len(body) > self.max_bytes:
+            return  # Never fits, serve uncached
+        if key in self._entries:
+            self._size -= len(self._entries.pop(key))
+        self._entries[key] = body
+        self._size += len(body)
+        while self._size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= len(evicted)
+
+    def clear(self) -> None:
+        """Drop all cached bodies."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters and cache size."""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses,
+                    'entries': len(self._entries), 'bytes': self._size}
+
+
+body_cache = CompressedBodyCache()
+
+
+def _is_compressible(response: Response) -> bool:
+    """Whether a response may be compressed by the after_request hook."""
+    if response.status_code != 200 or 'Content-Encoding' in response.headers:
+        return False
+    if response.mimetype not in COMPRESSIBLE_MIMETYPES:
+        return False
+    # Generators (SSE, exports) must keep streaming; files (send_file) are read
+    return not response.is_streamed or response.direct_passthrough
+
+
+def compress_response(response: Response) -> Response:
+    """
+    Compress an eligible response for the current request (after_request hook).
+
+    Responses with an ETag are served from body_cache; others (small API
+    responses) are compressed directly. Responses below
+    COMPRESSION_MIN_SIZE, streamed responses and responses that already
+    carry a Content-Encoding are left as they are.
+
+    Args:
+        response: Outgoing response
+
+    Returns:
+        Response: The same response, possibly encoded
+    """
+    if not _is_compressible(response):
+        return response
+    response.vary.add('Accept-Encoding')
+    encoding = negotiate_encoding(request)
+    if encoding is None:
+        return response
+    if response.content_length is not None and response.content_length < COMPRESSION_MIN_SIZE:
+        return response
+
+    response.direct_passthrough = False  # Read send_file bodies
+    response.headers.pop('Accept-Ranges', None)  # Byte ranges of the file no longer apply
+    etag, _ = response.get_etag()
+    if etag:
+        body = body_cache.get(request.full_path, etag, encoding, response.get_data)
+        response.set_etag(etag, weak=True)
+    else:
+        data = response.get_data()
+        if len(data) < COMPRESSION_MIN_SIZE:
+            return response
+        body = compress(data, encoding)
+    response.set_data(body)
+    response.headers['Content-Encoding'] = encoding
+    return response
@@ -7,25 +7,98 @@ and other constants used throughout the application.
 
 import os
 
-# Database configuration
-DB_PATH = 'booking_planner.db'
+# Database configuration (BOOKING_PLANNER_DB overrides the path, e.g. for scripts)
+DB_PATH = os.environ.get('BOOKING_PLANNER_DB', 'booking_planner.db')
+
+# SQLite connection tuning (db_pool.py)
+SQLITE_BUSY_TIMEOUT_MS = 5000              # Wait for locks instead of failing
+SQLITE_CACHE_SIZE_KB = 16384               # Page cache per connection
+SQLITE_MMAP_SIZE = 256 * 1024 * 1024       # Memory-mapped I/O limit in bytes
+SQLITE_STATEMENT_CACHE = 256               # Prepared statements kept per connection
 
 # Legacy migration files (kept for reference, not used in production)
 LEGACY_BOOKINGS_FILE = 'bookings_data.json'
 LEGACY_EQUIPMENT_FILE = 'equipment.json'
 LEGACY_PROJECTS_FILE = 'projects.json'
 
-# Application settings
-APP_HOST = '0.0.0.0'
-APP_PORT = 5000
-APP_DEBUG = True
+# Application settings (BOOKING_PLANNER_HOST/PORT override them, e.g. per server)
+APP_HOST = os.environ.get('BOOKING_PLANNER_HOST', '0.0.0.0')
+APP_PORT = int(os.environ.get('BOOKING_PLANNER_PORT', '5000'))
+# Werkzeug debugger of `python app_main.py` (runs arbitrary code, never expose it);
+# BOOKING_PLANNER_DEBUG=1 turns it on for local development
+APP_DEBUG = os.environ.get('BOOKING_PLANNER_DEBUG', '0') == '1'
+
+# Production WSGI server (wsgi.py with waitress, gunicorn.conf.py with gunicorn)
+# Each open /api/stream (SSE) connection holds one thread while connected,
+# see SSE_MAX_CLIENTS
+SERVER_WORKERS = int(os.environ.get('BOOKING_PLANNER_WORKERS', min(4, os.cpu_count() or 1)))  # gunicorn processes
+SERVER_THREADS = int(os.environ.get('BOOKING_PLANNER_THREADS', 16))    # Threads per process
+SERVER_CONNECTION_LIMIT = 256   # waitress: open connections before new ones wait
+SERVER_TIMEOUT = 120            # gunicorn: seconds before a silent worker is restarted
 
 # API response configuration
 API_VERSION = '2.0.0'
 
+# Response compression (compression.py); Brotli needs the optional brotli package
+COMPRESSION_MIN_SIZE = 1024                      # Smaller bodies are sent uncompressed
+COMPRESSION_GZIP_LEVEL = 6
+COMPRESSION_BROTLI_QUALITY = 5                   # 11 is far slower for little gain
+COMPRESSION_CACHE_MAX_BYTES = 64 * 1024 * 1024   # Cached snapshot/static bodies, all encodings
+# Serialize /api/data from plain rows (orjson when installed, see fast_json.py);
+# BOOKING_PLANNER_FAST_JSON=0 switches back to load_bookings_db + jsonify
+FAST_JSON = os.environ.get('BOOKING_PLANNER_FAST_JSON', '1') != '0'
+
+# Delta sync: number of most recent changes kept in change_log.
+# Clients further behind get a "resync" signal and reload /api/data.
+CHANGE_LOG_RETENTION = 5000
+
+# Server-Sent Events (/api/stream)
+SSE_POLL_INTERVAL = 0.5        # Seconds between change_log polls
+SSE_HEARTBEAT_SECONDS = 15     # Keep-alive comment interval
+SSE_CLIENT_QUEUE_SIZE = 100    # Pending events per client before it is dropped
+SSE_RECONNECT_MS = 3000        # Client reconnect delay sent as SSE 'retry'
+# Streams per process; each holds a server thread, so keep it below SERVER_THREADS
+# to leave threads for API requests. Further clients get 503 and poll /api/changes.
+SSE_MAX_CLIENTS = int(os.environ.get('BOOKING_PLANNER_SSE_MAX_CLIENTS', max(1, SERVER_THREADS // 2)))
+SSE_RETRY_AFTER_SECONDS = 60   # Retry-After of a refused stream
+
 # Validation limits
 MAX_DESCRIPTION_LENGTH = 200
 MAX_NOTE_LENGTH = 500
+BULK_MAX_BOOKINGS = 1000       # Items per POST /api/bookings/bulk request
+
+# Availability search (/api/availability)
+AVAILABILITY_HORIZON_DAYS = 3 * 365  # Default search horizon after 'after'
+AVAILABILITY_MAX_COUNT = 50          # Upper limit of the 'count' parameter
+
+# Utilization analytics (/api/analytics/utilization)
+ANALYTICS_MAX_DAYS = 6 * 366   # Longest allowed from/to window
+ANALYTICS_CACHE_SIZE = 32      # Cached results (per data version and parameters)
+
+# Bar lanes of /api/data (layout.py)
+LANES_CACHE_SIZE = 16          # Cached lane maps (per data version and from/to window)
+
+# Request metrics (metrics.py, Prometheus text at /metrics)
+METRICS_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)  # Seconds
+METRICS_QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)  # SQL statements per request
+# Requests at least this slow are logged with their query breakdown
+SLOW_REQUEST_SECONDS = float(os.environ.get('BOOKING_PLANNER_SLOW_REQUEST_SECONDS', '1.0'))
+SLOW_REQUEST_TOP_QUERIES = 10  # Statements listed per slow request
+
+# Per-request profiling (profiling.py): X-Profile header or ?_profile=1 on any request
+PROFILING_ENABLED = os.environ.get('BOOKING_PLANNER_PROFILING', '1') != '0'
+# Admins send it as X-Profile-Token; unset (and no localhost access): nobody may profile
+PROFILING_TOKEN = os.environ.get('BOOKING_PLANNER_PROFILING_TOKEN') or None
+# Opt-in ('1') for development only: behind a reverse proxy on the same host
+# every client looks local
+PROFILING_ALLOW_LOCALHOST = os.environ.get('BOOKING_PLANNER_PROFILING_LOCALHOST', '0') == '1'
+PROFILER_DEFAULT = 'cprofile'  # 'cprofile' (pstats file) or 'pyinstrument' (HTML, optional package)
+PROFILE_DIR = os.environ.get('BOOKING_PLANNER_PROFILE_DIR', 'profiles')
+PROFILE_KEEP = 50              # Newest profiles kept on disk (ring buffer)
+PROFILE_TEXT_LINES = 60        # Functions listed by /api/profiles/<id>?format=text
+
+# Streaming export (/api/export/bookings.csv|.ndjson)
+EXPORT_BATCH_SIZE = 1000       # Rows fetched from the cursor per streamed chunk
 
 # TMA number pattern
 TMA_REGEX_PATTERN = r"EU-SVA-\d{6}-\d{2}"
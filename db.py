@@ -3,17 +3,29 @@ Database module with improved transaction handling and connection management.
 
 Features:
 - Automatic transaction rollback on errors
-- Connection pooling via context managers
+- Per-thread pooled connections in WAL mode (db_pool.py)
 - Structured error handling
 - Logging support
+- Per-day equipment load (equipment_daily_load) kept in sync with bookings
+- Global data version bumped by every write (ETag of /api/data)
+- Change log of committed writes for delta sync (/api/changes)
+- Atomic booking writes: collision check and write in one BEGIN IMMEDIATE transaction
+- Bulk booking creation with executemany in a single transaction
+- Read-through cache of equipment, projects and capacity overrides
+- Shared LabIndex of equipment and booking occupancy, advanced from change_log
+- Streaming booking export with fetchmany batches
 """
 
 import sqlite3
 import json
 import logging
-from typing import List, Dict, Any, Optional, Tuple
+import datetime
+import threading
+from typing import List, Dict, Any, Optional, Tuple, Iterator, Callable, NamedTuple
 from contextlib import contextmanager
-from config import DB_PATH
+from config import CHANGE_LOG_RETENTION
+from db_pool import pool
+from occupancy import LabIndex
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -25,6 +37,10 @@ def get_db_connection():
     """
     Context manager for safe database connections with automatic cleanup.
     
+    Uses the calling thread's pooled connection (see db_pool.py), so nested
+    calls share one connection and transaction. Its queries are counted and
+    timed for the current request (metrics.py, /metrics).
+    
     Yields:
         sqlite3.Connection: Database connection with row_factory set
         
@@ -34,34 +50,92 @@ def get_db_connection():
             cursor.execute('SELECT * FROM bookings')
             conn.commit()  # Explicit commit required
     """
-    conn = None
     try:
-        conn = sqlite3.connect(DB_PATH)
-        conn.row_factory = sqlite3.Row  # Enable column access by name
-        yield conn
+        with pool.acquire() as conn:
+            yield conn
     except sqlite3.Error as e:
         logger.error(f"Database error: {e}")
-        if conn:
-            conn.rollback()
         raise
-    finally:
-        if conn:
-            conn.close()
+
+
+@contextmanager
+def write_transaction(conn: Optional[sqlite3.Connection] = None):
+    """
+    Run a read-check-write sequence as one atomic write transaction.
+    
+    BEGIN IMMEDIATE takes SQLite's write lock up front, so everything read
+    inside the block (e.g. a collision check) is still true when the write
+    commits; concurrent writers wait up to busy_timeout. Commits when the
+    block exits normally, rolls back on error. Inside an already open
+    transaction the block joins it and leaves the commit to the outer code.
+    
+    Args:
+        conn: Connection to use (default: the thread's pooled connection),
+            e.g. the own connection of a maintenance script
+    
+    Yields:
+        sqlite3.Connection: The connection running the transaction
+    """
+    if conn is not None:
+        yield from _immediate_transaction(conn)
+        return
+    with get_db_connection() as conn:
+        yield from _immediate_transaction(conn)
+
+
+def _immediate_transaction(conn: sqlite3.Connection) -> Iterator[sqlite3.Connection]:
+    """Body of write_transaction on a given connection."""
+    if conn.in_transaction:
+        yield conn
+        return
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        yield conn
+    except BaseException:
+        conn.rollback()
+        raise
+    conn.commit()
+
+
+class BookingCollisionError(Exception):
+    """Booking would exceed equipment capacity on the listed days."""
+    
+    def __init__(self, days: List[datetime.date]):
+        super().__init__(f"Capacity exceeded on {len(days)} day(s)")
+        self.days = days
+
+
+CollisionCheck = Callable[[Dict[str, Any]], List[datetime.date]]
+
+
+def _run_collision_check(collision_check: Optional[CollisionCheck],
+                         booking_data: Dict[str, Any]) -> None:
+    """Raise BookingCollisionError if collision_check reports any day."""
+    if collision_check is None:
+        return
+    collision_days = collision_check(booking_data)
+    if collision_days:
+        raise BookingCollisionError(collision_days)
 
 
 def db_connect():
     """
     Legacy function for backward compatibility.
-    Returns raw sqlite3 connection.
+    Returns a new (not pooled) sqlite3 connection with the pool's pragmas.
     
     Note: Prefer using get_db_connection() context manager.
     """
-    return sqlite3.connect(DB_PATH)
+    return pool.new_connection()
 
 
-def load_bookings_db() -> List[Dict[str, Any]]:
+def load_bookings_db(date_from: Optional[str] = None,
+                     date_to: Optional[str] = None) -> List[Dict[str, Any]]:
     """
-    Load all bookings from database with proper error handling.
+    Load bookings from database with proper error handling.
+    
+    Args:
+        date_from: Only bookings ending on or after this ISO date
+        date_to: Only bookings starting on or before this ISO date
     
     Returns:
         List[Dict]: List of booking dictionaries
@@ -69,16 +143,27 @@ def load_bookings_db() -> List[Dict[str, Any]]:
     Raises:
         sqlite3.Error: If database query fails
     """
+    conditions = []
+    params: List[str] = []
+    if date_from:
+        conditions.append('end_date >= ?')
+        params.append(date_from)
+    if date_to:
+        conditions.append('start_date <= ?')
+        params.append(date_to)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+    
     try:
         with get_db_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute('''
+            cursor.execute(f'''
                 SELECT id, description, tma_number, start_date, end_date, 
                        equipment_id, project_name, project_color, note, 
                        is_blocker, text_style 
                 FROM bookings
+                {where}
                 ORDER BY start_date
-            ''')
+            ''', params)
             rows = cursor.fetchall()
             
             bookings = []
@@ -106,7 +191,7 @@ def load_bookings_db() -> List[Dict[str, Any]]:
                     'text_style': text_style
                 })
             
-            logger.info(f"Loaded {len(bookings)} bookings from database")
+            logger.debug(f"Loaded {len(bookings)} bookings from database")
             return bookings
             
     except sqlite3.Error as e:
@@ -114,36 +199,220 @@ def load_bookings_db() -> List[Dict[str, Any]]:
         raise
 
 
-def load_equipment_db() -> List[Dict[str, Any]]:
+# Keys of load_booking_rows tuples (same fields as load_bookings_db dicts)
+BOOKING_FIELDS = (
+    'id', 'description', 'tma_number', 'start_date', 'end_date', 'equipment_id',
+    'project_name', 'project_color', 'note', 'is_blocker', 'text_style'
+)
+
+
+def load_booking_rows(date_from: Optional[str] = None,
+                      date_to: Optional[str] = None) -> List[Tuple[Any, ...]]:
     """
-    Load all equipment from database.
+    Load bookings as plain tuples in BOOKING_FIELDS order (fast path).
+    
+    Skips the per-row dict building and text_style parsing of
+    load_bookings_db: is_blocker is 0/1 and text_style stays JSON text,
+    validated by SQLite ('null' for NULL, '{}' for invalid JSON, matching
+    load_bookings_db), so serializers can embed it as is.
+    
+    Args:
+        date_from: Only bookings ending on or after this ISO date
+        date_to: Only bookings starting on or before this ISO date
     
     Returns:
-        List[Dict]: List of equipment dictionaries
+        List of booking tuples ordered by start date
+        
+    Raises:
+        sqlite3.Error: If database query fails
     """
+    conditions = []
+    params: List[str] = []
+    if date_from:
+        conditions.append('end_date >= ?')
+        params.append(date_from)
+    if date_to:
+        conditions.append('start_date <= ?')
+        params.append(date_to)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+    
     try:
         with get_db_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute('''
-                SELECT name, category, max_tests, status 
-                FROM equipment
-                ORDER BY name
-            ''')
+            cursor.row_factory = None  # Plain tuples
+            cursor.execute(f'''
+                SELECT id, description, tma_number, start_date, end_date,
+                       equipment_id, project_name, project_color, note,
+                       COALESCE(is_blocker, 0) != 0,
+                       CASE WHEN text_style IS NULL THEN 'null'
+                            WHEN json_valid(text_style) THEN text_style
+                            ELSE '{{}}' END
+                FROM bookings
+                {where}
+                ORDER BY start_date
+            ''', params)
             rows = cursor.fetchall()
-            
-            equipment = []
-            for row in rows:
-                equipment.append({
-                    'id': row['name'],  # Use name as id for compatibility
-                    'name': row['name'],
-                    'category': row['category'],
-                    'max_tests': row['max_tests'],
-                    'status': row['status']
-                })
-            
-            logger.info(f"Loaded {len(equipment)} equipment items")
-            return equipment
+            logger.debug(f"Loaded {len(rows)} booking rows from database")
+            return rows
             
+    except sqlite3.Error as e:
+        logger.error(f"Failed to load bookings: {e}")
+        raise
+
+
+# Columns of iter_bookings_export rows
+EXPORT_COLUMNS = (
+    'id', 'description', 'tma_number', 'start_date', 'end_date',
+    'equipment_id', 'equipment_category', 'project_name', 'project_color',
+    'project_text_color', 'note', 'is_blocker', 'text_style'
+)
+
+# Base equipment name of bookings.equipment_id in SQL (occupancy.base_name_of)
+_BASE_NAME_SQL = ("trim(CASE WHEN instr(b.equipment_id, ' - ') > 0 "
+                  "THEN substr(b.equipment_id, 1, instr(b.equipment_id, ' - ') - 1) "
+                  "ELSE b.equipment_id END)")
+
+
+def iter_bookings_export(date_from: Optional[str] = None, date_to: Optional[str] = None,
+                         equipment: Optional[List[str]] = None,
+                         projects: Optional[List[str]] = None,
+                         batch_size: int = 1000) -> Iterator[List[Tuple[Any, ...]]]:
+    """
+    Stream bookings joined with equipment category and project colors.
+    
+    Rows are read from one cursor with fetchmany, so memory stays flat
+    regardless of the number of bookings. The query runs on a dedicated
+    connection (closed when the iterator finishes or is closed) because
+    the cursor stays open while a response streams.
+    
+    Args:
+        date_from: Only bookings ending on or after this ISO date
+        date_to: Only bookings starting on or before this ISO date
+        equipment: Only these equipment_ids or base equipment names
+        projects: Only these project names
+        batch_size: Rows fetched per batch
+        
+    Yields:
+        List of row tuples in EXPORT_COLUMNS order (raw values: is_blocker
+        as stored, text_style as JSON text); project_color falls back to
+        the booking's own color when the project no longer exists
+        
+    Raises:
+        sqlite3.Error: If database query fails
+    """
+    conditions = []
+    params: List[str] = []
+    if date_from:
+        conditions.append('b.end_date >= ?')
+        params.append(date_from)
+    if date_to:
+        conditions.append('b.start_date <= ?')
+        params.append(date_to)
+    if equipment:
+        placeholders = ', '.join('?' * len(equipment))
+        conditions.append(f'(b.equipment_id IN ({placeholders}) OR {_BASE_NAME_SQL} IN ({placeholders}))')
+        params.extend(equipment)
+        params.extend(equipment)
+    if projects:
+        conditions.append(f"b.project_name IN ({', '.join('?' * len(projects))})")
+        params.extend(projects)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+    
+    conn = pool.new_connection()
+    try:
+        cursor = conn.execute(f'''
+            SELECT b.id, b.description, b.tma_number, b.start_date, b.end_date,
+                   b.equipment_id, e.category, b.project_name,
+                   COALESCE(p.color, b.project_color), p.textColor,
+                   b.note, b.is_blocker, b.text_style
+            FROM bookings b
+            LEFT JOIN equipment e ON e.name = {_BASE_NAME_SQL}
+            LEFT JOIN projects p ON p.name = b.project_name
+            {where}
+            ORDER BY b.start_date, b.id
+        ''', params)
+        exported = 0
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            exported += len(rows)
+            yield rows
+        logger.info(f"Exported {exported} bookings")
+    except sqlite3.Error as e:
+        logger.error(f"Failed to export bookings: {e}")
+        raise
+    finally:
+        conn.close()
+
+
+def _equipment_row_to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+    """Convert equipment row to the API dictionary shape."""
+    return {
+        'id': row['name'],  # Use name as id for compatibility
+        'name': row['name'],
+        'category': row['category'],
+        'max_tests': row['max_tests'],
+        'status': row['status']
+    }
+
+
+def _project_row_to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+    """Convert project row to the API dictionary shape."""
+    return {
+        'id': row['name'],  # Use name as id for compatibility
+        'name': row['name'],
+        'color': row['color'],
+        'text_color': row['textColor'],  # Convert to snake_case
+        'active': bool(row['active'])
+    }
+
+
+def fetch_equipment(conn: sqlite3.Connection, name: str) -> Optional[Dict[str, Any]]:
+    """
+    Fetch one equipment item in API shape on an existing connection.
+    
+    Args:
+        conn: Database connection (may have a pending write)
+        name: Equipment name
+        
+    Returns:
+        Dict or None if equipment does not exist
+    """
+    cursor = conn.cursor()
+    cursor.row_factory = sqlite3.Row
+    cursor.execute('SELECT name, category, max_tests, status FROM equipment WHERE name = ?', (name,))
+    row = cursor.fetchone()
+    return _equipment_row_to_dict(row) if row else None
+
+
+def fetch_project(conn: sqlite3.Connection, name: str) -> Optional[Dict[str, Any]]:
+    """
+    Fetch one project in API shape on an existing connection.
+    
+    Args:
+        conn: Database connection (may have a pending write)
+        name: Project name
+        
+    Returns:
+        Dict or None if project does not exist
+    """
+    cursor = conn.cursor()
+    cursor.row_factory = sqlite3.Row
+    cursor.execute('SELECT name, color, textColor, active FROM projects WHERE name = ?', (name,))
+    row = cursor.fetchone()
+    return _project_row_to_dict(row) if row else None
+
+
+def load_equipment_db() -> List[Dict[str, Any]]:
+    """
+    Load all equipment (served from the reference cache).
+    
+    Returns:
+        List[Dict]: List of equipment dictionaries, ordered by name
+    """
+    try:
+        return [dict(item) for item in get_reference_data().equipment.values()]
     except sqlite3.Error as e:
         logger.error(f"Failed to load equipment: {e}")
         raise
@@ -151,108 +420,674 @@ def load_equipment_db() -> List[Dict[str, Any]]:
 
 def load_projects_db() -> List[Dict[str, Any]]:
     """
-    Load all projects from database.
+    Load all projects (served from the reference cache).
     
     Returns:
-        List[Dict]: List of project dictionaries
+        List[Dict]: List of project dictionaries, ordered by name
     """
     try:
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
-                SELECT name, color, textColor, active 
-                FROM projects
-                ORDER BY name
-            ''')
-            rows = cursor.fetchall()
-            
-            projects = []
-            for row in rows:
-                projects.append({
-                    'id': row['name'],  # Use name as id for compatibility
-                    'name': row['name'],
-                    'color': row['color'],
-                    'text_color': row['textColor'],  # Convert to snake_case
-                    'active': bool(row['active'])
-                })
-            
-            logger.info(f"Loaded {len(projects)} projects")
-            return projects
-            
+        return [dict(item) for item in get_reference_data().projects.values()]
     except sqlite3.Error as e:
         logger.error(f"Failed to load projects: {e}")
         raise
 
 
-def create_booking(booking_data: Dict[str, Any]) -> int:
+# Name of the global data version counter in version_counters
+DATA_VERSION_COUNTER = 'data'
+
+
+def bump_data_version(conn: sqlite3.Connection) -> int:
+    """
+    Increment the global data version inside the caller's transaction.
+    
+    Every write path calls this before commit, so the version changes
+    exactly when committed data changes (used as ETag of /api/data).
+    
+    Args:
+        conn: Connection with the pending write
+        
+    Returns:
+        int: New data version
+    """
+    conn.execute('UPDATE version_counters SET value = value + 1 WHERE name = ?',
+                 (DATA_VERSION_COUNTER,))
+    return conn.execute('SELECT value FROM version_counters WHERE name = ?',
+                        (DATA_VERSION_COUNTER,)).fetchone()[0]
+
+
+def get_data_version() -> int:
+    """
+    Get the current global data version.
+    
+    Returns:
+        int: Monotonically increasing version, bumped by every write
+    """
+    with get_db_connection() as conn:
+        row = conn.execute('SELECT value FROM version_counters WHERE name = ?',
+                           (DATA_VERSION_COUNTER,)).fetchone()
+        return row[0] if row else 0
+
+
+# Version stamp of equipment, projects and capacity overrides (reference cache)
+REFERENCE_VERSION_COUNTER = 'reference'
+
+
+class ReferenceData(NamedTuple):
+    """Snapshot of the reference tables, indexed by name."""
+    version: int
+    equipment: Dict[str, Dict[str, Any]]  # API shape, ordered by name
+    projects: Dict[str, Dict[str, Any]]  # API shape, ordered by name
+    overrides: Dict[str, List[Tuple[str, str, int]]]  # (start, end, max_tests) by id
+
+
+class ReferenceCache:
+    """
+    Read-through cache of equipment, projects and capacity overrides.
+    
+    These tables change rarely but are read by every /api/data call and
+    capacity check. A snapshot is valid while the 'reference' row of
+    version_counters is unchanged; writers bump it in their transaction
+    (invalidate_reference_cache), so other threads and worker processes
+    reload after the commit. Each read costs one primary-key lookup.
+    """
+    
+    def __init__(self):
+        self._data: Optional[ReferenceData] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self) -> ReferenceData:
+        """
+        Get the current snapshot, reloading it if the version stamp moved.
+        
+        Returns:
+            ReferenceData: Snapshot (shared, do not modify)
+        """
+        with get_db_connection() as conn:
+            row = conn.execute('SELECT value FROM version_counters WHERE name = ?',
+                               (REFERENCE_VERSION_COUNTER,)).fetchone()
+            version = row[0] if row else 0
+            data = self._data
+            if data is not None and data.version == version:
+                with self._lock:
+                    self.hits += 1
+                return data
+            
+            with self._lock:
+                self.misses += 1
+            data = _load_reference_data(conn, version)
+            # Inside a write transaction the tables may hold uncommitted
+            # changes under a stamp that could still be rolled back
+            if not conn.in_transaction:
+                self._data = data
+            return data
+    
+    def clear(self) -> None:
+        """Drop the local snapshot (next read reloads)."""
+        self._data = None
+    
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and version of the cached snapshot."""
+        data = self._data
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'version': data.version if data else None
+        }
+
+
+def _load_reference_data(conn: sqlite3.Connection, version: int) -> ReferenceData:
+    """Read all reference tables into a ReferenceData snapshot."""
+    cursor = conn.cursor()
+    cursor.execute('SELECT name, category, max_tests, status FROM equipment ORDER BY name')
+    equipment = {row['name']: _equipment_row_to_dict(row) for row in cursor.fetchall()}
+    cursor.execute('SELECT name, color, textColor, active FROM projects ORDER BY name')
+    projects = {row['name']: _project_row_to_dict(row) for row in cursor.fetchall()}
+    overrides: Dict[str, List[Tuple[str, str, int]]] = {}
+    cursor.execute('''
+        SELECT equipment_name, start_date, end_date, max_tests
+        FROM equipment_capacity_overrides ORDER BY id
+    ''')
+    for row in cursor.fetchall():
+        overrides.setdefault(row['equipment_name'], []).append(
+            (row['start_date'], row['end_date'], row['max_tests']))
+    
+    logger.info(f"Loaded reference data v{version}: {len(equipment)} equipment, "
+                f"{len(projects)} projects, {sum(map(len, overrides.values()))} capacity overrides")
+    return ReferenceData(version, equipment, projects, overrides)
+
+
+reference_cache = ReferenceCache()
+
+
+def get_reference_data() -> ReferenceData:
+    """
+    Get equipment, projects and capacity overrides from the reference cache.
+    
+    Returns:
+        ReferenceData: Current snapshot (shared, do not modify)
+    """
+    return reference_cache.get()
+
+
+def invalidate_reference_cache(conn: sqlite3.Connection) -> None:
+    """
+    Invalidate cached reference data inside the caller's transaction.
+    
+    Every write to equipment, projects or equipment_capacity_overrides
+    must call this before commit.
+    
+    Args:
+        conn: Connection with the pending write
+    """
+    conn.execute('''
+        INSERT INTO version_counters (name, value) VALUES (?, 1)
+        ON CONFLICT(name) DO UPDATE SET value = value + 1
+    ''', (REFERENCE_VERSION_COUNTER,))
+    reference_cache.clear()
+
+
+def get_reference_cache_stats() -> Dict[str, Any]:
+    """
+    Get hit/miss counters of the reference cache.
+    
+    Returns:
+        Dict with hits, misses and the cached version (None if empty)
+    """
+    return reference_cache.stats()
+
+
+def record_change(conn: sqlite3.Connection, entity: str, key: Any, op: str,
+                  payload: Optional[Dict[str, Any]] = None) -> int:
+    """
+    Bump the data version and append the change to change_log.
+    
+    Called by every write path inside its transaction, so /api/changes
+    can replay exactly what was committed.
+    
+    Args:
+        conn: Connection with the pending write
+        entity: 'booking', 'equipment', 'project' or 'capacity_override'
+        key: Primary key of the changed row
+        op: 'insert', 'update' or 'delete'
+        payload: Row in API shape (None for deletes)
+        
+    Returns:
+        int: Data version assigned to this change
+    """
+    version = bump_data_version(conn)
+    conn.execute('''
+        INSERT INTO change_log (version, entity, entity_key, op, payload)
+        VALUES (?, ?, ?, ?, ?)
+    ''', (version, entity, str(key), op, json.dumps(payload) if payload is not None else None))
+    
+    # Compact: keep only the most recent CHANGE_LOG_RETENTION entries
+    conn.execute('DELETE FROM change_log WHERE version <= ?', (version - CHANGE_LOG_RETENTION,))
+    return version
+
+
+def get_changes_since(since: int) -> Dict[str, Any]:
+    """
+    Get all changes committed after a data version.
+    
+    Args:
+        since: Data version the client already has
+        
+    Returns:
+        Dict with current 'version', 'changes' list and 'resync' flag.
+        'resync' is True when the log no longer covers the requested range
+        (compacted, or the client is ahead of the server) and the client
+        must reload /api/data.
+    """
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute('SELECT value FROM version_counters WHERE name = ?', (DATA_VERSION_COUNTER,))
+        row = cursor.fetchone()
+        version = row[0] if row else 0
+        
+        if since == version:
+            return {'version': version, 'changes': [], 'resync': False}
+        
+        cursor.execute('SELECT MIN(version) FROM change_log')
+        oldest = cursor.fetchone()[0]
+        if since > version or oldest is None or oldest > since + 1:
+            return {'version': version, 'changes': [], 'resync': True}
+        
+        cursor.execute('''
+            SELECT version, entity, entity_key, op, payload
+            FROM change_log
+            WHERE version > ? AND version <= ?
+            ORDER BY version
+        ''', (since, version))
+        changes = [{
+            'version': r['version'],
+            'entity': r['entity'],
+            'key': r['entity_key'],
+            'op': r['op'],
+            'data': json.loads(r['payload']) if r['payload'] is not None else None
+        } for r in cursor.fetchall()]
+        
+        return {'version': version, 'changes': changes, 'resync': False}
+
+
+class _LabIndexCache:
+    """Shared LabIndex with the data version it reflects."""
+    
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.index: Optional[LabIndex] = None
+        self.version = -1
+
+
+_lab_index_cache = _LabIndexCache()
+
+
+def _refresh_lab_index() -> LabIndex:
+    """Bring the shared LabIndex up to the current data version (lock held)."""
+    cache = _lab_index_cache
+    with get_db_connection() as conn:
+        if conn.in_transaction:
+            # Uncommitted writes must not reach the shared index
+            return _build_lab_index()[0]
+    
+    if cache.index is not None:
+        delta = get_changes_since(cache.version)
+        if not delta['resync']:
+            for change in delta['changes']:
+                cache.index.apply_change(change)
+            cache.version = delta['version']
+            return cache.index
+    
+    cache.index, cache.version = _build_lab_index()
+    return cache.index
+
+
+def _build_lab_index() -> Tuple[LabIndex, int]:
+    """Build a LabIndex from the database, with the data version it covers."""
+    # Version first: data read afterwards is at least as new, and replaying
+    # changes that are already included is harmless (see LabIndex.apply_change)
+    version = get_data_version()
+    index = LabIndex(load_equipment_db(), load_bookings_db())
+    logger.info(f"Built lab index v{version}: {len(index.bookings)} bookings")
+    return index, version
+
+
+@contextmanager
+def lab_index() -> Iterator[LabIndex]:
+    """
+    Use the shared LabIndex (equipment by name, occupancy by equipment_id).
+    
+    The index is built once per process and afterwards advanced in place
+    from change_log, so it also reflects writes made by other workers.
+    Access is serialized; keep the block short.
+    
+    Yields:
+        LabIndex: Index matching the current data version
+    """
+    with _lab_index_cache.lock:
+        yield _refresh_lab_index()
+
+
+def _booking_payload(booking_id: int, booking_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Shape booking data like load_bookings_db() rows for the change log."""
+    return {
+        'id': booking_id,
+        'description': booking_data.get('description'),
+        'tma_number': booking_data.get('tma_number'),
+        'start_date': booking_data.get('start_date'),
+        'end_date': booking_data.get('end_date'),
+        'equipment_id': booking_data.get('equipment_id'),
+        'project_name': booking_data.get('project_name'),
+        'project_color': booking_data.get('project_color'),
+        'note': booking_data.get('note'),
+        'is_blocker': bool(booking_data.get('is_blocker', False)),
+        'text_style': booking_data.get('text_style', {})
+    }
+
+
+def iter_booking_days(start_date: str, end_date: str) -> Iterator[str]:
+    """
+    Iterate ISO dates of an inclusive booking period.
+    
+    Args:
+        start_date: ISO start date
+        end_date: ISO end date
+        
+    Yields:
+        str: Each day of the period in ISO format (nothing if dates are invalid)
+    """
+    try:
+        current = datetime.date.fromisoformat(start_date)
+        end = datetime.date.fromisoformat(end_date)
+    except (TypeError, ValueError):
+        return
+    while current <= end:
+        yield current.isoformat()
+        current += datetime.timedelta(days=1)
+
+
+DAILY_LOAD_UPSERT_SQL = '''
+    INSERT INTO equipment_daily_load (equipment_id, day, load, blocker_count)
+    VALUES (?, ?, ?, ?)
+    ON CONFLICT(equipment_id, day) DO UPDATE SET
+        load = load + excluded.load,
+        blocker_count = blocker_count + excluded.blocker_count
+'''
+
+
+def apply_daily_load(cursor: sqlite3.Cursor, booking: Dict[str, Any], sign: int) -> None:
+    """
+    Add (sign=1) or remove (sign=-1) a booking from equipment_daily_load.
+    
+    Must be called on the same cursor as the booking write so both changes
+    commit or roll back together.
+    
+    Args:
+        cursor: Cursor inside the booking write transaction
+        booking: Booking with equipment_id, start_date, end_date, is_blocker
+        sign: +1 when booking is added, -1 when removed
+    """
+    rows = _daily_load_rows(booking, sign)
+    if not rows:
+        return
+    
+    cursor.executemany(DAILY_LOAD_UPSERT_SQL, rows)
+    
+    if sign < 0:
+        cursor.execute('''
+            DELETE FROM equipment_daily_load
+            WHERE equipment_id = ? AND day BETWEEN ? AND ?
+            AND load = 0 AND blocker_count = 0
+        ''', (rows[0][0], rows[0][1], rows[-1][1]))
+
+
+def _daily_load_rows(booking: Dict[str, Any], sign: int) -> List[Tuple[str, str, int, int]]:
+    """Build (equipment_id, day, load_delta, blocker_delta) rows of a booking."""
+    is_blocker = bool(booking.get('is_blocker', False))
+    load_delta = 0 if is_blocker else sign
+    blocker_delta = sign if is_blocker else 0
+    equipment_id = booking.get('equipment_id')
+    return [(equipment_id, day, load_delta, blocker_delta)
+            for day in iter_booking_days(booking.get('start_date'), booking.get('end_date'))]
+
+
+def _fetch_booking_span(cursor: sqlite3.Cursor, booking_id: int) -> Optional[Dict[str, Any]]:
+    """Fetch the fields of a booking that determine its daily load."""
+    cursor.execute('''
+        SELECT equipment_id, start_date, end_date, is_blocker
+        FROM bookings WHERE id = ?
+    ''', (booking_id,))
+    row = cursor.fetchone()
+    if row is None:
+        return None
+    return {
+        'equipment_id': row[0],
+        'start_date': row[1],
+        'end_date': row[2],
+        'is_blocker': bool(row[3])
+    }
+
+
+def _expected_daily_load(cursor: sqlite3.Cursor) -> Dict[Tuple[str, str], Tuple[int, int]]:
+    """Aggregate (load, blocker_count) per (equipment_id, day) from bookings."""
+    expected: Dict[Tuple[str, str], Tuple[int, int]] = {}
+    cursor.execute('SELECT equipment_id, start_date, end_date, is_blocker FROM bookings')
+    for equipment_id, start_date, end_date, is_blocker in cursor.fetchall():
+        for day in iter_booking_days(start_date, end_date):
+            load, blockers = expected.get((equipment_id, day), (0, 0))
+            if is_blocker:
+                blockers += 1
+            else:
+                load += 1
+            expected[(equipment_id, day)] = (load, blockers)
+    return expected
+
+
+def rebuild_daily_load(conn: sqlite3.Connection) -> int:
+    """
+    Recompute equipment_daily_load from scratch out of the bookings table.
+    
+    Reading the bookings and rewriting the table happen in one write
+    transaction (write_transaction), so a booking committed concurrently
+    by a running server cannot be lost between the two.
+    
+    Args:
+        conn: Database connection (committed by this function unless it is
+            already inside a transaction)
+        
+    Returns:
+        int: Number of (equipment_id, day) rows written
+    """
+    with write_transaction(conn):
+        cursor = conn.cursor()
+        expected = _expected_daily_load(cursor)
+        cursor.execute('DELETE FROM equipment_daily_load')
+        cursor.executemany('''
+            INSERT INTO equipment_daily_load (equipment_id, day, load, blocker_count)
+            VALUES (?, ?, ?, ?)
+        ''', [(equipment_id, day, load, blockers)
+              for (equipment_id, day), (load, blockers) in expected.items()])
+    logger.info(f"Rebuilt daily load: {len(expected)} rows")
+    return len(expected)
+
+
+def find_daily_load_mismatches(conn: sqlite3.Connection) -> List[Dict[str, Any]]:
+    """
+    Compare equipment_daily_load against a fresh aggregation of bookings.
+    
+    Both tables are read in one read transaction, so a booking written
+    concurrently (WAL) cannot show up as a false mismatch.
+    
+    Args:
+        conn: Database connection (not inside a transaction)
+        
+    Returns:
+        List[Dict]: One entry per inconsistent (equipment_id, day)
+    """
+    cursor = conn.cursor()
+    cursor.execute('BEGIN')
+    try:
+        expected = _expected_daily_load(cursor)
+        cursor.execute('SELECT equipment_id, day, load, blocker_count FROM equipment_daily_load')
+        stored = {(row[0], row[1]): (row[2], row[3]) for row in cursor.fetchall()}
+    finally:
+        conn.rollback()  # Read only: just end the snapshot
+    
+    mismatches = []
+    for key in sorted(set(expected) | set(stored), key=lambda k: (str(k[0]), k[1])):
+        expected_value = expected.get(key, (0, 0))
+        stored_value = stored.get(key, (0, 0))
+        if expected_value != stored_value:
+            mismatches.append({
+                'equipment_id': key[0],
+                'day': key[1],
+                'expected_load': expected_value[0],
+                'stored_load': stored_value[0],
+                'expected_blockers': expected_value[1],
+                'stored_blockers': stored_value[1]
+            })
+    return mismatches
+
+
+def _booking_row(booking_data: Dict[str, Any]) -> Tuple[Any, ...]:
+    """Column values of a booking in INSERT order (without id)."""
+    return (
+        booking_data.get('description'),
+        booking_data.get('tma_number'),
+        booking_data.get('start_date'),
+        booking_data.get('end_date'),
+        booking_data.get('equipment_id'),
+        booking_data.get('project_name'),
+        booking_data.get('project_color'),
+        booking_data.get('note'),
+        int(booking_data.get('is_blocker', False)),
+        json.dumps(booking_data.get('text_style', {}))
+    )
+
+
+def create_booking(booking_data: Dict[str, Any],
+                   collision_check: Optional[CollisionCheck] = None) -> int:
     """
     Create new booking in database with transaction support.
     
+    The collision check and the insert run in one write transaction, so two
+    concurrent requests cannot both pass the check and overbook. IDs come
+    from AUTOINCREMENT and are never reused.
+    
     Args:
         booking_data: Dictionary with booking information
+        collision_check: Optional callable returning conflicting days
+            (e.g. utils.find_collision_days_db), run inside the transaction
         
     Returns:
         int: ID of created booking
         
     Raises:
+        BookingCollisionError: If collision_check reports conflicting days
+        ValueError: If collision_check rejects the booking data
         sqlite3.Error: If insert fails
     """
     try:
-        with get_db_connection() as conn:
+        with write_transaction() as conn:
+            _run_collision_check(collision_check, booking_data)
             cursor = conn.cursor()
             
-            # Get next ID
-            cursor.execute('SELECT MAX(id) FROM bookings')
-            max_id = cursor.fetchone()[0]
-            new_id = (max_id or 100) + 1
-            
-            # Insert booking
             cursor.execute('''
                 INSERT INTO bookings 
-                (id, description, tma_number, start_date, end_date, equipment_id, 
+                (description, tma_number, start_date, end_date, equipment_id, 
                  project_name, project_color, note, is_blocker, text_style)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                new_id,
-                booking_data.get('description'),
-                booking_data.get('tma_number'),
-                booking_data.get('start_date'),
-                booking_data.get('end_date'),
-                booking_data.get('equipment_id'),
-                booking_data.get('project_name'),
-                booking_data.get('project_color'),
-                booking_data.get('note'),
-                int(booking_data.get('is_blocker', False)),
-                json.dumps(booking_data.get('text_style', {}))
-            ))
-            
-            conn.commit()
-            logger.info(f"Created booking {new_id}")
-            return new_id
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', _booking_row(booking_data))
+            new_id = cursor.lastrowid
+            apply_daily_load(cursor, booking_data, 1)
+            record_change(conn, 'booking', new_id, 'insert', _booking_payload(new_id, booking_data))
+        
+        logger.info(f"Created booking {new_id}")
+        return new_id
             
     except sqlite3.Error as e:
         logger.error(f"Failed to create booking: {e}")
         raise
 
 
-def update_booking(booking_id: int, booking_data: Dict[str, Any]) -> bool:
+def create_bookings_bulk(bookings: List[Dict[str, Any]],
+                         collision_checker: Optional[Callable[[List[Dict[str, Any]]], Any]] = None,
+                         all_or_nothing: bool = True) -> List[Dict[str, Any]]:
+    """
+    Create many bookings in one write transaction.
+    
+    Every booking is checked (against stored load and the bookings accepted
+    before it in the batch), then all accepted bookings are inserted and
+    committed together. IDs come from AUTOINCREMENT, as in create_booking.
+    
+    Args:
+        bookings: Validated booking dictionaries
+        collision_checker: Optional factory taking the batch and returning an
+            object with check(booking) -> days and add(booking), e.g.
+            utils.BatchCollisionChecker; created inside the transaction
+        all_or_nothing: If True, nothing is written when any booking fails;
+            otherwise the bookings that passed are written
+        
+    Returns:
+        List of per-booking results in input order: {'status': 'created', 'id'},
+        {'status': 'conflict', 'conflict_days'}, {'status': 'error', 'error'}
+        (the checker raised ValueError, e.g. unknown equipment) or
+        {'status': 'skipped'} (passed, but not written because another
+        booking failed)
+        
+    Raises:
+        sqlite3.Error: If insert fails
+    """
+    try:
+        with write_transaction() as conn:
+            checker = collision_checker(bookings) if collision_checker else None
+            results: List[Dict[str, Any]] = []
+            accepted = []
+            for booking_data in bookings:
+                if checker is not None:
+                    try:
+                        collision_days = checker.check(booking_data)
+                    except ValueError as e:
+                        # E.g. unknown equipment: not a collision
+                        logger.warning(f"Collision check rejected bulk booking: {e}")
+                        results.append({'status': 'error', 'error': str(e)})
+                        continue
+                    if collision_days:
+                        results.append({'status': 'conflict',
+                                        'conflict_days': [day.isoformat() for day in collision_days]})
+                        continue
+                    checker.add(booking_data)
+                results.append({'status': 'created'})
+                accepted.append(booking_data)
+            
+            if not accepted or (all_or_nothing and len(accepted) < len(bookings)):
+                for result in results:
+                    if result['status'] == 'created':
+                        result['status'] = 'skipped'
+                return results
+            
+            # One INSERT per booking: ids come from AUTOINCREMENT as in create_booking
+            cursor = conn.cursor()
+            new_ids = []
+            for booking_data in accepted:
+                cursor.execute('''
+                    INSERT INTO bookings 
+                    (description, tma_number, start_date, end_date, equipment_id, 
+                     project_name, project_color, note, is_blocker, text_style)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', _booking_row(booking_data))
+                new_ids.append(cursor.lastrowid)
+            cursor.executemany(DAILY_LOAD_UPSERT_SQL, [row for booking_data in accepted
+                                                       for row in _daily_load_rows(booking_data, 1)])
+            for new_id, booking_data in zip(new_ids, accepted):
+                record_change(conn, 'booking', new_id, 'insert', _booking_payload(new_id, booking_data))
+            
+            created = iter(new_ids)
+            for result in results:
+                if result['status'] == 'created':
+                    result['id'] = next(created)
+        
+        logger.info(f"Created {len(new_ids)} bookings in bulk")
+        return results
+            
+    except sqlite3.Error as e:
+        logger.error(f"Failed to create bookings in bulk: {e}")
+        raise
+
+
+def update_booking(booking_id: int, booking_data: Dict[str, Any],
+                   collision_check: Optional[CollisionCheck] = None) -> bool:
     """
     Update existing booking in database.
     
+    Like create_booking, the collision check runs in the same write
+    transaction as the update.
+    
     Args:
         booking_id: ID of booking to update
         booking_data: Dictionary with updated booking information
+        collision_check: Optional callable returning conflicting days,
+            run inside the transaction (booking_data should carry 'id')
         
     Returns:
-        bool: True if update successful
+        bool: True if update successful, False if booking does not exist
         
     Raises:
+        BookingCollisionError: If collision_check reports conflicting days
+        ValueError: If collision_check rejects the booking data
         sqlite3.Error: If update fails
     """
     try:
-        with get_db_connection() as conn:
+        with write_transaction() as conn:
             cursor = conn.cursor()
             
+            old_booking = _fetch_booking_span(cursor, booking_id)
+            if old_booking is None:
+                logger.warning(f"No booking found with id {booking_id}")
+                return False
+            _run_collision_check(collision_check, booking_data)
+            
             cursor.execute('''
                 UPDATE bookings 
                 SET description=?, tma_number=?, start_date=?, end_date=?, 
@@ -272,16 +1107,12 @@ def update_booking(booking_id: int, booking_data: Dict[str, Any]) -> bool:
                 json.dumps(booking_data.get('text_style', {})),
                 booking_id
             ))
-            
-            conn.commit()
-            rows_affected = cursor.rowcount
-            
-            if rows_affected == 0:
-                logger.warning(f"No booking found with id {booking_id}")
-                return False
-            
-            logger.info(f"Updated booking {booking_id}")
-            return True
+            apply_daily_load(cursor, old_booking, -1)
+            apply_daily_load(cursor, booking_data, 1)
+            record_change(conn, 'booking', booking_id, 'update', _booking_payload(booking_id, booking_data))
+        
+        logger.info(f"Updated booking {booking_id}")
+        return True
             
     except sqlite3.Error as e:
         logger.error(f"Failed to update booking {booking_id}: {e}")
@@ -302,18 +1133,20 @@ def delete_booking(booking_id: int) -> bool:
         sqlite3.Error: If delete fails
     """
     try:
-        with get_db_connection() as conn:
+        with write_transaction() as conn:
             cursor = conn.cursor()
-            cursor.execute('DELETE FROM bookings WHERE id=?', (booking_id,))
-            conn.commit()
             
-            rows_affected = cursor.rowcount
-            if rows_affected == 0:
+            old_booking = _fetch_booking_span(cursor, booking_id)
+            if old_booking is None:
                 logger.warning(f"No booking found with id {booking_id}")
                 return False
             
-            logger.info(f"Deleted booking {booking_id}")
-            return True
+            cursor.execute('DELETE FROM bookings WHERE id=?', (booking_id,))
+            apply_daily_load(cursor, old_booking, -1)
+            record_change(conn, 'booking', booking_id, 'delete')
+        
+        logger.info(f"Deleted booking {booking_id}")
+        return True
             
     except sqlite3.Error as e:
         logger.error(f"Failed to delete booking {booking_id}: {e}")
@@ -3,6 +3,9 @@
 Migrates data from legacy JSON files to SQLite database.
 Creates necessary tables if they don't exist.
 
+Derived data (equipment_daily_load) can be rebuilt or verified with
+rebuild_daily_load.py.
+
 Usage:
     python db_init.py
 """
@@ -12,6 +15,7 @@ import json
 import os
 import re
 from typing import Optional
+from db import rebuild_daily_load
 from config import (
     DB_PATH,
     LEGACY_BOOKINGS_FILE,
@@ -20,16 +24,9 @@ from config import (
     TMA_REGEX_PATTERN
 )
 
-def create_tables(conn: sqlite3.Connection) -> None:
-    """
-    Create database tables if they don't exist.
-    
-    Args:
-        conn: SQLite database connection
-    """
-    c = conn.cursor()
-    c.execute('''CREATE TABLE IF NOT EXISTS bookings (
-        id INTEGER PRIMARY KEY,
+# AUTOINCREMENT: IDs are assigned by SQLite and never reused after delete
+BOOKINGS_TABLE_SQL = '''CREATE TABLE {table} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
         description TEXT,
         tma_number TEXT,
         start_date TEXT,
@@ -40,7 +37,63 @@ def create_tables(conn: sqlite3.Connection) -> None:
         note TEXT,
         is_blocker INTEGER,
         text_style TEXT
-    )''')
+    )'''
+
+# Booking IDs have always started at 101
+FIRST_BOOKING_ID = 101
+
+
+def migrate_bookings_autoincrement(conn: sqlite3.Connection) -> None:
+    """
+    Switch an existing bookings table to AUTOINCREMENT IDs.
+    
+    Older databases assigned IDs as MAX(id)+1, which races under concurrent
+    inserts. The table is rebuilt with the same columns and data; indexes
+    are recreated by create_tables. Also makes sure new IDs start at
+    FIRST_BOOKING_ID or above.
+    
+    Args:
+        conn: SQLite database connection
+    """
+    c = conn.cursor()
+    c.execute("SELECT sql FROM sqlite_master WHERE type='table' AND name='bookings'")
+    if 'AUTOINCREMENT' not in c.fetchone()[0].upper():
+        conn.commit()
+        c.execute('BEGIN IMMEDIATE')
+        c.execute('ALTER TABLE bookings RENAME TO bookings_legacy')
+        c.execute(BOOKINGS_TABLE_SQL.format(table='bookings'))
+        # Copy by name so older tables with fewer columns migrate too
+        new_columns = [row[1] for row in c.execute('PRAGMA table_info(bookings)').fetchall()]
+        old_columns = {row[1] for row in c.execute('PRAGMA table_info(bookings_legacy)').fetchall()}
+        columns = ', '.join(name for name in new_columns if name in old_columns)
+        c.execute(f'INSERT INTO bookings ({columns}) SELECT {columns} FROM bookings_legacy')
+        c.execute('DROP TABLE bookings_legacy')
+        conn.commit()
+    
+    c.execute("SELECT seq FROM sqlite_sequence WHERE name='bookings'")
+    row = c.fetchone()
+    if row is None:
+        c.execute("INSERT INTO sqlite_sequence (name, seq) VALUES ('bookings', ?)", (FIRST_BOOKING_ID - 1,))
+    elif row[0] < FIRST_BOOKING_ID - 1:
+        c.execute("UPDATE sqlite_sequence SET seq = ? WHERE name='bookings'", (FIRST_BOOKING_ID - 1,))
+    conn.commit()
+
+
+def create_tables(conn: sqlite3.Connection) -> None:
+    """
+    Create database tables if they don't exist.
+    
+    Args:
+        conn: SQLite database connection
+    """
+    c = conn.cursor()
+    c.execute(BOOKINGS_TABLE_SQL.format(table='IF NOT EXISTS bookings'))
+    migrate_bookings_autoincrement(conn)
+    # Date-window queries (/api/data?from=&to=) and per-equipment lookups
+    c.execute('''CREATE INDEX IF NOT EXISTS idx_bookings_dates
+        ON bookings(start_date, end_date)''')
+    c.execute('''CREATE INDEX IF NOT EXISTS idx_bookings_equipment_start
+        ON bookings(equipment_id, start_date)''')
     c.execute('''CREATE TABLE IF NOT EXISTS equipment (
         name TEXT PRIMARY KEY,
         category TEXT,
@@ -54,7 +107,56 @@ def create_tables(conn: sqlite3.Connection) -> None:
         textColor TEXT,
         active INTEGER
     )''')
+    
+    # Temporary capacity changes (same schema as add_capacity_overrides.py);
+    # capacity lookups fail without this table
+    c.execute('''CREATE TABLE IF NOT EXISTS equipment_capacity_overrides (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        equipment_name TEXT NOT NULL,
+        start_date TEXT NOT NULL,
+        end_date TEXT NOT NULL,
+        max_tests INTEGER NOT NULL,
+        reason TEXT,
+        FOREIGN KEY (equipment_name) REFERENCES equipment(name)
+    )''')
+    c.execute('''CREATE INDEX IF NOT EXISTS idx_capacity_overrides_equipment
+        ON equipment_capacity_overrides(equipment_name)''')
+    c.execute('''CREATE INDEX IF NOT EXISTS idx_capacity_overrides_dates
+        ON equipment_capacity_overrides(start_date, end_date)''')
+    
+    # Global data version (ETag of /api/data), bumped by every write
+    c.execute('''CREATE TABLE IF NOT EXISTS version_counters (
+        name TEXT PRIMARY KEY,
+        value INTEGER NOT NULL DEFAULT 0
+    )''')
+    c.execute("INSERT OR IGNORE INTO version_counters (name, value) VALUES ('data', 0)")
+    # Version stamp of the reference cache (equipment, projects, overrides)
+    c.execute("INSERT OR IGNORE INTO version_counters (name, value) VALUES ('reference', 0)")
+    
+    # Committed writes by data version, replayed by /api/changes
+    c.execute('''CREATE TABLE IF NOT EXISTS change_log (
+        version INTEGER PRIMARY KEY,
+        entity TEXT NOT NULL,
+        entity_key TEXT NOT NULL,
+        op TEXT NOT NULL,
+        payload TEXT
+    )''')
+    
+    # Materialized per-day load, maintained by db.create/update/delete_booking
+    c.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='equipment_daily_load'")
+    daily_load_exists = c.fetchone() is not None
+    c.execute('''CREATE TABLE IF NOT EXISTS equipment_daily_load (
+        equipment_id TEXT NOT NULL,
+        day TEXT NOT NULL,
+        load INTEGER NOT NULL DEFAULT 0,
+        blocker_count INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (equipment_id, day)
+    ) WITHOUT ROWID''')
     conn.commit()
+    
+    # Backfill when upgrading a database that already has bookings
+    if not daily_load_exists:
+        rebuild_daily_load(conn)
 
 def migrate_bookings(conn: sqlite3.Connection) -> None:
     """
@@ -164,6 +266,7 @@ def main() -> None:
         migrate_bookings(conn)
         migrate_equipment(conn)
         migrate_projects(conn)
+        rebuild_daily_load(conn)
         conn.close()
         print('Migrace dat do SQLite dokončena.')
     except Exception as e:
@@ -0,0 +1,119 @@
+"""
+SQLite connection pool with one long-lived connection per thread.
+
+Opening a connection per query is expensive and, with the default rollback
+journal, readers block writers ("database is locked"). Pooled connections
+are opened once per thread in WAL mode with tuned pragmas and keep their
+prepared statement cache between requests. Connections are
+metrics.TimedConnection, so their queries are timed per request.
+
+Usage:
+    with pool.acquire() as conn:
+        conn.execute('SELECT ...')
+        conn.commit()  # Explicit commit required, uncommitted work is rolled back
+"""
+
+import logging
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator
+from config import (
+    DB_PATH, SQLITE_BUSY_TIMEOUT_MS, SQLITE_CACHE_SIZE_KB,
+    SQLITE_MMAP_SIZE, SQLITE_STATEMENT_CACHE
+)
+from metrics import TimedConnection
+
+logger = logging.getLogger(__name__)
+
+
+class ConnectionPool:
+    """Hands out one configured SQLite connection per thread."""
+    
+    def __init__(self, db_path: str = DB_PATH):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._connections: Dict[int, sqlite3.Connection] = {}
+        self._lock = threading.Lock()
+    
+    def new_connection(self) -> sqlite3.Connection:
+        """
+        Open a new connection with the pool's pragmas (not pooled).
+        
+        Returns:
+            sqlite3.Connection: Connection owned by the caller
+        """
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=SQLITE_BUSY_TIMEOUT_MS / 1000,
+            cached_statements=SQLITE_STATEMENT_CACHE,
+            check_same_thread=False,  # Lets close_all() run from any thread
+            factory=TimedConnection   # Query time/rows per request (metrics.py)
+        )
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute(f'PRAGMA busy_timeout={int(SQLITE_BUSY_TIMEOUT_MS)}')
+        conn.execute(f'PRAGMA cache_size=-{int(SQLITE_CACHE_SIZE_KB)}')
+        conn.execute(f'PRAGMA mmap_size={int(SQLITE_MMAP_SIZE)}')
+        return conn
+    
+    def connection(self) -> sqlite3.Connection:
+        """
+        Get the calling thread's connection, opening it on first use.
+        
+        Returns:
+            sqlite3.Connection: Connection with row_factory set to sqlite3.Row
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self.new_connection()
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+            self._local.depth = 0
+            with self._lock:
+                self._prune_dead_threads()
+                self._connections[threading.get_ident()] = conn
+        return conn
+    
+    @contextmanager
+    def acquire(self) -> Iterator[sqlite3.Connection]:
+        """
+        Use the thread's connection for a block of work.
+        
+        Blocks may nest (e.g. a helper called inside a transaction);
+        they all share the same connection and transaction. On error the
+        transaction is rolled back; when the outermost block exits, any
+        uncommitted work is rolled back as well.
+        
+        Yields:
+            sqlite3.Connection: The thread's pooled connection
+        """
+        conn = self.connection()
+        self._local.depth += 1
+        try:
+            yield conn
+        except Exception:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+        finally:
+            self._local.depth -= 1
+            if self._local.depth == 0 and conn.in_transaction:
+                conn.rollback()
+    
+    def close_all(self) -> None:
+        """Close every pooled connection (e.g. before deleting the database)."""
+        with self._lock:
+            for conn in self._connections.values():
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
+    
+    def _prune_dead_threads(self) -> None:
+        """Close connections of threads that no longer exist."""
+        alive = {thread.ident for thread in threading.enumerate()}
+        for ident in [ident for ident in self._connections if ident not in alive]:
+            self._connections.pop(ident).close()
+
+
+pool = ConnectionPool()
@@ -0,0 +1,185 @@
+"""
+Server-Sent Events broadcasting of committed data changes.
+
+A single pump thread per process tails the change_log table and fans each
+change out to every connected client. Because the source is the database,
+clients see writes made by any worker process, not just this one.
+
+Each client has a bounded queue. A client that falls behind by more than
+SSE_CLIENT_QUEUE_SIZE events is dropped; its EventSource reconnects with
+Last-Event-ID and the missed changes are replayed from change_log.
+
+Every stream holds a server thread, so subscribe() can refuse clients
+beyond a limit (SSE_MAX_CLIENTS in routes/sync.py).
+"""
+
+import json
+import logging
+import queue
+import threading
+from typing import Any, Dict, Iterator, Optional, Set
+from config import (
+    SSE_CLIENT_QUEUE_SIZE, SSE_HEARTBEAT_SECONDS, SSE_POLL_INTERVAL, SSE_RECONNECT_MS
+)
+from db import get_changes_since, get_data_version
+
+logger = logging.getLogger(__name__)
+
+
+class Subscriber:
+    """One connected stream client with its bounded event queue."""
+    
+    def __init__(self, maxsize: int):
+        self.queue: queue.Queue = queue.Queue(maxsize=maxsize)
+        self.dropped = False
+
+
+class ChangeBroadcaster:
+    """Fans change_log entries out to all subscribed stream clients."""
+    
+    def __init__(self, queue_size: int = SSE_CLIENT_QUEUE_SIZE,
+                 poll_interval: float = SSE_POLL_INTERVAL):
+        self.queue_size = queue_size
+        self.poll_interval = poll_interval
+        self._subscribers: Set[Subscriber] = set()
+        self._lock = threading.Lock()
+        self._pump: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+    
+    @property
+    def client_count(self) -> int:
+        """Number of currently connected clients."""
+        with self._lock:
+            return len(self._subscribers)
+    
+    def subscribe(self, limit: Optional[int] = None) -> Optional[Subscriber]:
+        """
+        Register a new client and start the pump thread if needed.
+        
+        Args:
+            limit: Maximum number of clients (None: unlimited)
+            
+        Returns:
+            Subscriber, or None if `limit` clients are already connected
+        """
+        subscriber = Subscriber(self.queue_size)
+        with self._lock:
+            if limit is not None and len(self._subscribers) >= limit:
+                return None
+            self._subscribers.add(subscriber)
+            # A pump stopping after the previous last client left keeps running
+            self._stop.clear()
+            if self._pump is None or not self._pump.is_alive():
+                self._pump = threading.Thread(target=self._run_pump, name='sse-pump', daemon=True)
+                self._pump.start()
+        return subscriber
+    
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        """Remove a client (disconnected or dropped)."""
+        with self._lock:
+            self._subscribers.discard(subscriber)
+            if not self._subscribers:
+                self._stop.set()
+    
+    def publish(self, event: Dict[str, Any]) -> None:
+        """
+        Deliver an event to every client without blocking.
+        
+        Clients whose queue is full are dropped instead of slowing
+        down everybody else.
+        """
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            try:
+                subscriber.queue.put_nowait(event)
+            except queue.Full:
+                subscriber.dropped = True
+                self.unsubscribe(subscriber)
+                logger.warning("Dropped slow stream client")
+    
+    def _run_pump(self) -> None:
+        """Poll change_log and publish new entries until no clients are left."""
+        try:
+            last_version = get_data_version()
+        except Exception as e:
+            logger.error(f"Stream pump failed to start: {e}")
+            return
+        
+        while True:
+            if self._stop.wait(self.poll_interval):
+                with self._lock:
+                    if not self._subscribers:
+                        self._pump = None
+                        return
+                    # A client subscribed again while the stop was pending
+                    self._stop.clear()
+            try:
+                if get_data_version() == last_version:
+                    continue
+                delta = get_changes_since(last_version)
+            except Exception as e:
+                logger.error(f"Stream pump failed to read changes: {e}")
+                continue
+            
+            if delta['resync']:
+                self.publish({'type': 'resync', 'version': delta['version']})
+            for change in delta['changes']:
+                self.publish({'type': 'change', **change})
+            last_version = delta['version']
+
+
+def format_sse(event: Dict[str, Any]) -> str:
+    """Serialize an event in text/event-stream format."""
+    lines = []
+    if 'version' in event:
+        lines.append(f"id: {event['version']}")
+    lines.append(f"event: {event['type']}")
+    lines.append(f"data: {json.dumps(event, ensure_ascii=False)}")
+    return '\n'.join(lines) + '\n\n'
+
+
+def stream_events(broadcaster: 'ChangeBroadcaster', subscriber: Subscriber,
+                  since: Optional[int] = None,
+                  heartbeat: float = SSE_HEARTBEAT_SECONDS) -> Iterator[str]:
+    """
+    Generate the event stream of one client.
+    
+    Args:
+        broadcaster: Broadcaster the client is subscribed to
+        subscriber: The client's subscription (unsubscribed when the stream ends)
+        since: Last version the client has seen (Last-Event-ID);
+               missed changes are replayed from change_log first
+        heartbeat: Seconds of inactivity before a keep-alive comment
+        
+    Yields:
+        str: SSE messages
+    """
+    try:
+        last_sent = since if since is not None else get_data_version()
+        yield f"retry: {SSE_RECONNECT_MS}\n\n"
+        
+        if since is not None:
+            backlog = get_changes_since(since)
+            if backlog['resync']:
+                yield format_sse({'type': 'resync', 'version': backlog['version']})
+            for change in backlog['changes']:
+                yield format_sse({'type': 'change', **change})
+            last_sent = backlog['version']
+        
+        while not subscriber.dropped:
+            try:
+                event = subscriber.queue.get(timeout=heartbeat)
+            except queue.Empty:
+                yield ": heartbeat\n\n"
+                continue
+            # Already delivered by the backlog replay
+            if event['type'] == 'change' and event['version'] <= last_sent:
+                continue
+            yield format_sse(event)
+            last_sent = event['version']
+    finally:
+        broadcaster.unsubscribe(subscriber)
+
+
+broadcaster = ChangeBroadcaster()
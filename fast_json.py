@@ -0,0 +1,207 @@
+"""
+Fast JSON encoding of /api/data.
+
+The default path builds a dict per booking in load_bookings_db (parsing
+every text_style) and serializes the result with Flask's jsonify. This
+path starts from load_booking_rows tuples instead: with orjson installed,
+the stored text_style JSON is embedded as is (orjson.Fragment), without
+a parse-and-dump round trip; without orjson the stdlib encoder is used
+and each distinct text_style value is parsed only once.
+
+Enabled by config.FAST_JSON; orjson is optional (pip install orjson).
+
+The columnar format (/api/data?format=columnar) sends bookings as
+parallel arrays: repeated strings (equipment_id, project, color, note,
+text_style) as indexes into per-payload dictionaries and dates as day
+offsets from a base date. static/calendar-layout.js decodes it back into
+the row shape.
+
+Both formats can carry the lane of each booking (layout.get_lanes).
+
+Functions:
+- encode_data: Serialize the /api/data payload to UTF-8 JSON bytes
+- columnar_bookings: Column/dictionary encoding of booking rows
+- encode_data_columnar: Serialize the columnar /api/data payload
+"""
+
+import datetime
+import json
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from db import BOOKING_FIELDS
+
+try:
+    import orjson
+except ImportError:  # Optional dependency, stdlib fallback below
+    orjson = None
+
+# Embedding pre-serialized JSON (orjson.Fragment) needs orjson >= 3.9.8
+HAS_ORJSON = orjson is not None and hasattr(orjson, 'Fragment')
+
+_ID = BOOKING_FIELDS.index('id')
+_IS_BLOCKER = BOOKING_FIELDS.index('is_blocker')
+_TEXT_STYLE = BOOKING_FIELDS.index('text_style')
+
+
+def _booking_records(rows: Iterable[Tuple[Any, ...]], convert_style: Callable[[str], Any],
+                     lanes: Optional[Dict[int, int]] = None) -> List[Dict[str, Any]]:
+    """
+    Booking dicts in BOOKING_FIELDS key order (plus 'lane' when lanes are
+    given); text_style converted once per distinct value.
+    """
+    styles: Dict[str, Any] = {}
+    records = []
+    for row in rows:
+        record = dict(zip(BOOKING_FIELDS, row))
+        record['is_blocker'] = bool(row[_IS_BLOCKER])
+        text_style = row[_TEXT_STYLE]
+        style = styles.get(text_style, styles)
+        if style is styles:
+            style = styles[text_style] = convert_style(text_style)
+        record['text_style'] = style
+        if lanes is not None:
+            record['lane'] = lanes.get(row[_ID])
+        records.append(record)
+    return records
+
+
+def _dumps(payload: Dict[str, Any], use_orjson: bool) -> bytes:
+    """Serialize a payload compactly as UTF-8 JSON."""
+    if use_orjson:
+        return orjson.dumps(payload)
+    return json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def encode_data(version: int, equipment: List[Dict[str, Any]],
+                booking_rows: Iterable[Tuple[Any, ...]], projects: List[Dict[str, Any]],
+                use_orjson: Optional[bool] = None, lanes: Optional[Dict[int, int]] = None) -> bytes:
+    """
+    Serialize the /api/data payload.
+
+    Args:
+        version: Data version
+        equipment: Equipment dictionaries
+        booking_rows: Booking tuples from db.load_booking_rows (text_style
+            must be valid JSON text)
+        projects: Project dictionaries
+        use_orjson: Force (True) or avoid (False) orjson; default uses it when installed
+        lanes: Booking id -> lane (layout.get_lanes), sent as 'lane' (null when missing)
+
+    Returns:
+        bytes: UTF-8 JSON with the same fields as the jsonify path
+    """
+    if use_orjson is None:
+        use_orjson = HAS_ORJSON
+    return _dumps({
+        "version": version,
+        "equipment": equipment,
+        "bookings": _booking_records(booking_rows, orjson.Fragment if use_orjson else json.loads, lanes),
+        "projects": projects
+    }, use_orjson)
+
+
+# Booking columns sent as indexes into a dictionary of distinct values
+DICTIONARY_COLUMNS = ('equipment_id', 'project_name', 'project_color', 'note', 'text_style')
+
+
+def _dictionary_encode(values: Iterable[Any]) -> Tuple[List[Any], List[int]]:
+    """Distinct values in first-seen order and the index of each value."""
+    index: Dict[Any, int] = {}
+    codes = [index.setdefault(value, len(index)) for value in values]
+    return list(index), codes
+
+
+def columnar_bookings(rows: List[Tuple[Any, ...]],
+                      convert_style: Callable[[str], Any] = json.loads,
+                      lanes: Optional[Dict[int, int]] = None) -> Dict[str, Any]:
+    """
+    Encode booking rows column by column.
+
+    Args:
+        rows: Booking tuples from db.load_booking_rows
+        convert_style: Turns text_style JSON text into a serializable value
+        lanes: Booking id -> lane (layout.get_lanes), sent as a 'lane' column
+
+    Returns:
+        Dict with 'count', 'base_date' (earliest start, None without
+        bookings), 'columns' (id, start, end as day offsets from base_date,
+        description, tma_number, is_blocker as 0/1, lane when lanes are
+        given (null when missing), and dictionary indexes
+        for DICTIONARY_COLUMNS), 'dictionaries' and 'raw_dates' (row index
+        -> [start_date, end_date] for dates that are not valid ISO dates;
+        their offsets are null)
+    """
+    columns = dict(zip(BOOKING_FIELDS, zip(*rows))) if rows else {field: () for field in BOOKING_FIELDS}
+
+    # Few distinct dates: parse each once
+    ordinals: Dict[Any, Optional[int]] = {}
+    for day in set(columns['start_date']) | set(columns['end_date']):
+        try:
+            ordinals[day] = datetime.date.fromisoformat(day).toordinal()
+        except (TypeError, ValueError):
+            ordinals[day] = None
+    valid_starts = [ordinals[day] for day in set(columns['start_date']) if ordinals[day] is not None]
+    base = min(valid_starts) if valid_starts else None
+
+    def offsets(days: Iterable[Any]) -> List[Optional[int]]:
+        return [None if ordinals[day] is None else ordinals[day] - base for day in days]
+
+    raw_dates = {}
+    if None in ordinals.values():
+        raw_dates = {
+            str(index): [start, end]
+            for index, (start, end) in enumerate(zip(columns['start_date'], columns['end_date']))
+            if ordinals[start] is None or ordinals[end] is None
+        }
+
+    encoded: Dict[str, Any] = {
+        'id': list(columns['id']),
+        'start': offsets(columns['start_date']),
+        'end': offsets(columns['end_date']),
+        'description': list(columns['description']),
+        'tma_number': list(columns['tma_number']),
+        'is_blocker': [1 if blocker else 0 for blocker in columns['is_blocker']]
+    }
+    if lanes is not None:
+        encoded['lane'] = [lanes.get(booking_id) for booking_id in columns['id']]
+    dictionaries: Dict[str, List[Any]] = {}
+    for field in DICTIONARY_COLUMNS:
+        dictionaries[field], encoded[field] = _dictionary_encode(columns[field])
+    dictionaries['text_style'] = [convert_style(style) for style in dictionaries['text_style']]
+
+    return {
+        'count': len(rows),
+        'base_date': datetime.date.fromordinal(base).isoformat() if base is not None else None,
+        'columns': encoded,
+        'dictionaries': dictionaries,
+        'raw_dates': raw_dates
+    }
+
+
+def encode_data_columnar(version: int, equipment: List[Dict[str, Any]],
+                         booking_rows: List[Tuple[Any, ...]], projects: List[Dict[str, Any]],
+                         use_orjson: Optional[bool] = None,
+                         lanes: Optional[Dict[int, int]] = None) -> bytes:
+    """
+    Serialize the /api/data payload with bookings in columnar form.
+
+    Args:
+        version: Data version
+        equipment: Equipment dictionaries
+        booking_rows: Booking tuples from db.load_booking_rows
+        projects: Project dictionaries
+        use_orjson: Force (True) or avoid (False) orjson; default uses it when installed
+        lanes: Booking id -> lane (layout.get_lanes)
+
+    Returns:
+        bytes: UTF-8 JSON with 'format': 'columnar' and bookings as
+        returned by columnar_bookings
+    """
+    if use_orjson is None:
+        use_orjson = HAS_ORJSON
+    return _dumps({
+        "version": version,
+        "format": "columnar",
+        "equipment": equipment,
+        "bookings": columnar_bookings(booking_rows, orjson.Fragment if use_orjson else json.loads, lanes),
+        "projects": projects
+    }, use_orjson)
@@ -0,0 +1,21 @@
+"""
+gunicorn settings for Booking Planner (values from config.py).
+
+Usage:
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Threaded workers (gthread): each open /api/stream connection holds one
+thread, so sync workers would be blocked by a single calendar tab.
+The app is not preloaded: SQLite connections must not be shared across fork.
+"""
+
+from config import APP_HOST, APP_PORT, SERVER_WORKERS, SERVER_THREADS, SERVER_TIMEOUT
+
+bind = f'{APP_HOST}:{APP_PORT}'
+workers = SERVER_WORKERS
+worker_class = 'gthread'
+threads = SERVER_THREADS
+timeout = SERVER_TIMEOUT
+graceful_timeout = 30
+keepalive = 5
+accesslog = '-'
@@ -0,0 +1,132 @@
+"""
+Calendar bar layout: lane assignment of overlapping bookings.
+
+Bookings of one equipment_id are drawn in one calendar row; overlapping
+bookings are stacked into lanes. Bookings of a row form an interval
+graph, so visiting them by start day and giving each the lowest lane
+whose previous booking has already ended (first fit) needs the minimum
+number of lanes, the maximum overlap. static/calendar-layout.js uses the
+same rule for rows it has to lay out itself (bookings changed since load).
+
+Lanes are computed once per data version and date window and sent as
+the 'lane' field of /api/data bookings.
+
+Functions:
+- assign_lanes: Lane of each booking, per equipment_id
+- get_lanes: Same for the database, cached per data version
+"""
+
+import datetime
+import heapq
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from config import LANES_CACHE_SIZE
+from db import get_db_connection, get_data_version
+
+logger = logging.getLogger(__name__)
+
+
+def _parse_ordinal(day: Any, memo: Dict[Any, Optional[int]]) -> Optional[int]:
+    """Ordinal of an ISO date (None if invalid), memoized."""
+    if day in memo:
+        return memo[day]
+    try:
+        ordinal = datetime.date.fromisoformat(day).toordinal()
+    except (TypeError, ValueError):
+        ordinal = None
+    memo[day] = ordinal
+    return ordinal
+
+
+def assign_lanes(bookings: Iterable[Tuple[int, Optional[str], str, str]]) -> Dict[int, int]:
+    """
+    Assign lanes to bookings, independently per equipment_id.
+
+    Args:
+        bookings: (id, equipment_id, start_date, end_date) tuples
+
+    Returns:
+        Dict booking id -> lane (0 is the top lane); bookings with invalid
+        dates get no lane
+    """
+    rows: Dict[Optional[str], List[Tuple[int, int, int]]] = {}
+    # Few distinct dates: parse each once
+    ordinals: Dict[Any, Optional[int]] = {}
+    for booking_id, equipment_id, start_date, end_date in bookings:
+        first = _parse_ordinal(start_date, ordinals)
+        last = _parse_ordinal(end_date, ordinals)
+        if first is None or last is None:
+            continue
+        intervals = rows.get(equipment_id)
+        if intervals is None:
+            intervals = rows[equipment_id] = []
+        intervals.append((first, last, booking_id))
+
+    lanes: Dict[int, int] = {}
+    for intervals in rows.values():
+        intervals.sort()
+        busy: List[Tuple[int, int]] = []  # Heap of (last day, lane)
+        free: List[int] = []              # Heap of lanes whose booking has ended
+        for first, last, booking_id in intervals:
+            while busy and busy[0][0] < first:
+                heapq.heappush(free, heapq.heappop(busy)[1])
+            lane = heapq.heappop(free) if free else len(busy)
+            heapq.heappush(busy, (last, lane))
+            lanes[booking_id] = lane
+    return lanes
+
+
+_cache: 'OrderedDict[Tuple[Any, ...], Dict[int, int]]' = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def get_lanes(date_from: Optional[str] = None, date_to: Optional[str] = None) -> Dict[int, int]:
+    """
+    Lanes of the bookings in a date window, cached per data version.
+
+    Args:
+        date_from: Only bookings ending on or after this ISO date
+        date_to: Only bookings starting on or before this ISO date
+
+    Returns:
+        Dict booking id -> lane, as returned by assign_lanes (shared, do not modify)
+    """
+    # Version first: data read afterwards is at least as new
+    version = get_data_version()
+    key = (version, date_from, date_to)
+    with _cache_lock:
+        lanes = _cache.get(key)
+        if lanes is not None:
+            _cache.move_to_end(key)
+            return lanes
+
+    conditions = []
+    params: List[str] = []
+    if date_from:
+        conditions.append('end_date >= ?')
+        params.append(date_from)
+    if date_to:
+        conditions.append('start_date <= ?')
+        params.append(date_to)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.row_factory = None  # Plain tuples, faster for bulk reads
+        rows = cursor.execute(f'''
+            SELECT id, equipment_id, start_date, end_date
+            FROM bookings
+            {where}
+        ''', params).fetchall()
+    lanes = assign_lanes(rows)
+    logger.info(f"Assigned lanes v{version} {date_from}..{date_to} to {len(lanes)} bookings")
+
+    with _cache_lock:
+        # Older versions can never be requested again
+        for stale in [cached for cached in _cache if cached[0] < version]:
+            del _cache[stale]
+        _cache[key] = lanes
+        while len(_cache) > LANES_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return lanes
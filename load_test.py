@@ -0,0 +1,277 @@
+"""
+Load test for a running Booking Planner server.
+
+Drives /api/data (whole year, as the calendar loads it) and /api/bookings
+(random one-week windows) concurrently, optionally mixed with booking
+writes, and reports latency percentiles and throughput per endpoint.
+
+Bookings written by the test are placed in a year far in the future
+(--write-year) and deleted again at the end of the run.
+
+Usage:
+    python load_test.py --url http://127.0.0.1:5000 [--threads 16] [--seconds 20]
+    python load_test.py --local [--equipment 50] [--bookings 20000]   # temporary database
+    python load_test.py --url ... --write-ratio 0.05                    # 5 % POST /api/bookings
+"""
+
+import argparse
+import datetime
+import gzip
+import http.client
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+# Response time samples of one endpoint: (seconds, success)
+Samples = List[Tuple[float, bool]]
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile of an ascending list (0 for an empty one)."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(q * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def start_local_server(equipment: int, bookings: int) -> Tuple[str, Callable[[], None]]:
+    """
+    Seed a temporary database and serve the app on a random local port.
+    
+    Uses waitress (as wsgi.py does) when installed, otherwise the threaded
+    Werkzeug server.
+    
+    Returns:
+        Tuple of base URL and a function that stops the server
+    """
+    # Must be set before the app (and config) is imported
+    os.environ['BOOKING_PLANNER_DB'] = os.path.join(tempfile.mkdtemp(), 'load_test.db')
+    from benchmark import seed_database, start_server
+    seed_database(equipment, bookings, start=datetime.date(datetime.date.today().year, 1, 1))
+    
+    try:
+        from waitress import create_server
+    except ImportError:
+        server = start_server()
+        print('waitress není nainstalován, lokální server: Werkzeug (threaded)')
+        return f'http://127.0.0.1:{server.server_port}', server.shutdown
+    
+    from app_main import app
+    from config import SERVER_THREADS
+    server = create_server(app, host='127.0.0.1', port=0, threads=SERVER_THREADS)
+    threading.Thread(target=server.run, daemon=True).start()
+    print(f'Lokální server: waitress, {SERVER_THREADS} vláken')
+    return f'http://127.0.0.1:{server.effective_port}', server.close
+
+
+class LoadTest:
+    """Request mix and per-endpoint results of one load test run."""
+    
+    def __init__(self, url: str, year: int, write_year: int, write_ratio: float):
+        parts = urlsplit(url)
+        self.host = parts.hostname or '127.0.0.1'
+        self.port = parts.port or (443 if parts.scheme == 'https' else 80)
+        self.https = parts.scheme == 'https'
+        self.year = year
+        self.write_year = write_year
+        self.write_ratio = write_ratio
+        self.equipment: List[str] = []
+        self.created: List[int] = []
+        self.lock = threading.Lock()
+    
+    def connect(self) -> http.client.HTTPConnection:
+        """Open a keep-alive connection to the server."""
+        if self.https:
+            return http.client.HTTPSConnection(self.host, self.port, timeout=60)
+        return http.client.HTTPConnection(self.host, self.port, timeout=60)
+    
+    def request(self, conn: http.client.HTTPConnection, method: str, path: str,
+                body: Optional[dict] = None) -> Tuple[int, bytes]:
+        """Send one request like the browser does (gzip accepted), returns status and decoded body."""
+        headers = {'Accept-Encoding': 'gzip'}
+        payload = None
+        if body is not None:
+            payload = json.dumps(body)
+            headers['Content-Type'] = 'application/json'
+        conn.request(method, path, payload, headers)
+        response = conn.getresponse()
+        body = response.read()
+        if response.getheader('Content-Encoding') == 'gzip':
+            body = gzip.decompress(body)
+        return response.status, body
+    
+    def prepare(self) -> None:
+        """Load the equipment names used by writes."""
+        conn = self.connect()
+        try:
+            status, body = self.request(conn, 'GET', '/api/equipment')
+        finally:
+            conn.close()
+        if status != 200:
+            raise RuntimeError(f'GET /api/equipment vrátil {status}')
+        self.equipment = [item['name'] for item in json.loads(body)['equipment']]
+    
+    def read_data(self, conn: http.client.HTTPConnection, rng: random.Random) -> bool:
+        status, _ = self.request(conn, 'GET', f'/api/data?from={self.year}-01-01&to={self.year}-12-31')
+        return status == 200
+    
+    def read_bookings(self, conn: http.client.HTTPConnection, rng: random.Random) -> bool:
+        first = datetime.date(self.year, 1, 1) + datetime.timedelta(days=rng.randrange(365))
+        last = first + datetime.timedelta(days=6)
+        status, _ = self.request(conn, 'GET', f'/api/bookings?from={first.isoformat()}&to={last.isoformat()}')
+        return status == 200
+    
+    def write_booking(self, conn: http.client.HTTPConnection, rng: random.Random) -> bool:
+        if not self.equipment:
+            return False
+        first = datetime.date(self.write_year, 1, 1) + datetime.timedelta(days=rng.randrange(360))
+        status, body = self.request(conn, 'POST', '/api/bookings', {
+            'description': 'Load test',
+            'equipment_id': rng.choice(self.equipment),
+            'start_date': first.isoformat(),
+            'end_date': (first + datetime.timedelta(days=rng.randint(0, 4))).isoformat(),
+            'is_blocker': False
+        })
+        if status == 201:
+            with self.lock:
+                self.created.append(json.loads(body)['id'])
+        # 409: capacity reached, a valid answer under load
+        return status in (201, 409)
+    
+    def pick(self, rng: random.Random) -> Tuple[str, Callable[[http.client.HTTPConnection, random.Random], bool]]:
+        """Choose the next request: writes by --write-ratio, reads split evenly."""
+        if self.write_ratio and rng.random() < self.write_ratio:
+            return 'POST /api/bookings', self.write_booking
+        if rng.random() < 0.5:
+            return 'GET /api/data', self.read_data
+        return 'GET /api/bookings', self.read_bookings
+    
+    def run(self, threads: int, seconds: float) -> Tuple[Dict[str, Samples], float]:
+        """
+        Run client threads for a fixed time, each on its own keep-alive connection.
+        
+        Returns:
+            Tuple of samples per endpoint and elapsed seconds
+        """
+        deadline = time.perf_counter() + seconds
+        results: List[Dict[str, Samples]] = [{} for _ in range(threads)]
+        
+        def loop(index: int) -> None:
+            rng = random.Random(index)
+            conn = self.connect()
+            samples = results[index]
+            while time.perf_counter() < deadline:
+                label, send = self.pick(rng)
+                started = time.perf_counter()
+                try:
+                    ok = send(conn, rng)
+                except (OSError, http.client.HTTPException, ValueError):
+                    conn.close()
+                    conn = self.connect()
+                    ok = False
+                samples.setdefault(label, []).append((time.perf_counter() - started, ok))
+            conn.close()
+        
+        started = time.perf_counter()
+        pool = [threading.Thread(target=loop, args=(i,)) for i in range(threads)]
+        for thread in pool:
+            thread.start()
+        for thread in pool:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        
+        merged: Dict[str, Samples] = {}
+        for samples in results:
+            for label, values in samples.items():
+                merged.setdefault(label, []).extend(values)
+        return merged, elapsed
+    
+    def cleanup(self) -> int:
+        """Delete bookings created by the test, returns how many were deleted."""
+        deleted = 0
+        conn = self.connect()
+        try:
+            for booking_id in self.created:
+                status, _ = self.request(conn, 'DELETE', f'/api/bookings/{booking_id}')
+                deleted += status == 200
+        finally:
+            conn.close()
+        return deleted
+
+
+def report(samples: Dict[str, Samples], elapsed: float) -> Dict[str, Dict[str, float]]:
+    """
+    Print and return latency percentiles and throughput per endpoint.
+    
+    Returns:
+        Dict label -> {requests, errors, rps, p50, p95, p99, max} (latencies in ms)
+    """
+    rows = dict(samples)
+    rows['celkem'] = [sample for values in samples.values() for sample in values]
+    summary = {}
+    print(f"  {'endpoint':20s} {'požadavků':>9s} {'chyb':>6s} {'req/s':>8s} "
+          f"{'p50 ms':>8s} {'p95 ms':>8s} {'p99 ms':>8s} {'max ms':>8s}")
+    for label, values in rows.items():
+        times = sorted(seconds * 1000 for seconds, _ in values)
+        stats = {
+            'requests': len(values),
+            'errors': sum(1 for _, ok in values if not ok),
+            'rps': len(values) / elapsed,
+            'p50': percentile(times, 0.50),
+            'p95': percentile(times, 0.95),
+            'p99': percentile(times, 0.99),
+            'max': times[-1] if times else 0.0
+        }
+        summary[label] = stats
+        print(f"  {label:20s} {stats['requests']:9d} {stats['errors']:6d} {stats['rps']:8.1f} "
+              f"{stats['p50']:8.1f} {stats['p95']:8.1f} {stats['p99']:8.1f} {stats['max']:8.1f}")
+    return summary
+
+
+def main() -> int:
+    """Parse arguments, run the load test and print the report."""
+    parser = argparse.ArgumentParser(description='Booking Planner load test')
+    parser.add_argument('--url', default='http://127.0.0.1:5000', help='base URL of a running server')
+    parser.add_argument('--local', action='store_true', help='start the app on a temporary seeded database')
+    parser.add_argument('--threads', type=int, default=16, help='concurrent clients')
+    parser.add_argument('--seconds', type=float, default=20)
+    parser.add_argument('--year', type=int, default=datetime.date.today().year, help='year read by the calendar')
+    parser.add_argument('--write-ratio', type=float, default=0.0, help='share of POST /api/bookings (0-1)')
+    parser.add_argument('--write-year', type=int, default=2099, help='year of test bookings (deleted afterwards)')
+    parser.add_argument('--equipment', type=int, default=50, help='--local: equipment count')
+    parser.add_argument('--bookings', type=int, default=20000, help='--local: booking count')
+    args = parser.parse_args()
+    
+    stop = None
+    url = args.url
+    if args.local:
+        url, stop = start_local_server(args.equipment, args.bookings)
+    
+    test = LoadTest(url, args.year, args.write_year, args.write_ratio)
+    try:
+        if args.write_ratio:
+            test.prepare()
+        print(f'Server {url}: {args.threads} klientů, {args.seconds:g} s, podíl zápisů {args.write_ratio:g}')
+        samples, elapsed = test.run(args.threads, args.seconds)
+        summary = report(samples, elapsed)
+        if test.created:
+            print(f'Smazáno testovacích rezervací: {test.cleanup()} z {len(test.created)}')
+    except (OSError, http.client.HTTPException, RuntimeError) as e:
+        print(f'Chyba: {e}', file=sys.stderr)
+        return 1
+    finally:
+        if stop:
+            stop()
+    return 1 if summary['celkem']['errors'] else 0
+
+
+if __name__ == '__main__':
+    import logging
+    logging.disable(logging.INFO)
+    sys.exit(main())
@@ -0,0 +1,363 @@
+"""
+Request metrics: latency, SQL queries and rows per endpoint.
+
+The request hooks (routes/metrics.py) open a RequestStats for each request
+on its thread. Pooled SQLite connections (db_pool.py) are TimedConnections,
+whose cursors report every statement and fetch to the stats of the calling
+thread, so query count, SQL time and rows returned are attributed to the
+request without touching the query code. Finished requests are added to
+process-wide counters and histograms, rendered as Prometheus text at
+/metrics; requests slower than SLOW_REQUEST_SECONDS are logged with their
+query breakdown.
+
+Metrics are kept per process: under gunicorn every worker reports its own
+numbers (scrape the workers individually). Rows are counted by
+fetchone/fetchmany/fetchall, the only ways the code reads results.
+Work done outside a request (streamed response bodies, background
+threads) is not attributed.
+
+Classes:
+- RequestStats: Timing and queries of one request
+- TimedConnection / TimedCursor: sqlite3 classes reporting to RequestStats
+- Counter / Gauge / Histogram: Labelled Prometheus metrics
+
+Functions:
+- start_request / finish_request: Open and close the stats of the thread
+- observe_request: Add a finished request to the metrics, log it if slow
+- render_metrics: All metrics in the Prometheus text format
+"""
+
+import bisect
+import logging
+import math
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from config import (
+    METRICS_LATENCY_BUCKETS, METRICS_QUERY_BUCKETS, SLOW_REQUEST_SECONDS,
+    SLOW_REQUEST_TOP_QUERIES
+)
+
+logger = logging.getLogger(__name__)
+
+_local = threading.local()
+
+
+class RequestStats:
+    """Timing and SQL queries of one request."""
+
+    __slots__ = ('started', 'queries', 'sql_seconds', 'rows', 'statements')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.sql_seconds = 0.0
+        self.rows = 0
+        # SQL text -> [executions, seconds, rows]
+        self.statements: Dict[str, List[Any]] = {}
+
+    def add(self, sql: str, seconds: float, rows: int = 0, executed: bool = False) -> None:
+        """Record an execute (executed=True) or a fetch of a statement."""
+        entry = self.statements.get(sql)
+        if entry is None:
+            entry = self.statements[sql] = [0, 0.0, 0]
+        if executed:
+            entry[0] += 1
+            self.queries += 1
+        entry[1] += seconds
+        entry[2] += rows
+        self.sql_seconds += seconds
+        self.rows += rows
+
+    def breakdown(self, limit: int = SLOW_REQUEST_TOP_QUERIES) -> List[Tuple[str, int, float, int]]:
+        """
+        Statements by time spent, most expensive first.
+
+        Returns:
+            List of (whitespace-collapsed SQL, executions, seconds, rows)
+        """
+        ranked = sorted(self.statements.items(), key=lambda item: item[1][1], reverse=True)
+        return [(' '.join(sql.split()), count, seconds, rows)
+                for sql, (count, seconds, rows) in ranked[:limit]]
+
+
+class TimedCursor(sqlite3.Cursor):
+    """Cursor reporting statement and fetch times to the thread's RequestStats."""
+
+    _sql = ''  # Statement the fetched rows belong to
+
+    def execute(self, sql: str, parameters: Any = ()) -> 'TimedCursor':
+        stats = getattr(_local, 'stats', None)
+        if stats is None:
+            return super().execute(sql, parameters)
+        self._sql = sql
+        started = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            stats.add(sql, time.perf_counter() - started, executed=True)
+
+    def executemany(self, sql: str, seq_of_parameters: Iterable[Any]) -> 'TimedCursor':
+        stats = getattr(_local, 'stats', None)
+        if stats is None:
+            return super().executemany(sql, seq_of_parameters)
+        self._sql = sql
+        started = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            stats.add(sql, time.perf_counter() - started, executed=True)
+
+    def executescript(self, sql_script: str) -> 'TimedCursor':
+        stats = getattr(_local, 'stats', None)
+        if stats is None:
+            return super().executescript(sql_script)
+        started = time.perf_counter()
+        try:
+            return super().executescript(sql_script)
+        finally:
+            stats.add(sql_script, time.perf_counter() - started, executed=True)
+
+    def fetchone(self) -> Any:
+        stats = getattr(_local, 'stats', None)
+        if stats is None:
+            return super().fetchone()
+        started = time.perf_counter()
+        row = super().fetchone()
+        stats.add(self._sql, time.perf_counter() - started, 0 if row is None else 1)
+        return row
+
+    def fetchmany(self, size: Optional[int] = None) -> List[Any]:
+        stats = getattr(_local, 'stats', None)
+        if size is None:
+            size = self.arraysize
+        if stats is None:
+            return super().fetchmany(size)
+        started = time.perf_counter()
+        rows = super().fetchmany(size)
+        stats.add(self._sql, time.perf_counter() - started, len(rows))
+        return rows
+
+    def fetchall(self) -> List[Any]:
+        stats = getattr(_local, 'stats', None)
+        if stats is None:
+            return super().fetchall()
+        started = time.perf_counter()
+        rows = super().fetchall()
+        stats.add(self._sql, time.perf_counter() - started, len(rows))
+        return rows
+
+
+class TimedConnection(sqlite3.Connection):
+    """
+    Connection whose cursors are TimedCursors (sqlite3.connect factory).
+
+    Connection.execute* create a base cursor internally, so they are
+    routed through cursor() here; commits are timed as 'COMMIT'.
+    """
+
+    def cursor(self, factory: type = TimedCursor) -> sqlite3.Cursor:
+        return super().cursor(factory)
+
+    def execute(self, sql: str, parameters: Any = ()) -> sqlite3.Cursor:
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql: str, seq_of_parameters: Iterable[Any]) -> sqlite3.Cursor:
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def executescript(self, sql_script: str) -> sqlite3.Cursor:
+        return self.cursor().executescript(sql_script)
+
+    def commit(self) -> None:
+        stats = getattr(_local, 'stats', None)
+        if stats is None:
+            return super().commit()
+        started = time.perf_counter()
+        try:
+            return super().commit()
+        finally:
+            stats.add('COMMIT', time.perf_counter() - started, executed=True)
+
+
+def _format_value(value: float) -> str:
+    """Sample value in Prometheus text format."""
+    if value == math.inf:
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...]) -> str:
+    """{name="value",...} with escaped values ('' without labels)."""
+    if not names:
+        return ''
+    pairs = []
+    for name, value in zip(names, values):
+        escaped = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        pairs.append(f'{name}="{escaped}"')
+    return '{' + ','.join(pairs) + '}'
+
+
+class Counter:
+    """Monotonic counter per label values."""
+
+    kind = 'counter'
+
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels: Tuple[str, ...] = (), amount: float = 1) -> None:
+        """Add amount to the counter of the label values."""
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        """HELP, TYPE and sample lines."""
+        with self._lock:
+            values = sorted(self._values.items())
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} {self.kind}']
+        for labels, value in values:
+            lines.append(f'{self.name}{_format_labels(self.label_names, labels)} {_format_value(value)}')
+        return lines
+
+
+class Gauge(Counter):
+    """Value that goes up and down per label values (inc with a negative amount)."""
+
+    kind = 'gauge'
+
+    def set(self, labels: Tuple[str, ...], value: float) -> None:
+        """Replace the value of the label values."""
+        with self._lock:
+            self._values[labels] = value
+
+
+class Histogram:
+    """Cumulative bucket counts, sum and count per label values."""
+
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...],
+                 buckets: Iterable[float]):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # Label values -> [per-bucket counts..., sum, count]
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels: Tuple[str, ...], value: float) -> None:
+        """Add one observation."""
+        bucket = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(labels)
+            if series is None:
+                series = self._values[labels] = [0] * (len(self.buckets) + 2)
+            series[bucket] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> List[str]:
+        """HELP, TYPE, cumulative _bucket, _sum and _count lines."""
+        with self._lock:
+            values = sorted((labels, list(series)) for labels, series in self._values.items())
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        names = self.label_names + ('le',)
+        for labels, series in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                label_text = _format_labels(names, labels + (_format_value(bound),))
+                lines.append(f'{self.name}_bucket{label_text} {cumulative}')
+            label_text = _format_labels(self.label_names, labels)
+            lines.append(f'{self.name}_sum{label_text} {_format_value(series[-2])}')
+            lines.append(f'{self.name}_count{label_text} {series[-1]}')
+        return lines
+
+
+_LABELS = ('method', 'endpoint')
+
+REQUESTS = Counter('booking_planner_requests_total', 'Finished HTTP requests.',
+                   ('method', 'endpoint', 'status'))
+REQUEST_SECONDS = Histogram('booking_planner_request_duration_seconds',
+                            'Time from request start to response (without streamed bodies).',
+                            _LABELS, METRICS_LATENCY_BUCKETS)
+SQL_SECONDS = Histogram('booking_planner_request_sql_seconds',
+                        'SQL execute, fetch and commit time per request.', _LABELS, METRICS_LATENCY_BUCKETS)
+SQL_QUERIES = Histogram('booking_planner_request_sql_queries', 'SQL statements executed per request.',
+                        _LABELS, METRICS_QUERY_BUCKETS)
+SQL_ROWS = Counter('booking_planner_sql_rows_total', 'Rows fetched from SQLite.', _LABELS)
+SLOW_REQUESTS = Counter('booking_planner_slow_requests_total',
+                        f'Requests slower than {SLOW_REQUEST_SECONDS:g} s (logged with their queries).', _LABELS)
+IN_FLIGHT = Gauge('booking_planner_requests_in_flight', 'Requests being handled.')
+
+
+def start_request() -> RequestStats:
+    """Start collecting stats of the request handled by the calling thread."""
+    stats = _local.stats = RequestStats()
+    IN_FLIGHT.inc()
+    return stats
+
+
+def finish_request() -> Optional[RequestStats]:
+    """
+    Stop collecting stats of the thread's request.
+
+    Returns:
+        RequestStats, or None if the request was not started or is already finished
+    """
+    stats = getattr(_local, 'stats', None)
+    if stats is not None:
+        _local.stats = None
+        IN_FLIGHT.inc(amount=-1)
+    return stats
+
+
+def observe_request(stats: RequestStats, method: str, endpoint: str, path: str, status: int) -> float:
+    """
+    Add a finished request to the metrics and log it if it was slow.
+
+    Args:
+        stats: Stats returned by finish_request
+        method: HTTP method
+        endpoint: URL rule (e.g. /api/bookings/<int:booking_id>), bounded label
+        path: Requested path, for the slow request log
+        status: Response status code
+
+    Returns:
+        float: Request duration in seconds
+    """
+    duration = time.perf_counter() - stats.started
+    labels = (method, endpoint)
+    REQUESTS.inc((method, endpoint, str(status)))
+    REQUEST_SECONDS.observe(labels, duration)
+    SQL_SECONDS.observe(labels, stats.sql_seconds)
+    SQL_QUERIES.observe(labels, stats.queries)
+    if stats.rows:
+        SQL_ROWS.inc(labels, stats.rows)
+
+    if duration >= SLOW_REQUEST_SECONDS:
+        SLOW_REQUESTS.inc(labels)
+        lines = [f"Slow request {method} {path} -> {status}: {duration * 1000:.0f} ms, "
+                 f"{stats.queries} queries in {stats.sql_seconds * 1000:.0f} ms, {stats.rows} rows"]
+        for sql, count, seconds, rows in stats.breakdown():
+            lines.append(f"  {seconds * 1000:8.1f} ms {count:4d}x {rows:7d} rows  {sql[:200]}")
+        logger.warning('\n'.join(lines))
+    return duration
+
+
+def render_metrics(extra: Iterable[Any] = ()) -> str:
+    """
+    All request metrics (plus extra Counter/Gauge/Histogram objects) as
+    Prometheus text exposition format 0.0.4.
+    """
+    lines: List[str] = []
+    for metric in (REQUESTS, REQUEST_SECONDS, SQL_SECONDS, SQL_QUERIES, SQL_ROWS, SLOW_REQUESTS,
+                   IN_FLIGHT, *extra):
+        lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
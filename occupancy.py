@@ -0,0 +1,287 @@
+"""
+Occupancy engine for equipment capacity checks.
+
+Builds interval start/end events for one equipment once and answers
+load queries over a date window with a single sweep, instead of
+rescanning all bookings for every day of the window. Used by the
+availability search (utils.find_available_windows); booking writes check
+capacity against the equipment_daily_load table.
+
+Classes:
+- EquipmentOccupancy: Sorted booking intervals of one equipment_id
+- LabIndex: Equipment by base name and occupancy by equipment_id, updatable in place
+
+Functions:
+- find_free_windows: Earliest windows of N days where load stays below capacity
+"""
+
+import bisect
+import datetime
+from typing import Dict, List, Any, Iterable, Optional, Tuple
+
+
+def parse_interval(booking: Dict[str, Any]) -> Optional[Tuple[int, int]]:
+    """
+    Convert booking dates to an inclusive interval of day ordinals.
+
+    Args:
+        booking: Booking dictionary with ISO start_date and end_date
+
+    Returns:
+        Tuple (start_ordinal, end_ordinal), or None if dates are invalid
+    """
+    try:
+        start = datetime.date.fromisoformat(booking['start_date']).toordinal()
+        end = datetime.date.fromisoformat(booking['end_date']).toordinal()
+    except (KeyError, TypeError, ValueError):
+        return None
+    return start, end
+
+
+class EquipmentOccupancy:
+    """
+    Booking intervals of a single equipment_id, sorted by start day.
+
+    Blockers are left out, they never count towards load (same capacity
+    rules as utils.find_collision_days_db).
+    """
+
+    def __init__(self, bookings: Iterable[Dict[str, Any]] = ()):
+        """
+        Args:
+            bookings: Bookings that belong to this equipment_id
+        """
+        intervals = []
+        for booking in bookings:
+            if booking.get('is_blocker', False):
+                continue
+            interval = parse_interval(booking)
+            if interval is not None:
+                intervals.append(interval)
+        intervals.sort()
+        self.starts = [start for start, _ in intervals]
+        self.ends = [end for _, end in intervals]
+        # Longest interval bounds how far back an overlapping start can be
+        # (an upper bound: remove() does not shrink it)
+        self.max_length = max((end - start for start, end in intervals), default=0)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def add(self, start: int, end: int) -> None:
+        """
+        Insert an interval, keeping the arrays sorted.
+
+        Args:
+            start: First day ordinal
+            end: Last day ordinal
+        """
+        index = bisect.bisect_right(self.starts, start)
+        self.starts.insert(index, start)
+        self.ends.insert(index, end)
+        self.max_length = max(self.max_length, end - start)
+
+    def remove(self, start: int, end: int) -> bool:
+        """
+        Remove one interval equal to (start, end).
+
+        Returns:
+            bool: False if no such interval was stored
+        """
+        lo = bisect.bisect_left(self.starts, start)
+        hi = bisect.bisect_right(self.starts, start)
+        for index in range(lo, hi):
+            if self.ends[index] == end:
+                del self.starts[index]
+                del self.ends[index]
+                return True
+        return False
+
+    def load_segments(self, start: int, end: int) -> List[Tuple[int, int, int]]:
+        """
+        Describe load over an inclusive window as constant-load segments.
+
+        Work is proportional to the number of overlapping bookings, not to
+        the number of days, which keeps multi-year windows cheap.
+
+        Args:
+            start: First day ordinal of the window
+            end: Last day ordinal of the window
+
+        Returns:
+            List of (first_ordinal, last_ordinal, load) covering the window
+        """
+        if end < start:
+            return []
+        events: Dict[int, int] = {start: 0}
+        lo = bisect.bisect_left(self.starts, start - self.max_length)
+        hi = bisect.bisect_right(self.starts, end)
+        for i in range(lo, hi):
+            interval_end = self.ends[i]
+            if interval_end < start:
+                continue
+            first = max(self.starts[i], start)
+            events[first] = events.get(first, 0) + 1
+            if interval_end < end:
+                events[interval_end + 1] = events.get(interval_end + 1, 0) - 1
+
+        points = sorted(events)
+        segments = []
+        running = 0
+        for index, point in enumerate(points):
+            running += events[point]
+            last = points[index + 1] - 1 if index + 1 < len(points) else end
+            segments.append((point, last, running))
+        return segments
+
+
+def find_free_windows(load_segments: List[Tuple[int, int, int]],
+                      capacity_segments: List[Tuple[int, int, int]],
+                      days: int, limit: int) -> List[Tuple[int, int]]:
+    """
+    Find the earliest windows of consecutive days with spare capacity.
+
+    Both inputs are sorted (first_ordinal, last_ordinal, value) segments
+    covering the same range. A day is free when load < capacity, i.e. a
+    new booking would not collide. One window is reported per maximal free
+    run that is at least `days` long, starting at the beginning of the run.
+
+    Args:
+        load_segments: Constant-load segments (EquipmentOccupancy.load_segments)
+        capacity_segments: Constant-capacity segments
+        days: Required window length in days
+        limit: Maximum number of windows to return
+
+    Returns:
+        List of (window_start_ordinal, run_last_ordinal), earliest first
+    """
+    windows: List[Tuple[int, int]] = []
+    run_start: Optional[int] = None
+    run_end = 0
+    i = j = 0
+    while i < len(load_segments) and j < len(capacity_segments):
+        load_first, load_last, load = load_segments[i]
+        cap_first, cap_last, capacity = capacity_segments[j]
+        first = max(load_first, cap_first)
+        last = min(load_last, cap_last)
+        if load < capacity:
+            if run_start is None:
+                run_start = first
+            run_end = last
+        elif run_start is not None:
+            if run_end - run_start + 1 >= days:
+                windows.append((run_start, run_end))
+                if len(windows) >= limit:
+                    return windows
+            run_start = None
+        if load_last == last:
+            i += 1
+        if cap_last == last:
+            j += 1
+    if run_start is not None and run_end - run_start + 1 >= days:
+        windows.append((run_start, run_end))
+    return windows
+
+
+def base_name_of(equipment_id: str) -> str:
+    """Equipment name of a booking equipment_id ('EKV-2000 - A' -> 'EKV-2000')."""
+    return equipment_id.split(' - ')[0].strip()
+
+
+class LabIndex:
+    """
+    Equipment and booking occupancy of the whole lab, built once.
+
+    Maps base equipment name to equipment details and equipment_id to an
+    EquipmentOccupancy, so lookups need no linear scans. The index is
+    updated in place with add_booking/remove_booking/set_equipment or
+    apply_change (entries in /api/changes shape) instead of being rebuilt.
+    Not thread-safe; callers serialize access (see db.lab_index).
+    """
+
+    def __init__(self, equipment: Iterable[Dict[str, Any]] = (),
+                 bookings: Iterable[Dict[str, Any]] = ()):
+        """
+        Args:
+            equipment: Equipment dictionaries (load_equipment_db shape)
+            bookings: Booking dictionaries (load_bookings_db shape)
+        """
+        self.equipment: Dict[str, Dict[str, Any]] = {item['name']: item for item in equipment}
+        self.bookings: Dict[int, Dict[str, Any]] = {}
+        self._occupancy: Dict[str, EquipmentOccupancy] = {}
+        self._base_names: Dict[str, str] = {}
+
+        grouped: Dict[str, List[Dict[str, Any]]] = {}
+        for booking in bookings:
+            self.bookings[booking['id']] = booking
+            grouped.setdefault(booking['equipment_id'], []).append(booking)
+        for equipment_id, items in grouped.items():
+            self._occupancy[equipment_id] = EquipmentOccupancy(items)
+
+    def base_name(self, equipment_id: str) -> str:
+        """Base equipment name of an equipment_id (memoized)."""
+        name = self._base_names.get(equipment_id)
+        if name is None:
+            name = self._base_names[equipment_id] = base_name_of(equipment_id)
+        return name
+
+    def equipment_for(self, equipment_id: str) -> Optional[Dict[str, Any]]:
+        """Equipment details of a booking equipment_id, or None if unknown."""
+        return self.equipment.get(self.base_name(equipment_id))
+
+    def equipment_ids(self) -> List[str]:
+        """All equipment_ids that have (or had) bookings."""
+        return list(self._occupancy)
+
+    def occupancy(self, equipment_id: str) -> EquipmentOccupancy:
+        """Occupancy of one equipment_id (empty if it has no bookings)."""
+        occupancy = self._occupancy.get(equipment_id)
+        if occupancy is None:
+            occupancy = self._occupancy[equipment_id] = EquipmentOccupancy()
+        return occupancy
+
+    def add_booking(self, booking: Dict[str, Any]) -> None:
+        """Insert or replace a booking (matched by 'id')."""
+        self.remove_booking(booking['id'])
+        self.bookings[booking['id']] = booking
+        if not booking.get('is_blocker', False):
+            interval = parse_interval(booking)
+            if interval:
+                self.occupancy(booking['equipment_id']).add(*interval)
+
+    def remove_booking(self, booking_id: int) -> None:
+        """Remove a booking if present."""
+        booking = self.bookings.pop(booking_id, None)
+        if booking is None or booking.get('is_blocker', False):
+            return
+        interval = parse_interval(booking)
+        if interval:
+            self.occupancy(booking['equipment_id']).remove(*interval)
+
+    def set_equipment(self, item: Dict[str, Any]) -> None:
+        """Insert or replace equipment details (matched by 'name')."""
+        self.equipment[item['name']] = item
+
+    def remove_equipment(self, name: str) -> None:
+        """Remove equipment details if present (its bookings stay)."""
+        self.equipment.pop(name, None)
+
+    def apply_change(self, change: Dict[str, Any]) -> None:
+        """
+        Apply one change_log entry ({entity, key, op, data}).
+
+        Applying the same change twice is harmless, so an index built
+        from data newer than its version can replay the log safely.
+        """
+        entity = change['entity']
+        deleted = change['op'] == 'delete' or change.get('data') is None
+        if entity == 'booking':
+            if deleted:
+                self.remove_booking(int(change['key']))
+            else:
+                self.add_booking(change['data'])
+        elif entity == 'equipment':
+            if deleted:
+                self.remove_equipment(change['key'])
+            else:
+                self.set_equipment(change['data'])
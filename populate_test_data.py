@@ -4,9 +4,20 @@ Script to populate database with sample test data.
 
 import sqlite3
 from config import DB_PATH
+from db import fetch_equipment, fetch_project, invalidate_reference_cache, record_change
+
+def _exists(c: sqlite3.Cursor, table: str, name: str) -> bool:
+    """Whether a row with this name is already stored (update vs. insert in change_log)."""
+    c.execute(f'SELECT 1 FROM {table} WHERE name = ?', (name,))
+    return c.fetchone() is not None
 
 def populate_sample_data():
-    """Add sample equipment and projects to database."""
+    """
+    Add sample equipment and projects to database.
+    
+    Every row is recorded in change_log in the same transaction, so running
+    servers serve a new /api/data version and push the rows to open calendars.
+    """
     conn = sqlite3.connect(DB_PATH)
     c = conn.cursor()
     
@@ -21,10 +32,12 @@ def populate_sample_data():
     print("Přidávám testovací zařízení...")
     for name, category, max_tests, status in equipment_data:
         try:
+            op = 'update' if _exists(c, 'equipment', name) else 'insert'
             c.execute('''
                 INSERT OR REPLACE INTO equipment (name, category, max_tests, status)
                 VALUES (?, ?, ?, ?)
             ''', (name, category, max_tests, status))
+            record_change(conn, 'equipment', name, op, fetch_equipment(conn, name))
             print(f"  ✓ {name}")
         except sqlite3.Error as e:
             print(f"  ✗ {name}: {e}")
@@ -40,14 +53,19 @@ def populate_sample_data():
     print("\nPřidávám testovací projekty...")
     for name, color, text_color, active in projects_data:
         try:
+            op = 'update' if _exists(c, 'projects', name) else 'insert'
             c.execute('''
                 INSERT OR REPLACE INTO projects (name, color, textColor, active)
                 VALUES (?, ?, ?, ?)
             ''', (name, color, text_color, active))
+            record_change(conn, 'project', name, op, fetch_project(conn, name))
             print(f"  ✓ {name}")
         except sqlite3.Error as e:
             print(f"  ✗ {name}: {e}")
     
+    # Reference cache and data version change with the commit: running servers
+    # reload equipment and projects and clients see the rows via change_log
+    invalidate_reference_cache(conn)
     conn.commit()
     conn.close()
     
@@ -0,0 +1,194 @@
+"""
+Per-request profiling into a bounded on-disk ring buffer.
+
+A request flagged for profiling (routes/profiling.py) runs its view under
+cProfile, saved as a pstats file, or under pyinstrument (optional package),
+saved as an HTML report. Each profile gets a JSON sidecar describing the
+request. Only the newest PROFILE_KEEP profiles are kept, which also holds
+when several worker processes write into the same PROFILE_DIR.
+
+Classes:
+- ActiveProfile: Profiler running for one request
+- ProfileStore: Ring buffer of saved profiles
+
+Functions:
+- start_profile: Start profiling the calling thread
+"""
+
+import cProfile
+import io
+import json
+import logging
+import os
+import pstats
+import re
+import time
+from typing import Any, Dict, List, Optional
+from config import PROFILE_DIR, PROFILE_KEEP, PROFILE_TEXT_LINES
+
+try:
+    import pyinstrument
+except ImportError:  # Optional: cProfile only
+    pyinstrument = None
+
+logger = logging.getLogger(__name__)
+
+PROFILERS = ('cprofile', 'pyinstrument') if pyinstrument is not None else ('cprofile',)
+EXTENSIONS = {'cprofile': 'prof', 'pyinstrument': 'html'}
+
+# <time_ns>-<pid>: unique across worker processes and ordered by creation
+_PROFILE_ID = re.compile(r'^\d+-\d+$')
+
+
+class ActiveProfile:
+    """Profiler running for one request."""
+
+    def __init__(self, kind: str):
+        self.kind = kind
+        self.started = time.perf_counter()
+        self.duration = 0.0
+        if kind == 'pyinstrument':
+            self._profiler = pyinstrument.Profiler()
+            self._profiler.start()
+        else:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+
+    def stop(self) -> None:
+        """Stop profiling."""
+        if self.kind == 'pyinstrument':
+            self._profiler.stop()
+        else:
+            self._profiler.disable()
+        self.duration = time.perf_counter() - self.started
+
+    def write(self, path: str) -> None:
+        """Write the profile: pstats file (cProfile) or HTML report (pyinstrument)."""
+        if self.kind == 'pyinstrument':
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(self._profiler.output_html())
+        else:
+            self._profiler.dump_stats(path)
+
+
+def start_profile(kind: str) -> Optional[ActiveProfile]:
+    """
+    Start profiling the calling thread.
+
+    Args:
+        kind: One of PROFILERS
+
+    Returns:
+        ActiveProfile, or None if another profiler is already active
+        (Python 3.12+ allows one cProfile at a time per process)
+    """
+    try:
+        return ActiveProfile(kind)
+    except (RuntimeError, ValueError) as e:
+        logger.warning(f"Profiler {kind} not started: {e}")
+        return None
+
+
+class ProfileStore:
+    """Ring buffer of profiles in a directory, newest PROFILE_KEEP kept."""
+
+    def __init__(self, directory: str = PROFILE_DIR, keep: int = PROFILE_KEEP):
+        self.directory = directory
+        self.keep = keep
+
+    def save(self, profile: ActiveProfile, request_info: Dict[str, Any]) -> str:
+        """
+        Store a stopped profile and drop the oldest ones over the limit.
+
+        Args:
+            profile: Stopped profile
+            request_info: Method, path, status, ... of the profiled request
+
+        Returns:
+            str: Profile id
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        profile_id = f'{time.time_ns()}-{os.getpid()}'
+        filename = f'{profile_id}.{EXTENSIONS[profile.kind]}'
+        profile.write(os.path.join(self.directory, filename))
+        meta = {
+            'id': profile_id,
+            'profiler': profile.kind,
+            'file': filename,
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'duration_ms': round(profile.duration * 1000, 1),
+            **request_info
+        }
+        # Sidecar last and atomically: listed profiles are always complete
+        temp_path = os.path.join(self.directory, f'.{profile_id}.json.tmp')
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+        os.replace(temp_path, os.path.join(self.directory, f'{profile_id}.json'))
+        self._prune()
+        logger.info(f"Saved {profile.kind} profile {profile_id} of {request_info.get('method')} "
+                    f"{request_info.get('path')} ({meta['duration_ms']} ms)")
+        return profile_id
+
+    def _ids(self) -> List[str]:
+        """Ids of stored profiles, oldest first."""
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        ids = [name[:-5] for name in names if name.endswith('.json') and _PROFILE_ID.match(name[:-5])]
+        return sorted(ids, key=lambda profile_id: int(profile_id.split('-')[0]))
+
+    def _prune(self) -> None:
+        """Delete the oldest profiles beyond the limit (tolerates concurrent pruning)."""
+        ids = self._ids()
+        for profile_id in ids[:max(0, len(ids) - self.keep)]:
+            for extension in ('json', *EXTENSIONS.values()):
+                try:
+                    os.remove(os.path.join(self.directory, f'{profile_id}.{extension}'))
+                except FileNotFoundError:
+                    pass
+
+    def list(self) -> List[Dict[str, Any]]:
+        """
+        Metadata of stored profiles, newest first.
+
+        Returns:
+            List of sidecar dicts (id, profiler, created, duration_ms, method, path, ...)
+        """
+        profiles = []
+        for profile_id in reversed(self._ids()):
+            meta = self.get(profile_id)
+            if meta is not None:
+                profiles.append(meta)
+        return profiles
+
+    def get(self, profile_id: str) -> Optional[Dict[str, Any]]:
+        """Metadata of one profile (None if unknown or already pruned)."""
+        if not _PROFILE_ID.match(profile_id):
+            return None
+        try:
+            with open(os.path.join(self.directory, f'{profile_id}.json'), encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def path_of(self, meta: Dict[str, Any]) -> str:
+        """Path of the profile file described by metadata from get()."""
+        return os.path.abspath(os.path.join(self.directory, os.path.basename(meta['file'])))
+
+    def as_text(self, meta: Dict[str, Any], sort: str = 'cumulative') -> str:
+        """
+        Human-readable summary of a cProfile profile (top PROFILE_TEXT_LINES functions).
+
+        Raises:
+            ValueError: For profiles that are not pstats files
+        """
+        if meta['profiler'] != 'cprofile':
+            raise ValueError('Textový výpis je jen pro profily cProfile')
+        stream = io.StringIO()
+        stats = pstats.Stats(self.path_of(meta), stream=stream)
+        stats.sort_stats(sort).print_stats(PROFILE_TEXT_LINES)
+        return stream.getvalue()
+
+
+profile_store = ProfileStore()
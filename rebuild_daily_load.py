@@ -0,0 +1,95 @@
+"""
+Rebuild or verify the materialized equipment_daily_load table.
+
+The table is normally maintained incrementally by booking writes in db.py.
+Use this script after manual edits of the bookings table, or to check
+a live database for drift.
+
+Usage:
+    python rebuild_daily_load.py          # rebuild from bookings
+    python rebuild_daily_load.py --check  # report inconsistencies only (read-only, no migrations)
+"""
+
+import argparse
+import sqlite3
+import sys
+from config import DB_PATH
+from db import rebuild_daily_load, find_daily_load_mismatches
+from db_init import create_tables
+
+# Maximum number of mismatches printed by --check
+MAX_REPORTED_MISMATCHES = 20
+
+
+def check(conn: sqlite3.Connection) -> int:
+    """
+    Print inconsistencies between equipment_daily_load and bookings.
+    
+    Args:
+        conn: SQLite database connection
+        
+    Returns:
+        int: Process exit code (0 = consistent, 1 = mismatches found)
+    """
+    mismatches = find_daily_load_mismatches(conn)
+    if not mismatches:
+        print('✅ equipment_daily_load je konzistentní s rezervacemi')
+        return 0
+    
+    print(f'✗ Nalezeno {len(mismatches)} nekonzistentních záznamů:')
+    for m in mismatches[:MAX_REPORTED_MISMATCHES]:
+        print(f"  {m['equipment_id']} {m['day']}: "
+              f"load {m['stored_load']} (očekáváno {m['expected_load']}), "
+              f"blockery {m['stored_blockers']} (očekáváno {m['expected_blockers']})")
+    if len(mismatches) > MAX_REPORTED_MISMATCHES:
+        print(f'  ... a dalších {len(mismatches) - MAX_REPORTED_MISMATCHES}')
+    print('Spusťte "python rebuild_daily_load.py" pro opravu.')
+    return 1
+
+
+def check_database() -> int:
+    """
+    Open the database read-only (no schema migrations) and run check().
+    
+    Returns:
+        int: Process exit code (2 if the database or the table is missing)
+    """
+    try:
+        conn = sqlite3.connect(f'file:{DB_PATH}?mode=ro', uri=True)
+    except sqlite3.OperationalError as e:
+        print(f'✗ Databázi {DB_PATH} nelze otevřít: {e}')
+        return 2
+    try:
+        table = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' "
+                             "AND name = 'equipment_daily_load'").fetchone()
+        if table is None:
+            print('✗ Tabulka equipment_daily_load neexistuje, '
+                  'spusťte "python rebuild_daily_load.py" (vytvoří ji a naplní)')
+            return 2
+        return check(conn)
+    finally:
+        conn.close()
+
+
+def main() -> int:
+    """Parse arguments and rebuild or check the daily load table."""
+    parser = argparse.ArgumentParser(description='Rebuild or verify equipment_daily_load')
+    parser.add_argument('--check', action='store_true',
+                        help='only report inconsistencies, do not modify the database')
+    args = parser.parse_args()
+    
+    if args.check:
+        return check_database()
+    
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        create_tables(conn)
+        rows = rebuild_daily_load(conn)
+        print(f'✅ equipment_daily_load přepočítána ({rows} záznamů)')
+        return 0
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -5,10 +5,23 @@ Contains Flask Blueprints for different API endpoints:
 - bookings: CRUD operations for bookings
 - equipment: CRUD operations for equipment
 - projects: CRUD operations for projects
+- sync: Delta synchronization (changes since a data version)
+- availability: Search for free booking windows
+- analytics: Utilization reports
+- export: Streaming CSV/NDJSON export of bookings
+- metrics: Request timing hooks and Prometheus /metrics
+- profiling: Opt-in per-request profiling and stored profiles
 """
 
 from .bookings import bookings_bp
 from .equipment import equipment_bp
 from .projects import projects_bp
+from .sync import sync_bp
+from .availability import availability_bp
+from .analytics import analytics_bp
+from .export import export_bp
+from .metrics import metrics_bp
+from .profiling import profiling_bp
 
-__all__ = ['bookings_bp', 'equipment_bp', 'projects_bp']
+__all__ = ['bookings_bp', 'equipment_bp', 'projects_bp', 'sync_bp', 'availability_bp', 'analytics_bp',
+           'export_bp', 'metrics_bp', 'profiling_bp']
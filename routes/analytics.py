@@ -0,0 +1,58 @@
+"""Analytics API routes.
+
+Aggregated reports for management:
+- GET /api/analytics/utilization - Booked slots vs. capacity by period
+"""
+
+from flask import Blueprint, request, jsonify
+import datetime
+import logging
+from typing import Tuple
+from analytics import GRANULARITIES, GROUPS, get_utilization
+from config import ANALYTICS_MAX_DAYS
+from utils import parse_date_window
+
+logger = logging.getLogger(__name__)
+analytics_bp = Blueprint('analytics', __name__)
+
+
+@analytics_bp.route('/api/analytics/utilization', methods=['GET'])
+def get_utilization_report() -> Tuple[dict, int]:
+    """
+    Get utilization (booked test slots / effective capacity) per period.
+    
+    Query parameters:
+        - from: str (optional, YYYY-MM-DD) - first day, default 1 January this year
+        - to: str (optional, YYYY-MM-DD) - last day, default 31 December this year
+        - granularity: str (optional) - 'day', 'week' (default) or 'month'
+        - group: str (optional) - 'equipment' (default) or 'category'
+    
+    Returns:
+        JSON response with period starts and one series per equipment or
+        category (capacity, booked, utilization, booked by project)
+    """
+    try:
+        date_from, date_to = parse_date_window(request.args.get('from'), request.args.get('to'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    today = datetime.date.today()
+    start = datetime.date.fromisoformat(date_from) if date_from else datetime.date(today.year, 1, 1)
+    end = datetime.date.fromisoformat(date_to) if date_to else datetime.date(today.year, 12, 31)
+    if end < start:
+        return jsonify({"error": "Datum 'to' nemůže být před datem 'from'"}), 400
+    if (end - start).days + 1 > ANALYTICS_MAX_DAYS:
+        return jsonify({"error": f"Období je příliš dlouhé (max {ANALYTICS_MAX_DAYS} dní)"}), 400
+    
+    granularity = request.args.get('granularity', 'week')
+    group = request.args.get('group', 'equipment')
+    if granularity not in GRANULARITIES:
+        return jsonify({"error": f"Neplatná granularita, použijte: {', '.join(GRANULARITIES)}"}), 400
+    if group not in GROUPS:
+        return jsonify({"error": f"Neplatné seskupení, použijte: {', '.join(GROUPS)}"}), 400
+    
+    try:
+        return jsonify(get_utilization(start, end, granularity, group)), 200
+    except Exception as e:
+        logger.error(f"Failed to compute utilization: {str(e)}", exc_info=True)
+        return jsonify({"error": f"Chyba při výpočtu vytížení: {str(e)}"}), 500
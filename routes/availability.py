@@ -0,0 +1,67 @@
+"""Availability API routes.
+
+Finds free slots for new bookings instead of trial-and-error saving:
+- GET /api/availability - Earliest windows where a booking of N days fits
+"""
+
+from flask import Blueprint, request, jsonify
+import datetime
+import logging
+from typing import Tuple
+from config import AVAILABILITY_HORIZON_DAYS, AVAILABILITY_MAX_COUNT
+from utils import find_available_windows
+
+logger = logging.getLogger(__name__)
+availability_bp = Blueprint('availability', __name__)
+
+
+@availability_bp.route('/api/availability', methods=['GET'])
+def get_availability() -> Tuple[dict, int]:
+    """
+    Get the earliest windows where a new booking would not collide.
+    
+    Query parameters:
+        - days: int (required) - booking length in days
+        - category: str (optional) - only equipment of this category
+        - after: str (optional, YYYY-MM-DD) - earliest start, default today
+        - until: str (optional, YYYY-MM-DD) - latest end, default after + horizon
+        - count: int (optional, default 5) - number of windows to return
+    
+    Returns:
+        JSON response with windows sorted by start date
+    """
+    try:
+        days = int(request.args.get('days', ''))
+        count = int(request.args.get('count', 5))
+    except ValueError:
+        return jsonify({"error": "Parametry days a count musí být celá čísla"}), 400
+    if days < 1:
+        return jsonify({"error": "Parametr days musí být alespoň 1"}), 400
+    if not 1 <= count <= AVAILABILITY_MAX_COUNT:
+        return jsonify({"error": f"Parametr count musí být 1 až {AVAILABILITY_MAX_COUNT}"}), 400
+    
+    try:
+        after_arg = request.args.get('after')
+        after = datetime.date.fromisoformat(after_arg) if after_arg else datetime.date.today()
+        until_arg = request.args.get('until')
+        until = (datetime.date.fromisoformat(until_arg) if until_arg
+                 else after + datetime.timedelta(days=AVAILABILITY_HORIZON_DAYS))
+    except ValueError:
+        return jsonify({"error": "Neplatný formát data"}), 400
+    if until < after:
+        return jsonify({"error": "Datum 'until' nemůže být před datem 'after'"}), 400
+    
+    category = request.args.get('category') or None
+    
+    try:
+        windows = find_available_windows(days, after, until, count, category)
+        return jsonify({
+            "category": category,
+            "days": days,
+            "after": after.isoformat(),
+            "until": until.isoformat(),
+            "windows": windows
+        }), 200
+    except Exception as e:
+        logger.error(f"Failed to search availability: {str(e)}", exc_info=True)
+        return jsonify({"error": f"Chyba při hledání volných termínů: {str(e)}"}), 500
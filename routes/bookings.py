@@ -4,17 +4,58 @@ Improved Bookings API routes with robust error handling and validation.
 
 from flask import Blueprint, request, jsonify
 import logging
-from typing import Tuple
+from typing import Optional, Tuple
+from config import BULK_MAX_BOOKINGS
 from db import (
-    load_bookings_db, load_equipment_db, 
-    create_booking, update_booking, delete_booking
+    load_bookings_db, create_booking, create_bookings_bulk, update_booking, delete_booking,
+    BookingCollisionError
+)
+from utils import (
+    validate_booking_data, find_collision_days_db, parse_date_window, BatchCollisionChecker
 )
-from utils import validate_booking_data, check_collision
 
 logger = logging.getLogger(__name__)
 bookings_bp = Blueprint('bookings', __name__)
 
 
+def _collision_response(collision_days: Optional[list] = None) -> Tuple[dict, int]:
+    """
+    Build 409 response for a booking that exceeds capacity.
+    
+    The response lists the exact conflicting days (if known) so the client
+    can highlight them.
+    """
+    body = {"error": "Konflikt rezervací nebo překročena kapacita"}
+    if collision_days:
+        body["conflict_days"] = [day.isoformat() for day in collision_days]
+    return jsonify(body), 409
+
+
+@bookings_bp.route('/api/bookings', methods=['GET'])
+def get_bookings() -> Tuple[dict, int]:
+    """
+    Get bookings, optionally limited to a date window.
+    
+    Query parameters:
+        - from: str (optional, YYYY-MM-DD) - only bookings ending on/after this day
+        - to: str (optional, YYYY-MM-DD) - only bookings starting on/before this day
+    
+    Returns:
+        JSON response with bookings list
+    """
+    try:
+        date_from, date_to = parse_date_window(request.args.get('from'), request.args.get('to'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    try:
+        bookings = load_bookings_db(date_from, date_to)
+        return jsonify({"bookings": bookings}), 200
+    except Exception as e:
+        logger.error(f"Failed to load bookings: {str(e)}", exc_info=True)
+        return jsonify({"error": f"Chyba při načítání rezervací: {str(e)}"}), 500
+
+
 @bookings_bp.route('/api/bookings', methods=['POST'])
 def create_booking_endpoint() -> Tuple[dict, int]:
     """
@@ -37,16 +78,15 @@ def create_booking_endpoint() -> Tuple[dict, int]:
             logger.warning(f"Invalid booking data: {error_message}")
             return jsonify({"error": error_message}), 400
         
-        # Check for collisions
-        all_bookings = load_bookings_db()
-        all_equipment = load_equipment_db()
-        
-        if check_collision(booking_data, all_bookings, all_equipment):
+        # Create booking; collision check runs in the same write transaction
+        try:
+            new_id = create_booking(booking_data, collision_check=find_collision_days_db)
+        except BookingCollisionError as e:
             logger.warning(f"Booking collision detected for equipment {booking_data.get('equipment_id')}")
-            return jsonify({"error": "Konflikt rezervací nebo překročena kapacita"}), 409
-        
-        # Create booking in database
-        new_id = create_booking(booking_data)
+            return _collision_response(e.days)
+        except ValueError as e:
+            logger.warning(f"Collision check rejected booking: {e}")
+            return _collision_response()
         booking_data['id'] = new_id
         
         logger.info(f"Successfully created booking {new_id}")
@@ -57,6 +97,85 @@ def create_booking_endpoint() -> Tuple[dict, int]:
         return jsonify({"error": f"Chyba při vytváření rezervace: {str(e)}"}), 500
 
 
+@bookings_bp.route('/api/bookings/bulk', methods=['POST'])
+def create_bookings_bulk_endpoint() -> Tuple[dict, int]:
+    """
+    Create many bookings in one transaction.
+    
+    Request body:
+        - bookings: list (required) - booking objects as for POST /api/bookings
+        - mode: str (optional) - 'all_or_nothing' (default) or 'best_effort'
+    A bare JSON list is accepted as well (all_or_nothing).
+    
+    Each booking is validated and checked against stored load and the
+    bookings before it in the batch.
+    
+    Returns:
+        JSON with per-item results ({index, status, id | error | conflict_days});
+        status is created, skipped, invalid (validation), error (e.g. unknown
+        equipment) or conflict (capacity exceeded);
+        201 if all were created, 207 if only some (best_effort),
+        409 if nothing was created and a booking collided, otherwise 400
+    """
+    try:
+        payload = request.get_json(silent=True)
+        if isinstance(payload, list):
+            items, mode = payload, 'all_or_nothing'
+        elif isinstance(payload, dict):
+            items, mode = payload.get('bookings'), payload.get('mode', 'all_or_nothing')
+        else:
+            return jsonify({"error": "Chybí data rezervací"}), 400
+        
+        if not isinstance(items, list) or not items:
+            return jsonify({"error": "Pole 'bookings' musí být neprázdný seznam"}), 400
+        if len(items) > BULK_MAX_BOOKINGS:
+            return jsonify({"error": f"Příliš mnoho rezervací (max {BULK_MAX_BOOKINGS})"}), 400
+        if mode not in ('all_or_nothing', 'best_effort'):
+            return jsonify({"error": "Neplatný režim, použijte 'all_or_nothing' nebo 'best_effort'"}), 400
+        all_or_nothing = mode == 'all_or_nothing'
+        
+        results = [None] * len(items)
+        valid = []
+        for index, booking_data in enumerate(items):
+            if not isinstance(booking_data, dict):
+                results[index] = {"index": index, "status": "invalid", "error": "Chybí data rezervace"}
+                continue
+            is_valid, error_message = validate_booking_data(booking_data)
+            if is_valid:
+                valid.append(index)
+            else:
+                results[index] = {"index": index, "status": "invalid", "error": error_message}
+        
+        if valid and not (all_or_nothing and len(valid) < len(items)):
+            outcomes = create_bookings_bulk([items[index] for index in valid],
+                                            collision_checker=BatchCollisionChecker,
+                                            all_or_nothing=all_or_nothing)
+        else:
+            outcomes = [{"status": "skipped"}] * len(valid)
+        for index, outcome in zip(valid, outcomes):
+            results[index] = {"index": index, **outcome}
+            if outcome["status"] == "conflict":
+                results[index]["error"] = "Konflikt rezervací nebo překročena kapacita"
+        
+        created = sum(1 for result in results if result["status"] == "created")
+        failed = sum(1 for result in results if result["status"] in ("invalid", "error", "conflict"))
+        if created == len(items):
+            status = 201
+        elif created:
+            status = 207
+        elif any(result["status"] == "conflict" for result in results):
+            status = 409
+        else:
+            status = 400
+        
+        logger.info(f"Bulk create ({mode}): {created} created, {failed} failed of {len(items)}")
+        return jsonify({"mode": mode, "created": created, "failed": failed, "results": results}), status
+        
+    except Exception as e:
+        logger.error(f"Failed to create bookings in bulk: {str(e)}", exc_info=True)
+        return jsonify({"error": f"Chyba při hromadném vytváření rezervací: {str(e)}"}), 500
+
+
 @bookings_bp.route('/api/bookings/<int:booking_id>', methods=['PUT'])
 def update_booking_endpoint(booking_id: int) -> Tuple[dict, int]:
     """
@@ -82,17 +201,16 @@ def update_booking_endpoint(booking_id: int) -> Tuple[dict, int]:
             logger.warning(f"Invalid update data for booking {booking_id}: {error_message}")
             return jsonify({"error": error_message}), 400
         
-        # Check for collisions (exclude current booking)
+        # Update booking; collision check (excluding itself) runs in the same transaction
         booking_data['id'] = booking_id
-        all_bookings = load_bookings_db()
-        all_equipment = load_equipment_db()
-        
-        if check_collision(booking_data, all_bookings, all_equipment):
+        try:
+            success = update_booking(booking_id, booking_data, collision_check=find_collision_days_db)
+        except BookingCollisionError as e:
             logger.warning(f"Collision detected while updating booking {booking_id}")
-            return jsonify({"error": "Konflikt rezervací nebo překročena kapacita"}), 409
-        
-        # Update booking in database
-        success = update_booking(booking_id, booking_data)
+            return _collision_response(e.days)
+        except ValueError as e:
+            logger.warning(f"Collision check rejected booking {booking_id}: {e}")
+            return _collision_response()
         
         if not success:
             logger.warning(f"Booking {booking_id} not found for update")
@@ -9,7 +9,9 @@ Handles CRUD operations for equipment:
 
 from flask import Blueprint, request, jsonify
 from typing import Tuple
-from db import db_connect, load_equipment_db
+from db import (
+    get_db_connection, record_change, invalidate_reference_cache, fetch_equipment, load_equipment_db
+)
 from config import DEFAULT_EQUIPMENT_STATUS, DEFAULT_MAX_TESTS, DEFAULT_SIDES
 
 equipment_bp = Blueprint('equipment', __name__)
@@ -52,23 +54,23 @@ def create_equipment() -> Tuple[dict, int]:
         if not new_equip.get('name') or not new_equip.get('category'):
             return jsonify({"error": "Chybí název nebo kategorie zařízení"}), 400
             
-        conn = db_connect()
-        c = conn.cursor()
-        c.execute('SELECT name FROM equipment WHERE name=?', (new_equip['name'],))
-        if c.fetchone():
-            conn.close()
-            return jsonify({"error": "Zařízení s tímto názvem již existuje"}), 409
+        with get_db_connection() as conn:
+            c = conn.cursor()
+            c.execute('SELECT name FROM equipment WHERE name=?', (new_equip['name'],))
+            if c.fetchone():
+                return jsonify({"error": "Zařízení s tímto názvem již existuje"}), 409
             
-        c.execute('''INSERT INTO equipment (name, category, max_tests, sides, status) VALUES (?, ?, ?, ?, ?)''', (
-            new_equip['name'],
-            new_equip['category'],
-            int(new_equip.get('max_tests', DEFAULT_MAX_TESTS)),
-            int(new_equip.get('sides', DEFAULT_SIDES)),
-            new_equip.get('status', DEFAULT_EQUIPMENT_STATUS)
-        ))
-        conn.commit()
-        conn.close()
-        return jsonify(new_equip), 201
+            c.execute('''INSERT INTO equipment (name, category, max_tests, sides, status) VALUES (?, ?, ?, ?, ?)''', (
+                new_equip['name'],
+                new_equip['category'],
+                int(new_equip.get('max_tests', DEFAULT_MAX_TESTS)),
+                int(new_equip.get('sides', DEFAULT_SIDES)),
+                new_equip.get('status', DEFAULT_EQUIPMENT_STATUS)
+            ))
+            invalidate_reference_cache(conn)
+            record_change(conn, 'equipment', new_equip['name'], 'insert', fetch_equipment(conn, new_equip['name']))
+            conn.commit()
+            return jsonify(new_equip), 201
     except Exception as e:
         return jsonify({"error": f"Chyba při vytváření zařízení: {str(e)}"}), 500
 
@@ -89,18 +91,20 @@ def update_equipment(equip_name: str) -> Tuple[dict, int]:
         if not updated_equip:
             return jsonify({"error": "Chybí data zařízení"}), 400
             
-        conn = db_connect()
-        c = conn.cursor()
-        c.execute('''UPDATE equipment SET category=?, max_tests=?, sides=?, status=? WHERE name=?''', (
-            updated_equip.get('category'),
-            int(updated_equip.get('max_tests', DEFAULT_MAX_TESTS)),
-            int(updated_equip.get('sides', DEFAULT_SIDES)),
-            updated_equip.get('status', DEFAULT_EQUIPMENT_STATUS),
-            equip_name
-        ))
-        conn.commit()
-        conn.close()
-        return jsonify(updated_equip)
+        with get_db_connection() as conn:
+            c = conn.cursor()
+            c.execute('''UPDATE equipment SET category=?, max_tests=?, sides=?, status=? WHERE name=?''', (
+                updated_equip.get('category'),
+                int(updated_equip.get('max_tests', DEFAULT_MAX_TESTS)),
+                int(updated_equip.get('sides', DEFAULT_SIDES)),
+                updated_equip.get('status', DEFAULT_EQUIPMENT_STATUS),
+                equip_name
+            ))
+            if c.rowcount:
+                invalidate_reference_cache(conn)
+                record_change(conn, 'equipment', equip_name, 'update', fetch_equipment(conn, equip_name))
+            conn.commit()
+            return jsonify(updated_equip)
     except Exception as e:
         return jsonify({"error": f"Chyba při aktualizaci zařízení: {str(e)}"}), 500
 
@@ -117,11 +121,13 @@ def delete_equipment(equip_name: str) -> Tuple[dict, int]:
         or error message if deletion fails
     """
     try:
-        conn = db_connect()
-        c = conn.cursor()
-        c.execute('DELETE FROM equipment WHERE name=?', (equip_name,))
-        conn.commit()
-        conn.close()
-        return jsonify({"success": True}), 200
+        with get_db_connection() as conn:
+            c = conn.cursor()
+            c.execute('DELETE FROM equipment WHERE name=?', (equip_name,))
+            if c.rowcount:
+                invalidate_reference_cache(conn)
+                record_change(conn, 'equipment', equip_name, 'delete')
+            conn.commit()
+            return jsonify({"success": True}), 200
     except Exception as e:
         return jsonify({"error": f"Chyba při mazání zařízení: {str(e)}"}), 500
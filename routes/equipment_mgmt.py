@@ -15,7 +15,9 @@ from flask import Blueprint, request, jsonify
 import logging
 import sqlite3
 from typing import Tuple
-from db import get_db_connection, load_equipment_db
+from db import (
+    get_db_connection, record_change, invalidate_reference_cache, fetch_equipment, load_equipment_db
+)
 
 logger = logging.getLogger(__name__)
 equipment_mgmt_bp = Blueprint('equipment_mgmt', __name__)
@@ -86,9 +88,17 @@ def add_capacity_override(equipment_name: str) -> Tuple[dict, int]:
                 data['max_tests'],
                 data.get('reason', '')
             ))
-            conn.commit()
-            
             override_id = cursor.lastrowid
+            invalidate_reference_cache(conn)
+            record_change(conn, 'capacity_override', override_id, 'insert', {
+                'id': override_id,
+                'equipment_name': equipment_name,
+                'start_date': data['start_date'],
+                'end_date': data['end_date'],
+                'max_tests': data['max_tests'],
+                'reason': data.get('reason', '')
+            })
+            conn.commit()
             
             logger.info(f"Added capacity override for {equipment_name}: {data['max_tests']} tests from {data['start_date']} to {data['end_date']}")
             
@@ -110,6 +120,9 @@ def delete_capacity_override(override_id: int) -> Tuple[dict, int]:
         with get_db_connection() as conn:
             cursor = conn.cursor()
             cursor.execute('DELETE FROM equipment_capacity_overrides WHERE id = ?', (override_id,))
+            if cursor.rowcount:
+                invalidate_reference_cache(conn)
+                record_change(conn, 'capacity_override', override_id, 'delete')
             conn.commit()
             
             if cursor.rowcount == 0:
@@ -155,6 +168,8 @@ def create_equipment() -> Tuple[dict, int]:
                 data['max_tests'],
                 data.get('status', 'active')
             ))
+            invalidate_reference_cache(conn)
+            record_change(conn, 'equipment', data['name'], 'insert', fetch_equipment(conn, data['name']))
             conn.commit()
             
             logger.info(f"Created equipment: {data['name']}")
@@ -187,6 +202,9 @@ def update_equipment(equipment_name: str) -> Tuple[dict, int]:
                 data.get('status', 'active'),
                 equipment_name
             ))
+            if cursor.rowcount:
+                invalidate_reference_cache(conn)
+                record_change(conn, 'equipment', equipment_name, 'update', fetch_equipment(conn, equipment_name))
             conn.commit()
             
             if cursor.rowcount == 0:
@@ -209,9 +227,14 @@ def delete_equipment(equipment_name: str) -> Tuple[dict, int]:
             
             # Delete capacity overrides first
             cursor.execute('DELETE FROM equipment_capacity_overrides WHERE equipment_name = ?', (equipment_name,))
+            overrides_deleted = cursor.rowcount
             
             # Delete equipment
             cursor.execute('DELETE FROM equipment WHERE name = ?', (equipment_name,))
+            if cursor.rowcount or overrides_deleted:
+                invalidate_reference_cache(conn)
+            if cursor.rowcount:
+                record_change(conn, 'equipment', equipment_name, 'delete')
             conn.commit()
             
             if cursor.rowcount == 0:
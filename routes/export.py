@@ -0,0 +1,123 @@
+"""Export API routes.
+
+Streaming exports for reporting:
+- GET /api/export/bookings.csv - Bookings as CSV
+- GET /api/export/bookings.ndjson - Bookings as newline-delimited JSON
+
+Rows are streamed from a database cursor in batches (db.iter_bookings_export),
+so neither the booking list nor the response body is ever built in memory.
+"""
+
+from flask import Blueprint, Response, request, jsonify
+import csv
+import io
+import json
+import logging
+from typing import Any, Dict, Iterator, List, Tuple
+from config import EXPORT_BATCH_SIZE
+from db import EXPORT_COLUMNS, iter_bookings_export
+from utils import parse_date_window
+
+logger = logging.getLogger(__name__)
+export_bp = Blueprint('export', __name__)
+
+EXPORT_MIMETYPES = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson'
+}
+
+_IS_BLOCKER = EXPORT_COLUMNS.index('is_blocker')
+_TEXT_STYLE = EXPORT_COLUMNS.index('text_style')
+
+
+def _csv_chunks(first: List[Tuple[Any, ...]], batches: Iterator[List[Tuple[Any, ...]]]) -> Iterator[str]:
+    """Format row batches as CSV, one chunk per batch (header first)."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    # BOM lets Excel detect UTF-8 (Czech diacritics)
+    buffer.write('\ufeff')
+    writer.writerow(EXPORT_COLUMNS)
+    rows = first
+    try:
+        while rows:
+            for row in rows:
+                row = list(row)
+                row[_IS_BLOCKER] = 1 if row[_IS_BLOCKER] else 0
+                writer.writerow(row)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            rows = next(batches, None)
+        if buffer.tell():
+            yield buffer.getvalue()  # Header of an empty export
+    finally:
+        batches.close()  # Client gone: release the cursor and connection
+
+
+def _ndjson_record(row: Tuple[Any, ...]) -> Dict[str, Any]:
+    """Convert an export row to the JSON record shape (API types)."""
+    record = dict(zip(EXPORT_COLUMNS, row))
+    record['is_blocker'] = bool(record['is_blocker'])
+    text_style = row[_TEXT_STYLE]
+    if isinstance(text_style, str):
+        try:
+            text_style = json.loads(text_style)
+        except json.JSONDecodeError:
+            text_style = {}
+    record['text_style'] = text_style or {}
+    return record
+
+
+def _ndjson_chunks(first: List[Tuple[Any, ...]], batches: Iterator[List[Tuple[Any, ...]]]) -> Iterator[str]:
+    """Format row batches as NDJSON, one chunk per batch."""
+    rows = first
+    try:
+        while rows:
+            yield ''.join(json.dumps(_ndjson_record(row), ensure_ascii=False) + '\n' for row in rows)
+            rows = next(batches, None)
+    finally:
+        batches.close()
+
+
+@export_bp.route('/api/export/bookings.<fmt>', methods=['GET'])
+def export_bookings(fmt: str) -> Response:
+    """
+    Stream all bookings joined with equipment category and project colors.
+    
+    Query parameters:
+        - from: str (optional, YYYY-MM-DD) - only bookings ending on/after this day
+        - to: str (optional, YYYY-MM-DD) - only bookings starting on/before this day
+        - equipment: str (optional, repeatable) - equipment_id or base equipment name
+        - project: str (optional, repeatable) - project name
+    
+    Args:
+        fmt: 'csv' or 'ndjson'
+    
+    Returns:
+        Streamed CSV or NDJSON attachment, ordered by start date
+    """
+    if fmt not in EXPORT_MIMETYPES:
+        return jsonify({"error": f"Nepodporovaný formát exportu: {fmt}"}), 404
+    
+    try:
+        date_from, date_to = parse_date_window(request.args.get('from'), request.args.get('to'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    batches = iter_bookings_export(
+        date_from, date_to,
+        equipment=request.args.getlist('equipment') or None,
+        projects=request.args.getlist('project') or None,
+        batch_size=EXPORT_BATCH_SIZE
+    )
+    # Run the query before streaming starts, so errors still get a status code
+    try:
+        first = next(batches, [])
+    except Exception as e:
+        logger.error(f"Failed to export bookings: {str(e)}", exc_info=True)
+        return jsonify({"error": f"Chyba při exportu rezervací: {str(e)}"}), 500
+    
+    chunks = _csv_chunks(first, batches) if fmt == 'csv' else _ndjson_chunks(first, batches)
+    response = Response(chunks, mimetype=EXPORT_MIMETYPES[fmt])
+    response.headers['Content-Disposition'] = f'attachment; filename=bookings.{fmt}'
+    return response
@@ -0,0 +1,72 @@
+"""Request metrics routes and hooks.
+
+Times every request of the app (before/after request hooks, see metrics.py)
+and exposes the results for Prometheus:
+- GET /metrics - Latency histograms, SQL queries/time/rows per endpoint and
+  cache counters of this process, in Prometheus text format
+"""
+
+from flask import Blueprint, Response, request
+import logging
+from compression import body_cache
+from db import get_reference_cache_stats
+from metrics import Counter, Gauge, finish_request, observe_request, render_metrics, start_request
+
+logger = logging.getLogger(__name__)
+metrics_bp = Blueprint('metrics', __name__)
+
+
+@metrics_bp.before_app_request
+def start_request_metrics() -> None:
+    """Start timing the request and counting its SQL queries."""
+    start_request()
+
+
+@metrics_bp.after_app_request
+def record_request_metrics(response: Response) -> Response:
+    """
+    Record latency, status and SQL stats of the finished request.
+    
+    Registered before compress_response, so it runs after it and the
+    measured time includes compression.
+    """
+    stats = finish_request()
+    if stats is not None:
+        endpoint = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        observe_request(stats, request.method, endpoint, request.path, response.status_code)
+    return response
+
+
+@metrics_bp.teardown_app_request
+def discard_request_metrics(error: BaseException = None) -> None:
+    """Close stats of a request whose after_request hooks did not run."""
+    finish_request()
+
+
+def _cache_metrics() -> list:
+    """Counters of the in-process caches, as reported by /api/cache/stats."""
+    hits = Counter('booking_planner_cache_hits_total', 'In-process cache hits.', ('cache',))
+    misses = Counter('booking_planner_cache_misses_total', 'In-process cache misses.', ('cache',))
+    size = Gauge('booking_planner_cache_bytes', 'Bytes held by the compressed body cache.')
+    compression = body_cache.stats()
+    for name, stats in (('reference', get_reference_cache_stats()), ('compression', compression)):
+        hits.inc((name,), stats['hits'])
+        misses.inc((name,), stats['misses'])
+    size.set((), compression['bytes'])
+    return [hits, misses, size]
+
+
+@metrics_bp.route('/metrics', methods=['GET'])
+def get_metrics() -> Response:
+    """
+    Get request and cache metrics of this process.
+    
+    Returns:
+        Prometheus text exposition format (version 0.0.4)
+    """
+    try:
+        body = render_metrics(_cache_metrics())
+    except Exception as e:
+        logger.error(f"Failed to render metrics: {str(e)}", exc_info=True)
+        return Response(f"# Chyba při vytváření metrik: {str(e)}\n", status=500, mimetype='text/plain')
+    return Response(body, mimetype='text/plain; version=0.0.4')
@@ -0,0 +1,135 @@
+"""Per-request profiling routes and hooks.
+
+Any request can be profiled by an admin, without a redeploy: send the header `X-Profile: 1` (or `cprofile`, `pyinstrument`)
+or add `?_profile=1` to the URL. The view then runs under the profiler
+(profiling.py), the profile is stored in the on-disk ring buffer and its
+id is returned in the `X-Profile-Id` response header. Streamed bodies
+(export, /api/stream) are not included.
+
+Admins authenticate with the `X-Profile-Token` header (PROFILING_TOKEN in
+config.py). Local requests may profile without a token only when
+PROFILING_ALLOW_LOCALHOST is switched on (development; behind a reverse
+proxy on the same host every client looks local). The same applies to:
+- GET /api/profiles - Recent profiles, newest first
+- GET /api/profiles/<id> - Download a profile (pstats file or HTML report);
+  ?format=text gives the top functions of a cProfile profile as text
+"""
+
+from flask import Blueprint, Response, g, jsonify, request, send_file
+import hmac
+import logging
+from typing import Tuple
+from config import PROFILER_DEFAULT, PROFILING_ALLOW_LOCALHOST, PROFILING_ENABLED, PROFILING_TOKEN
+from profiling import PROFILERS, profile_store, start_profile
+
+logger = logging.getLogger(__name__)
+profiling_bp = Blueprint('profiling', __name__)
+
+LOCAL_ADDRESSES = ('127.0.0.1', '::1')
+TEXT_SORT_KEYS = ('cumulative', 'tottime', 'calls')
+
+
+def _is_authorized() -> bool:
+    """Whether the request comes from an admin (profiling token) or, if allowed, from localhost."""
+    if not PROFILING_ENABLED:
+        return False
+    token = request.headers.get('X-Profile-Token')
+    if PROFILING_TOKEN and token:
+        return hmac.compare_digest(token.encode('utf-8'), PROFILING_TOKEN.encode('utf-8'))
+    return PROFILING_ALLOW_LOCALHOST and request.remote_addr in LOCAL_ADDRESSES
+
+
+@profiling_bp.before_app_request
+def start_request_profile() -> None:
+    """Start the profiler for requests flagged with X-Profile or ?_profile."""
+    flag = request.headers.get('X-Profile') or request.args.get('_profile')
+    if not flag or not PROFILING_ENABLED:
+        return
+    if not _is_authorized():
+        logger.warning(f"Refused profiling of {request.path} for {request.remote_addr}")
+        return
+    kind = PROFILER_DEFAULT if flag in ('1', 'true') else flag
+    if kind not in PROFILERS:
+        logger.warning(f"Unknown or unavailable profiler {kind!r}, using {PROFILER_DEFAULT}")
+        kind = PROFILER_DEFAULT
+    g.profile = start_profile(kind)
+
+
+@profiling_bp.after_app_request
+def save_request_profile(response: Response) -> Response:
+    """Stop the profiler, store the profile and return its id in X-Profile-Id."""
+    profile = g.pop('profile', None)
+    if profile is None:
+        return response
+    profile.stop()
+    try:
+        profile_id = profile_store.save(profile, {
+            'method': request.method,
+            'path': request.full_path.rstrip('?'),
+            'endpoint': request.url_rule.rule if request.url_rule is not None else None,
+            'status': response.status_code
+        })
+        response.headers['X-Profile-Id'] = profile_id
+    except OSError as e:
+        logger.error(f"Failed to save profile of {request.path}: {str(e)}")
+    return response
+
+
+@profiling_bp.teardown_app_request
+def stop_request_profile(error: BaseException = None) -> None:
+    """Stop a profiler left running when after_request hooks did not run."""
+    profile = g.pop('profile', None)
+    if profile is not None:
+        profile.stop()
+
+
+@profiling_bp.route('/api/profiles', methods=['GET'])
+def list_profiles() -> Tuple[dict, int]:
+    """
+    List stored profiles, newest first.
+    
+    Returns:
+        JSON with 'profilers' (available) and 'profiles' (id, profiler,
+        created, duration_ms, method, path, endpoint, status);
+        403 for clients that may not profile
+    """
+    if not _is_authorized():
+        return jsonify({"error": "Profilování je povoleno jen pro administrátory (X-Profile-Token)"}), 403
+    try:
+        return jsonify({"profilers": list(PROFILERS), "profiles": profile_store.list()}), 200
+    except OSError as e:
+        logger.error(f"Failed to list profiles: {str(e)}", exc_info=True)
+        return jsonify({"error": f"Chyba při načítání profilů: {str(e)}"}), 500
+
+
+@profiling_bp.route('/api/profiles/<profile_id>', methods=['GET'])
+def download_profile(profile_id: str):
+    """
+    Download one profile.
+    
+    Query parameters:
+        - format: str (optional) - 'file' (default; pstats for cProfile,
+          HTML for pyinstrument) or 'text' (cProfile summary)
+        - sort: str (optional, format=text) - cumulative (default), tottime or calls
+    
+    Returns:
+        Profile file as attachment, or text/plain summary; 404 if unknown
+    """
+    if not _is_authorized():
+        return jsonify({"error": "Profilování je povoleno jen pro administrátory (X-Profile-Token)"}), 403
+    meta = profile_store.get(profile_id)
+    if meta is None:
+        return jsonify({"error": "Profil nenalezen"}), 404
+    
+    try:
+        if request.args.get('format') == 'text':
+            sort = request.args.get('sort', 'cumulative')
+            if sort not in TEXT_SORT_KEYS:
+                return jsonify({"error": f"Neplatné řazení: {sort} (použijte {', '.join(TEXT_SORT_KEYS)})"}), 400
+            return Response(profile_store.as_text(meta, sort), mimetype='text/plain')
+        return send_file(profile_store.path_of(meta), as_attachment=True, download_name=meta['file'])
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except OSError:
+        # Pruned by another request in the meantime
+        return jsonify({"error": "Profil nenalezen"}), 404
@@ -9,7 +9,9 @@ Handles CRUD operations for projects:
 
 from flask import Blueprint, request, jsonify
 from typing import Tuple
-from db import db_connect, load_projects_db
+from db import (
+    get_db_connection, record_change, invalidate_reference_cache, fetch_project, load_projects_db
+)
 from config import DEFAULT_TEXT_COLOR
 
 projects_bp = Blueprint('projects', __name__)
@@ -51,22 +53,22 @@ def create_project() -> Tuple[dict, int]:
         if not new_project.get('name') or not new_project.get('color'):
             return jsonify({"error": "Chybí název nebo barva projektu"}), 400
             
-        conn = db_connect()
-        c = conn.cursor()
-        c.execute('SELECT name FROM projects WHERE name=?', (new_project['name'],))
-        if c.fetchone():
-            conn.close()
-            return jsonify({"error": "Projekt s tímto názvem již existuje"}), 409
+        with get_db_connection() as conn:
+            c = conn.cursor()
+            c.execute('SELECT name FROM projects WHERE name=?', (new_project['name'],))
+            if c.fetchone():
+                return jsonify({"error": "Projekt s tímto názvem již existuje"}), 409
             
-        c.execute('''INSERT INTO projects (name, color, textColor, active) VALUES (?, ?, ?, ?)''', (
-            new_project['name'],
-            new_project['color'],
-            new_project.get('textColor', DEFAULT_TEXT_COLOR),
-            int(new_project.get('active', True))
-        ))
-        conn.commit()
-        conn.close()
-        return jsonify(new_project), 201
+            c.execute('''INSERT INTO projects (name, color, textColor, active) VALUES (?, ?, ?, ?)''', (
+                new_project['name'],
+                new_project['color'],
+                new_project.get('textColor', DEFAULT_TEXT_COLOR),
+                int(new_project.get('active', True))
+            ))
+            invalidate_reference_cache(conn)
+            record_change(conn, 'project', new_project['name'], 'insert', fetch_project(conn, new_project['name']))
+            conn.commit()
+            return jsonify(new_project), 201
     except Exception as e:
         return jsonify({"error": f"Chyba při vytváření projektu: {str(e)}"}), 500
 
@@ -87,18 +89,20 @@ def update_project(project_name: str) -> Tuple[dict, int]:
         if not updated_project:
             return jsonify({"error": "Chybí data projektu"}), 400
             
-        conn = db_connect()
-        c = conn.cursor()
-        name = updated_project.get('name', project_name)
-        c.execute('''UPDATE projects SET color=?, textColor=?, active=? WHERE name=?''', (
-            updated_project.get('color'),
-            updated_project.get('textColor', DEFAULT_TEXT_COLOR),
-            int(updated_project.get('active', True)),
-            name
-        ))
-        conn.commit()
-        conn.close()
-        return jsonify(updated_project)
+        with get_db_connection() as conn:
+            c = conn.cursor()
+            name = updated_project.get('name', project_name)
+            c.execute('''UPDATE projects SET color=?, textColor=?, active=? WHERE name=?''', (
+                updated_project.get('color'),
+                updated_project.get('textColor', DEFAULT_TEXT_COLOR),
+                int(updated_project.get('active', True)),
+                name
+            ))
+            if c.rowcount:
+                invalidate_reference_cache(conn)
+                record_change(conn, 'project', name, 'update', fetch_project(conn, name))
+            conn.commit()
+            return jsonify(updated_project)
     except Exception as e:
         return jsonify({"error": f"Chyba při aktualizaci projektu: {str(e)}"}), 500
 
@@ -115,11 +119,13 @@ def delete_project(project_name: str) -> Tuple[dict, int]:
         or error message if deletion fails
     """
     try:
-        conn = db_connect()
-        c = conn.cursor()
-        c.execute('DELETE FROM projects WHERE name=?', (project_name,))
-        conn.commit()
-        conn.close()
-        return jsonify({"success": True}), 200
+        with get_db_connection() as conn:
+            c = conn.cursor()
+            c.execute('DELETE FROM projects WHERE name=?', (project_name,))
+            if c.rowcount:
+                invalidate_reference_cache(conn)
+                record_change(conn, 'project', project_name, 'delete')
+            conn.commit()
+            return jsonify({"success": True}), 200
     except Exception as e:
         return jsonify({"error": f"Chyba při mazání projektu: {str(e)}"}), 500
@@ -0,0 +1,82 @@
+"""Synchronization API routes.
+
+Lets clients catch up with changes made by others without reloading
+everything:
+- GET /api/changes?since=<version> - Changes committed after a data version
+- GET /api/stream - Server-Sent Events push of changes (limited number of
+  clients per process; refused clients poll /api/changes)
+"""
+
+from flask import Blueprint, Response, request, jsonify
+import logging
+from typing import Tuple
+from config import SSE_MAX_CLIENTS, SSE_RETRY_AFTER_SECONDS
+from db import get_changes_since
+from events import broadcaster, stream_events
+
+logger = logging.getLogger(__name__)
+sync_bp = Blueprint('sync', __name__)
+
+
+@sync_bp.route('/api/changes', methods=['GET'])
+def get_changes() -> Tuple[dict, int]:
+    """
+    Get inserted/updated/deleted rows since a data version.
+    
+    Query parameters:
+        - since: int (required) - data version the client already has
+          (the 'version' field of /api/data or of a previous call)
+    
+    Returns:
+        JSON response with 'version', 'changes' and 'resync'.
+        When 'resync' is true the client must reload /api/data.
+    """
+    try:
+        since = int(request.args.get('since', ''))
+    except ValueError:
+        return jsonify({"error": "Chybí nebo neplatný parametr since"}), 400
+    
+    try:
+        return jsonify(get_changes_since(since)), 200
+    except Exception as e:
+        logger.error(f"Failed to load changes: {str(e)}", exc_info=True)
+        return jsonify({"error": f"Chyba při načítání změn: {str(e)}"}), 500
+
+
+@sync_bp.route('/api/stream', methods=['GET'])
+def stream_changes() -> Response:
+    """
+    Push create/update/delete events to the client as Server-Sent Events.
+    
+    Each 'change' event has the same shape as an /api/changes entry and its
+    version as SSE id, so a reconnecting EventSource (Last-Event-ID header)
+    gets the missed changes replayed. A 'resync' event means the client
+    must reload /api/data.
+    
+    Each stream holds a server thread for as long as it is open, so only
+    SSE_MAX_CLIENTS streams are served per process; further clients get
+    503 with Retry-After and fall back to polling /api/changes.
+    
+    Returns:
+        text/event-stream response, 503 when the stream limit is reached
+    """
+    subscriber = broadcaster.subscribe(limit=SSE_MAX_CLIENTS)
+    if subscriber is None:
+        logger.warning(f"Refused stream client {request.remote_addr}: {SSE_MAX_CLIENTS} streams open")
+        response = jsonify({"error": "Příliš mnoho živých připojení, změny se načítají periodicky"})
+        response.status_code = 503
+        response.headers['Retry-After'] = str(SSE_RETRY_AFTER_SECONDS)
+        return response
+    
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('since')
+    try:
+        since = int(last_event_id) if last_event_id else None
+    except ValueError:
+        since = None
+    
+    response = Response(stream_events(broadcaster, subscriber, since), mimetype='text/event-stream')
+    # Frees the slot also when the body is never iterated (client gone early)
+    response.call_on_close(lambda: broadcaster.unsubscribe(subscriber))
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'  # Disable proxy buffering (nginx)
+    return response
@@ -0,0 +1,156 @@
+"""
+Local multi-client harness for the /api/stream Server-Sent Events endpoint.
+
+Starts the app on a temporary database, connects several stream clients,
+performs booking writes and checks that every client received every
+change. It also verifies that a client that never reads is dropped and
+that clients beyond the stream limit are refused.
+No external broker or running server is needed.
+
+Usage:
+    python sse_harness.py [--clients 20] [--writes 50]
+"""
+
+import argparse
+import http.client
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from typing import List
+
+# Must be set before the app (and config) is imported
+os.environ['BOOKING_PLANNER_DB'] = os.path.join(tempfile.mkdtemp(), 'sse_harness.db')
+# The threaded Werkzeug server has a thread per connection: no stream limit
+os.environ.setdefault('BOOKING_PLANNER_SSE_MAX_CLIENTS', '10000')
+
+from werkzeug.serving import make_server  # noqa: E402
+from app_main import app  # noqa: E402
+from events import ChangeBroadcaster  # noqa: E402
+
+
+class StreamClient(threading.Thread):
+    """Reads /api/stream and records the versions of received change events."""
+    
+    def __init__(self, port: int):
+        super().__init__(daemon=True)
+        self.port = port
+        self.versions: List[int] = []
+        self.connected = threading.Event()
+    
+    def run(self) -> None:
+        conn = http.client.HTTPConnection('127.0.0.1', self.port)
+        conn.request('GET', '/api/stream')
+        response = conn.getresponse()
+        self.connected.set()
+        event = None
+        while True:
+            line = response.readline()
+            if not line:
+                return
+            line = line.decode('utf-8').rstrip('\n')
+            if line.startswith('event: '):
+                event = line[len('event: '):]
+            elif line.startswith('data: ') and event == 'change':
+                self.versions.append(json.loads(line[len('data: '):])['version'])
+
+
+def post_json(port: int, method: str, path: str, body: dict) -> int:
+    """Send a JSON request and return the status code."""
+    conn = http.client.HTTPConnection('127.0.0.1', port)
+    conn.request(method, path, json.dumps(body), {'Content-Type': 'application/json'})
+    status = conn.getresponse().status
+    conn.close()
+    return status
+
+
+def check_broadcast(port: int, clients: int, writes: int) -> bool:
+    """Connect clients, perform writes and verify delivery to all of them."""
+    post_json(port, 'POST', '/api/equipment',
+              {'name': 'HARNESS-1', 'category': 'Harness', 'max_tests': writes + 1})
+    
+    readers = [StreamClient(port) for _ in range(clients)]
+    for reader in readers:
+        reader.start()
+    for reader in readers:
+        reader.connected.wait(5)
+    time.sleep(1)  # Let the pump thread pick up the current version
+    
+    started = time.perf_counter()
+    for i in range(writes):
+        status = post_json(port, 'POST', '/api/bookings', {
+            'description': f'Harness {i}',
+            'equipment_id': 'HARNESS-1',
+            'start_date': '2030-01-01',
+            'end_date': '2030-01-05'
+        })
+        if status != 201:
+            print(f'✗ Zápis {i} selhal se stavem {status}')
+            return False
+    
+    deadline = time.time() + 10
+    while time.time() < deadline and any(len(r.versions) < writes for r in readers):
+        time.sleep(0.1)
+    elapsed = time.perf_counter() - started
+    
+    received = [len(r.versions) for r in readers]
+    ordered = all(r.versions == sorted(r.versions) for r in readers)
+    ok = all(count == writes for count in received) and ordered
+    print(f"{'✅' if ok else '✗'} {clients} klientů, {writes} zápisů: "
+          f"přijato min {min(received)}, max {max(received)}, "
+          f"pořadí {'OK' if ordered else 'CHYBA'}, {elapsed:.2f} s")
+    return ok
+
+
+def check_slow_consumer(queue_size: int = 5) -> bool:
+    """Verify that a subscriber which never reads is dropped, others are not."""
+    broadcaster = ChangeBroadcaster(queue_size=queue_size, poll_interval=3600)
+    slow = broadcaster.subscribe()
+    fast = broadcaster.subscribe()
+    for version in range(queue_size + 1):
+        broadcaster.publish({'type': 'change', 'version': version})
+        fast.queue.get_nowait()
+    
+    ok = slow.dropped and not fast.dropped and broadcaster.client_count == 1
+    broadcaster.unsubscribe(fast)
+    print(f"{'✅' if ok else '✗'} Pomalý klient odpojen po zaplnění fronty ({queue_size})")
+    return ok
+
+
+def check_stream_limit(limit: int = 3) -> bool:
+    """Verify that subscribe() refuses clients beyond the limit and frees slots."""
+    broadcaster = ChangeBroadcaster(poll_interval=3600)
+    subscribers = [broadcaster.subscribe(limit=limit) for _ in range(limit)]
+    refused = broadcaster.subscribe(limit=limit)
+    broadcaster.unsubscribe(subscribers.pop())
+    again = broadcaster.subscribe(limit=limit)
+    
+    ok = None not in subscribers and refused is None and again is not None
+    for subscriber in subscribers + [again]:
+        broadcaster.unsubscribe(subscriber)
+    print(f"{'✅' if ok else '✗'} Klient nad limitem {limit} streamů odmítnut, uvolněné místo znovu použito")
+    return ok
+
+
+def main() -> int:
+    """Run the harness and return the process exit code."""
+    parser = argparse.ArgumentParser(description='SSE multi-client harness')
+    parser.add_argument('--clients', type=int, default=20)
+    parser.add_argument('--writes', type=int, default=50)
+    args = parser.parse_args()
+    
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        ok = check_broadcast(server.server_port, args.clients, args.writes)
+        ok = check_slow_consumer() and ok
+        ok = check_stream_limit() and ok
+    finally:
+        server.shutdown()
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
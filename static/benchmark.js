@@ -0,0 +1,198 @@
+/**
+ * Calendar rendering benchmark (static/benchmark.html)
+ *
+ * Fills `state` with synthetic equipment and bookings for the current year
+ * and measures, forcing layout after every step:
+ * - initial renderCalendar() of the virtualized grid (layout on the main thread)
+ * - renderViewport() after random scroll jumps
+ * - moving one booking to another row (only the two rows are re-laid-out)
+ * - renderBookings() re-laying-out all rows
+ * - the previous full-DOM renderer (one cell per equipment x day) as baseline
+ * - loading an /api/data body: parse and layout on the main thread versus
+ *   in the layout worker, then rendering with the worker's layout
+ *
+ * Results go to #benchmark-results and window.benchmarkResults.
+ */
+
+(function () {
+    const params = new URLSearchParams(window.location.search);
+    const EQUIPMENT_COUNT = parseInt(params.get('equipment') || '150', 10);
+    const BOOKING_COUNT = parseInt(params.get('bookings') || '20000', 10);
+    const SCROLLS = parseInt(params.get('scrolls') || '60', 10);
+    const BASELINE = params.get('baseline') !== '0';
+
+    const COLORS = ['#4a90e2', '#e24a4a', '#4ae28c', '#e2c44a', '#9b4ae2', '#4ae2d9'];
+
+    // Deterministic data between runs (mulberry32)
+    function seededRandom(seed) {
+        return () => {
+            seed = (seed + 0x6D2B79F5) | 0;
+            let t = Math.imul(seed ^ (seed >>> 15), 1 | seed);
+            t = (t + Math.imul(t ^ (t >>> 7), 61 | t)) ^ t;
+            return ((t ^ (t >>> 14)) >>> 0) / 4294967296;
+        };
+    }
+
+    function makeData(equipmentCount, bookingCount) {
+        const random = seededRandom(42);
+        const dates = getDatesForYear(new Date().getFullYear());
+        const equipment = [];
+        for (let i = 0; i < equipmentCount; i++) {
+            const name = `BENCH-${String(i).padStart(3, '0')}`;
+            equipment.push({ id: name, name, category: `Kategorie ${i % 5}`, max_tests: 1 + (i % 4), status: 'active' });
+        }
+        const bookings = [];
+        for (let i = 0; i < bookingCount; i++) {
+            const startIndex = Math.floor(random() * dates.length);
+            const endIndex = Math.min(dates.length - 1, startIndex + Math.floor(random() * 21));
+            bookings.push({
+                id: 101 + i,
+                description: `Benchmark ${i}`,
+                tma_number: String(Math.floor(random() * 1e6)).padStart(6, '0'),
+                start_date: formatDate(dates[startIndex]),
+                end_date: formatDate(dates[endIndex]),
+                equipment_id: equipment[Math.floor(random() * equipmentCount)].id,
+                project_name: `Projekt ${i % 10}`,
+                project_color: COLORS[i % COLORS.length],
+                note: random() < 0.3 ? 'Poznámka k testu' : '',
+                is_blocker: random() < 0.1,
+                text_style: {}
+            });
+        }
+        return { equipment, bookings, random };
+    }
+
+    function measure(fn) {
+        const started = performance.now();
+        fn();
+        document.body.offsetHeight;  // Force style and layout
+        return performance.now() - started;
+    }
+
+    function summarize(times) {
+        const sorted = [...times].sort((a, b) => a - b);
+        const pick = (q) => sorted[Math.min(sorted.length - 1, Math.floor(q * sorted.length))];
+        const avg = times.reduce((sum, t) => sum + t, 0) / times.length;
+        return { avg: round(avg), p95: round(pick(0.95)), max: round(sorted[sorted.length - 1]) };
+    }
+
+    function round(value) {
+        return Math.round(value * 100) / 100;
+    }
+
+    function countNodes(root) {
+        return root.getElementsByTagName('*').length;
+    }
+
+    /**
+     * The renderer before virtualization: CSS grid with a header per day,
+     * a cell per equipment x day and every booking bar.
+     */
+    function renderFullGridBaseline(grid) {
+        const todayTime = normalizeDate(new Date()).getTime();
+        grid.style.display = 'grid';
+        grid.style.position = 'relative';
+        grid.style.gridTemplateColumns = `repeat(${state.yearDates.length}, ${CONFIG.DAY_WIDTH}px)`;
+        grid.style.gridTemplateRows = `${CONFIG.HEADER_HEIGHT}px ${state.rowHeights.map(h => `${h}px`).join(' ')}`;
+        
+        state.yearDates.forEach(date => {
+            const header = document.createElement('div');
+            header.className = 'date-header';
+            const dayOfWeek = date.toLocaleDateString('cs-CZ', { weekday: 'short' });
+            if (['so', 'ne'].includes(dayOfWeek)) header.classList.add('weekend');
+            if (normalizeDate(date).getTime() === todayTime) header.classList.add('today');
+            header.innerHTML = `
+            <span class="date-main">${date.getDate()}.${date.getMonth() + 1}.</span>
+            <span class="day-name">${dayOfWeek}</span>
+        `;
+            grid.appendChild(header);
+        });
+        state.equipment.forEach(() => {
+            state.yearDates.forEach(date => {
+                const cell = document.createElement('div');
+                cell.className = 'grid-cell';
+                const dayOfWeek = date.toLocaleDateString('cs-CZ', { weekday: 'short' });
+                if (['so', 'ne'].includes(dayOfWeek)) cell.classList.add('weekend');
+                if (normalizeDate(date).getTime() === todayTime) cell.classList.add('today');
+                grid.appendChild(cell);
+            });
+        });
+        const firstDate = state.yearDates[0];
+        state.equipment.forEach((equip, index) => {
+            state.bookings.filter(b => b.equipment_id === equip.id).forEach(booking => {
+                const start = diffInDays(firstDate, normalizeDate(new Date(booking.start_date)));
+                const end = start + diffInDays(normalizeDate(new Date(booking.start_date)),
+                                               normalizeDate(new Date(booking.end_date)));
+                const el = document.createElement('div');
+                fillBookingBar(el, { booking, start, end, top: state.rowTops[index] });
+                grid.appendChild(el);
+            });
+        });
+    }
+
+    async function measureLoad(data, results) {
+        const year = new Date().getFullYear();
+        const payload = { version: 1, equipment: data.equipment, bookings: data.bookings, projects: [] };
+        const buffer = new TextEncoder().encode(JSON.stringify(payload)).buffer;
+        results.payload_bytes = buffer.byteLength;
+        
+        let started = performance.now();
+        loadCalendarData(buffer, year);
+        results.load_main_thread_ms = round(performance.now() - started);
+        
+        started = performance.now();
+        const loaded = await layoutInWorker(buffer, year);
+        results.load_worker_ms = round(performance.now() - started);
+        results.load_in_worker = Boolean(getLayoutWorker());
+        
+        state.equipment = loaded.data.equipment;
+        state.bookings = loaded.data.bookings;
+        results.render_with_layout_ms = round(measure(() => renderCalendar(loaded.layout)));
+    }
+
+    async function run() {
+        const data = makeData(EQUIPMENT_COUNT, BOOKING_COUNT);
+        state.equipment = data.equipment;
+        state.bookings = data.bookings;
+        state.projects = [];
+        
+        const grid = document.getElementById('timeline-grid');
+        const viewport = document.querySelector('.timeline-viewport');
+        const results = { equipment: EQUIPMENT_COUNT, bookings: BOOKING_COUNT, days: 0 };
+        
+        results.initial_render_ms = round(measure(renderCalendar));
+        results.days = state.yearDates.length;
+        results.grid_nodes = countNodes(grid);
+        
+        const scrollTimes = [];
+        for (let i = 0; i < SCROLLS; i++) {
+            viewport.scrollLeft = data.random() * (viewport.scrollWidth - viewport.clientWidth);
+            viewport.scrollTop = data.random() * (viewport.scrollHeight - viewport.clientHeight);
+            scrollTimes.push(measure(renderViewport));
+        }
+        results.scroll_render_ms = summarize(scrollTimes);
+        results.grid_nodes_after_scroll = countNodes(grid);
+        
+        const moved = state.bookings[0];
+        const target = state.equipment[(state.equipment.findIndex(e => e.id === moved.equipment_id) + 1) % EQUIPMENT_COUNT];
+        const change = { op: 'update', key: String(moved.id), data: { ...moved, equipment_id: target.id } };
+        results.row_update_ms = round(measure(() => applyBookingChanges([change])));
+        results.bookings_rerender_ms = round(measure(() => renderBookings(grid)));
+        
+        if (BASELINE) {
+            const baseline = document.createElement('div');
+            grid.parentElement.appendChild(baseline);
+            results.full_render_ms = round(measure(() => renderFullGridBaseline(baseline)));
+            results.full_render_nodes = countNodes(baseline);
+            baseline.remove();
+        }
+        
+        await measureLoad(data, results);
+        
+        window.benchmarkResults = results;
+        document.getElementById('benchmark-results').textContent = JSON.stringify(results, null, 2);
+        console.log('Benchmark results:', results);
+    }
+
+    window.addEventListener('load', run);
+})();
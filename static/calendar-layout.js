@@ -0,0 +1,180 @@
+/**
+ * Booking Planner - calendar data decoding and bar layout
+ *
+ * Shared by the page (script.js) and the layout worker (layout-worker.js),
+ * so /api/data can be parsed and laid out off the main thread. No DOM access.
+ *
+ * Layout arrays (Int32Array) list bookings grouped by calendar row and
+ * sorted by first day; row r covers indexes rowOffsets[r]..rowOffsets[r + 1]:
+ * - order: booking index into the bookings array
+ * - start, end: first and last day as indexes from 1 January
+ * - lane: vertical lane within the row
+ * - rowOffsets (rows + 1), lanes and maxLength (longest end - start) per row
+ */
+
+const DAY_MS = 24 * 3600 * 1000;
+
+/**
+ * Decode bookings of /api/data?format=columnar into the row shape used by
+ * the default format and /api/changes. Columns are parallel arrays;
+ * repeated strings are indexes into `dictionaries` and dates are day
+ * offsets from `base_date` (null offsets keep their raw value in `raw_dates`).
+ * Bookings with the same text_style share one (read-only) style object.
+ */
+function decodeColumnarBookings(table) {
+    const { columns, dictionaries } = table;
+    const rawDates = table.raw_dates || {};
+    const baseTime = table.base_date ? Date.parse(`${table.base_date}T00:00:00Z`) : 0;
+    const dayStrings = new Map();
+    const dayString = (offset) => {
+        let day = dayStrings.get(offset);
+        if (day === undefined) {
+            day = new Date(baseTime + offset * DAY_MS).toISOString().slice(0, 10);
+            dayStrings.set(offset, day);
+        }
+        return day;
+    };
+    
+    const bookings = new Array(table.count);
+    for (let i = 0; i < table.count; i++) {
+        const start = columns.start[i];
+        const end = columns.end[i];
+        bookings[i] = {
+            id: columns.id[i],
+            description: columns.description[i],
+            tma_number: columns.tma_number[i],
+            start_date: start === null ? rawDates[i][0] : dayString(start),
+            end_date: end === null ? rawDates[i][1] : dayString(end),
+            equipment_id: dictionaries.equipment_id[columns.equipment_id[i]],
+            project_name: dictionaries.project_name[columns.project_name[i]],
+            project_color: dictionaries.project_color[columns.project_color[i]],
+            note: dictionaries.note[columns.note[i]],
+            is_blocker: columns.is_blocker[i] === 1,
+            text_style: dictionaries.text_style[columns.text_style[i]],
+            lane: columns.lane ? columns.lane[i] : null
+        };
+    }
+    return bookings;
+}
+
+/**
+ * Lay out bookings of a year calendar: group them per row, sort each row
+ * by first day and stack overlapping bookings into lanes (each booking
+ * takes the first lane that is free on its first day).
+ *
+ * Rows whose bookings all carry a `lane` from /api/data (layout.py, same
+ * rule) keep those lanes; rows with bookings changed since the load are
+ * stacked here. Rows already in start order (as /api/data sends them)
+ * are not sorted, so a fresh load is laid out in linear time.
+ *
+ * @param {Array} bookings - Booking rows
+ * @param {Array} equipmentIds - Equipment id of each calendar row
+ * @param {number} year - Displayed year
+ * @returns {Object} Layout arrays (see file header); bookings of unknown
+ *   equipment or with invalid dates are left out
+ */
+function computeLayout(bookings, equipmentIds, year) {
+    const firstDay = Date.UTC(year, 0, 1) / DAY_MS;
+    const days = new Map();  // Few distinct dates: parse each once
+    const dayIndex = (value) => {
+        let day = days.get(value);
+        if (day === undefined) {
+            const match = /^(\d{4})-(\d{2})-(\d{2})/.exec(value || '');
+            day = match ? Date.UTC(+match[1], match[2] - 1, +match[3]) / DAY_MS - firstDay : null;
+            days.set(value, day);
+        }
+        return day;
+    };
+    
+    const rowOf = new Map(equipmentIds.map((equipmentId, row) => [equipmentId, row]));
+    const rowCount = equipmentIds.length;
+    const count = bookings.length;
+    const startOf = new Int32Array(count);
+    const endOf = new Int32Array(count);
+    const rowIndex = new Int32Array(count).fill(-1);
+    const rowOffsets = new Int32Array(rowCount + 1);
+    const stackRow = new Uint8Array(rowCount);  // Some booking has no server lane
+    for (let i = 0; i < count; i++) {
+        const booking = bookings[i];
+        const row = rowOf.get(booking.equipment_id);
+        const first = dayIndex(booking.start_date);
+        const last = dayIndex(booking.end_date);
+        if (row === undefined || first === null || last === null) continue;
+        startOf[i] = first;
+        endOf[i] = last;
+        rowIndex[i] = row;
+        rowOffsets[row + 1]++;
+        if (!Number.isInteger(booking.lane)) stackRow[row] = 1;
+    }
+    for (let row = 0; row < rowCount; row++) {
+        rowOffsets[row + 1] += rowOffsets[row];
+    }
+    
+    // Counting sort into rows, then sort within each row
+    const total = rowOffsets[rowCount];
+    const order = new Int32Array(total);
+    const next = rowOffsets.slice(0, rowCount);
+    for (let i = 0; i < count; i++) {
+        if (rowIndex[i] !== -1) order[next[rowIndex[i]]++] = i;
+    }
+    
+    const start = new Int32Array(total);
+    const end = new Int32Array(total);
+    const lane = new Int32Array(total);
+    const lanes = new Int32Array(rowCount);
+    const maxLength = new Int32Array(rowCount);
+    for (let row = 0; row < rowCount; row++) {
+        const from = rowOffsets[row];
+        const to = rowOffsets[row + 1];
+        let sorted = true;
+        for (let k = from + 1; k < to && sorted; k++) {
+            sorted = startOf[order[k - 1]] <= startOf[order[k]];
+        }
+        if (!sorted) {
+            order.subarray(from, to).sort((a, b) => startOf[a] - startOf[b] || endOf[a] - endOf[b]);
+        }
+        const laneEnds = [];
+        for (let k = from; k < to; k++) {
+            const i = order[k];
+            start[k] = startOf[i];
+            end[k] = endOf[i];
+            maxLength[row] = Math.max(maxLength[row], end[k] - start[k]);
+            if (!stackRow[row]) {
+                lane[k] = bookings[i].lane;
+                lanes[row] = Math.max(lanes[row], lane[k] + 1);
+                continue;
+            }
+            let free = laneEnds.findIndex(laneEnd => laneEnd < start[k]);
+            if (free === -1) free = laneEnds.length;
+            laneEnds[free] = end[k];
+            lane[k] = free;
+        }
+        if (stackRow[row]) lanes[row] = laneEnds.length;
+    }
+    
+    return { order, start, end, lane, rowOffsets, lanes, maxLength };
+}
+
+/**
+ * Parse an /api/data body and lay out its bookings.
+ *
+ * @param {ArrayBuffer} buffer - UTF-8 JSON body (rows or columnar format)
+ * @param {number} year - Displayed year
+ * @returns {Object} { data: { version, equipment, bookings, projects }, layout }
+ */
+function loadCalendarData(buffer, year) {
+    const data = JSON.parse(new TextDecoder().decode(buffer));
+    const equipment = data.equipment || [];
+    const bookings = data.format === 'columnar'
+        ? decodeColumnarBookings(data.bookings)
+        : data.bookings || [];
+    return {
+        data: {
+            version: data.version ?? null,
+            equipment,
+            bookings,
+            projects: data.projects || []
+        },
+        layout: computeLayout(bookings, equipment.map(equip => equip.id), year)
+    };
+}
@@ -0,0 +1,23 @@
+/**
+ * Booking Planner - calendar layout worker
+ *
+ * Parses /api/data bodies and computes the bar layout (calendar-layout.js)
+ * off the main thread.
+ *
+ * Request:  { id, buffer: ArrayBuffer with the /api/data body, year }
+ * Response: { id, data, layout } with the layout arrays transferred,
+ *           or { id, error }
+ */
+
+importScripts('calendar-layout.js');
+
+self.onmessage = (e) => {
+    const { id, buffer, year } = e.data;
+    try {
+        const { data, layout } = loadCalendarData(buffer, year);
+        const transfer = Object.values(layout).map(array => array.buffer);
+        self.postMessage({ id, data, layout }, transfer);
+    } catch (error) {
+        self.postMessage({ id, error: error.message });
+    }
+};
@@ -5,6 +5,7 @@
  * @description Clean, simple implementation without external libraries
  * 
  * Features:
+ * - Virtualized grid: only rows/days near the viewport are in the DOM
  * - Native HTML5 Drag & Drop API
  * - Immediate DB synchronization
  * - Simple, predictable behavior
@@ -19,15 +20,27 @@ const CONFIG = {
     DAY_WIDTH: 140,
     HEADER_HEIGHT: 60,
     BASE_ROW_HEIGHT: 60,
-    LANE_HEIGHT: 40
+    LANE_HEIGHT: 40,
+    OVERSCAN_COLUMNS: 7,  // Days rendered beyond each side of the viewport
+    OVERSCAN_ROWS: 5,     // Equipment rows rendered above/below the viewport
+    CHANGE_POLL_MS: 15000,    // Polling of /api/changes while the stream is refused
+    STREAM_RETRY_MS: 60000    // Next /api/stream attempt after a refusal (Retry-After)
 };
 
+let changePollTimer = null;
+
 let state = {
     equipment: [],
     bookings: [],
     projects: [],
     yearDates: [],
+    dayInfo: [],
     rowHeights: [],
+    rowTops: [],
+    bookingIndex: new Map(),
+    bookingById: new Map(),
+    dataEtag: null,
+    dataVersion: null,
     draggedBooking: null,
     dragStartDay: null
 };
@@ -38,28 +51,255 @@ let state = {
 
 async function loadData() {
     try {
-        const response = await fetch('/api/data');
+        // Only bookings overlapping the displayed year are needed
+        const range = getCalendarRange(new Date().getFullYear());
+        const response = await fetch(`/api/data?from=${range.from}&to=${range.to}&format=columnar`);
         if (!response.ok) throw new Error('Failed to load data');
         
-        const data = await response.json();
-        state.equipment = data.equipment || [];
-        state.bookings = data.bookings || [];
-        state.projects = data.projects || [];
+        // Browser revalidates with If-None-Match; an unchanged ETag means
+        // the server answered 304 and the calendar is already current
+        const etag = response.headers.get('ETag');
+        if (etag && etag === state.dataEtag) return;
+        state.dataEtag = etag;
+        
+        // Parsing and bar layout run in the layout worker
+        const { data, layout } = await layoutInWorker(await response.arrayBuffer(), new Date().getFullYear());
+        state.dataVersion = data.version;
+        state.equipment = data.equipment;
+        state.bookings = data.bookings;
+        state.projects = data.projects;
         
         console.log(`Loaded: ${state.bookings.length} bookings, ${state.equipment.length} equipment`);
         
-        renderCalendar();
+        renderCalendar(layout);
     } catch (error) {
         console.error('Error loading data:', error);
         alert('Chyba při načítání dat z databáze');
     }
 }
 
+/**
+ * Apply changes made since state.dataVersion instead of reloading everything.
+ * Booking-only changes re-lay-out just the equipment rows they touch;
+ * equipment changes rebuild the calendar. Falls back to loadData() when
+ * the server asks for a resync.
+ */
+async function syncChanges() {
+    if (state.dataVersion === null) return loadData();
+    
+    try {
+        const response = await fetch(`/api/changes?since=${state.dataVersion}`);
+        if (!response.ok) throw new Error('Failed to load changes');
+        
+        const delta = await response.json();
+        if (delta.resync) {
+            state.dataEtag = null;
+            return loadData();
+        }
+        if (delta.changes.length === 0) return;
+        
+        let layoutChanged = false;
+        const bookingChanges = [];
+        delta.changes.forEach(change => {
+            if (change.entity === 'booking') {
+                bookingChanges.push(change);
+            } else if (change.entity === 'equipment') {
+                applyChange(state.equipment, change);
+                layoutChanged = true;
+            } else if (change.entity === 'project') {
+                applyChange(state.projects, change);
+            }
+        });
+        state.dataVersion = delta.version;
+        state.dataEtag = null;  // Cached /api/data body is now stale
+        
+        if (layoutChanged || !view.grid) {
+            bookingChanges.forEach(change => applyChange(state.bookings, change));
+            renderCalendar();
+        } else {
+            applyBookingChanges(bookingChanges);
+        }
+    } catch (error) {
+        console.error('Error syncing changes:', error);
+        state.dataEtag = null;
+        await loadData();
+    }
+}
+
+/**
+ * Subscribe to server push. Change events are coalesced into one
+ * syncChanges() call so a burst of edits costs a single re-render.
+ * When the server refuses the stream (503, all stream slots taken) the
+ * calendar polls /api/changes and tries the stream again later.
+ */
+function connectChangeStream() {
+    if (!window.EventSource) return startChangePolling();
+    
+    const source = new EventSource('/api/stream');
+    let pending = null;
+    
+    source.addEventListener('open', stopChangePolling);
+    source.addEventListener('error', () => {
+        // Dropped connections reconnect by themselves; a refused one is closed
+        if (source.readyState !== EventSource.CLOSED) return;
+        startChangePolling();
+        setTimeout(connectChangeStream, CONFIG.STREAM_RETRY_MS);
+    });
+    
+    source.addEventListener('change', (e) => {
+        const change = JSON.parse(e.data);
+        if (state.dataVersion !== null && change.version <= state.dataVersion) return;
+        if (!pending) {
+            pending = setTimeout(async () => {
+                pending = null;
+                await syncChanges();
+            }, 100);
+        }
+    });
+    
+    source.addEventListener('resync', () => {
+        state.dataEtag = null;
+        loadData();
+    });
+}
+
+function startChangePolling() {
+    if (changePollTimer === null) {
+        changePollTimer = setInterval(syncChanges, CONFIG.CHANGE_POLL_MS);
+    }
+}
+
+function stopChangePolling() {
+    if (changePollTimer !== null) {
+        clearInterval(changePollTimer);
+        changePollTimer = null;
+    }
+}
+
+function applyChange(items, change) {
+    const index = items.findIndex(item => String(item.id) === change.key);
+    if (change.op === 'delete') {
+        if (index !== -1) items.splice(index, 1);
+    } else if (index !== -1) {
+        items[index] = change.data;
+    } else {
+        items.push(change.data);
+    }
+}
+
+/**
+ * Apply booking changes and re-lay-out only the equipment rows a booking
+ * left or entered (source and target row of a move).
+ */
+function applyBookingChanges(changes) {
+    if (changes.length === 0) return;
+    const touched = new Set();
+    changes.forEach(change => {
+        const previous = state.bookingById.get(change.key);
+        if (previous) touched.add(previous.equipment_id);
+        if (change.data) touched.add(change.data.equipment_id);
+        applyChange(state.bookings, change);
+        if (change.op === 'delete') {
+            state.bookingById.delete(change.key);
+        } else {
+            state.bookingById.set(change.key, change.data);
+        }
+    });
+    updateBookingRows(touched);
+}
+
+// ============================================================================
+// LAYOUT WORKER
+// ============================================================================
+//
+// /api/data bodies are parsed and laid out (calendar-layout.js) in a Web
+// Worker, so loading a large dataset does not block the page. Without
+// worker support the same code runs on the main thread.
+
+const layoutWorker = {
+    url: document.currentScript ? new URL('layout-worker.js', document.currentScript.src).href : null,
+    worker: null,  // false once unavailable
+    requests: new Map(),
+    nextId: 0
+};
+
+function getLayoutWorker() {
+    if (layoutWorker.worker === null) {
+        try {
+            if (!window.Worker || !layoutWorker.url) throw new Error('Web Workers not supported');
+            const worker = new Worker(layoutWorker.url);
+            worker.onmessage = (e) => {
+                const request = layoutWorker.requests.get(e.data.id);
+                layoutWorker.requests.delete(e.data.id);
+                if (e.data.error) request.reject(new Error(e.data.error));
+                else request.resolve(e.data);
+            };
+            worker.onerror = (e) => {
+                console.warn('Layout worker failed:', e.message);
+                layoutWorker.worker = false;
+                layoutWorker.requests.forEach(request => request.reject(new Error(e.message)));
+                layoutWorker.requests.clear();
+            };
+            layoutWorker.worker = worker;
+        } catch (error) {
+            layoutWorker.worker = false;
+        }
+    }
+    return layoutWorker.worker || null;
+}
+
+/**
+ * Parse an /api/data body and lay out its bookings in the worker
+ * (on the main thread when the worker is unavailable or fails).
+ *
+ * @returns {Promise<Object>} { data, layout } as returned by loadCalendarData
+ */
+function layoutInWorker(buffer, year) {
+    const worker = getLayoutWorker();
+    if (!worker) return Promise.resolve(loadCalendarData(buffer, year));
+    
+    const id = ++layoutWorker.nextId;
+    // The body is copied, not transferred, so the fallback can still read it
+    return new Promise((resolve, reject) => {
+        layoutWorker.requests.set(id, { resolve, reject });
+        worker.postMessage({ id, buffer, year });
+    }).catch(error => {
+        console.warn('Layout in worker failed, using main thread:', error);
+        return loadCalendarData(buffer, year);
+    });
+}
+
 // ============================================================================
-// CALENDAR RENDERING
+// CALENDAR RENDERING (virtualized)
 // ============================================================================
+//
+// Only the date headers, day columns, equipment rows and booking bars in or
+// near the viewport exist in the DOM. Scrolling re-renders that window and
+// recycles nodes that left it; bookings are looked up per row from
+// state.bookingIndex instead of filtering all bookings. Overlapping bookings
+// of a row are stacked into lanes, and a booking change re-lays-out only
+// the rows it touches.
 
-function renderCalendar() {
+// Rendered nodes by key (bars per equipment_id, then booking id) and
+// hidden nodes ready for reuse
+const view = {
+    grid: null,
+    headerRow: null,
+    headers: new Map(),
+    columns: new Map(),
+    rows: new Map(),
+    bars: new Map(),
+    pools: { headers: [], columns: [], rows: [], bars: [] },
+    frame: null
+};
+
+/**
+ * Render the calendar from state.
+ *
+ * @param {Object} layout - Layout of state.bookings from the worker
+ *   (optional, computed here when missing)
+ */
+function renderCalendar(layout = null) {
     const year = new Date().getFullYear();
     state.yearDates = getDatesForYear(year);
     
@@ -68,21 +308,35 @@ function renderCalendar() {
     
     if (!grid || !sidebar) return;
     
-    // Calculate row heights
-    state.rowHeights = state.equipment.map(equip => CONFIG.BASE_ROW_HEIGHT);
+    // Row heights follow the number of lanes each row needs
+    indexBookings(layout);
+    state.rowHeights = state.equipment.map(equip => getRowHeight(equip.id));
+    const height = computeRowTops();
+    state.dayInfo = getDayInfo(state.yearDates);
     
     // Render equipment sidebar
     renderEquipmentSidebar(sidebar);
     
-    // Set up grid
-    grid.style.gridTemplateColumns = `repeat(${state.yearDates.length}, ${CONFIG.DAY_WIDTH}px)`;
-    grid.style.gridTemplateRows = `${CONFIG.HEADER_HEIGHT}px ${state.rowHeights.map(h => `${h}px`).join(' ')}`;
-    
-    // Render grid
-    grid.innerHTML = '';
-    renderDateHeaders(grid);
-    renderGridCells(grid);
-    renderBookings(grid);
+    // Full-size grid keeps native scrollbars; content is positioned absolutely
+    grid.style.width = `${state.yearDates.length * CONFIG.DAY_WIDTH}px`;
+    grid.style.height = `${height}px`;
+    resetVirtualGrid(grid);
+    renderViewport();
+}
+
+/**
+ * Recompute state.rowTops from state.rowHeights (tops include the header row).
+ *
+ * @returns {number} Total grid height
+ */
+function computeRowTops() {
+    state.rowTops = [];
+    let top = CONFIG.HEADER_HEIGHT;
+    state.rowHeights.forEach(height => {
+        state.rowTops.push(top);
+        top += height;
+    });
+    return top;
 }
 
 function renderEquipmentSidebar(sidebar) {
@@ -114,112 +368,354 @@ function renderEquipmentSidebar(sidebar) {
     });
 }
 
-function renderDateHeaders(grid) {
-    const today = normalizeDate(new Date());
-    const todayTime = today.getTime();
-    
-    state.yearDates.forEach(date => {
-        const header = document.createElement('div');
-        header.className = 'date-header';
-        
-        const normalized = normalizeDate(date);
-        const dayOfWeek = date.toLocaleDateString('cs-CZ', { weekday: 'short' });
-        
-        if (['so', 'ne'].includes(dayOfWeek)) {
-            header.classList.add('weekend');
-        }
-        
-        if (normalized.getTime() === todayTime) {
-            header.classList.add('today');
+/**
+ * Labels and weekend/today flags of every displayed day, computed once
+ * per calendar instead of once per rendered cell.
+ */
+function getDayInfo(dates) {
+    const todayTime = normalizeDate(new Date()).getTime();
+    // Locale formatting is slow: name each weekday once (getDay() order)
+    const format = new Intl.DateTimeFormat('cs-CZ', { weekday: 'short' });
+    const dayNames = Array.from({ length: 7 }, (_, day) => format.format(new Date(2024, 0, 7 + day)));
+    return dates.map(date => {
+        const dayName = dayNames[date.getDay()];
+        return {
+            label: `${date.getDate()}.${date.getMonth() + 1}.`,
+            dayName,
+            weekend: ['so', 'ne'].includes(dayName),
+            today: normalizeDate(date).getTime() === todayTime
+        };
+    });
+}
+
+function resetVirtualGrid(grid) {
+    grid.innerHTML = '';
+    view.grid = grid;
+    view.headerRow = document.createElement('div');
+    view.headerRow.className = 'date-header-row';
+    view.headerRow.style.height = `${CONFIG.HEADER_HEIGHT}px`;
+    grid.appendChild(view.headerRow);
+    [view.headers, view.columns, view.rows, view.bars].forEach(nodes => nodes.clear());
+    Object.values(view.pools).forEach(pool => { pool.length = 0; });
+}
+
+/**
+ * Build state.bookingIndex: per equipment_id, the row's bookings sorted
+ * by first day with their day indexes and lanes (typed array views of the
+ * layout), so a row finds the bars of a day range by binary search.
+ *
+ * @param {Object} layout - computeLayout() result for state.bookings and
+ *   state.equipment (optional, computed here when missing)
+ */
+function indexBookings(layout = null) {
+    state.bookingById = new Map();
+    state.bookings.forEach(booking => state.bookingById.set(String(booking.id), booking));
+    
+    const equipmentIds = state.equipment.map(equip => equip.id);
+    state.bookingIndex = new Map();
+    applyLayout(layout || computeLayout(state.bookings, equipmentIds, state.yearDates[0].getFullYear()),
+                state.bookings, equipmentIds);
+}
+
+/**
+ * Store the rows of a layout in state.bookingIndex.
+ *
+ * @param {Object} layout - computeLayout() result
+ * @param {Array} bookings - Bookings the layout was computed for
+ * @param {Array} equipmentIds - Equipment id of each layout row
+ */
+function applyLayout(layout, bookings, equipmentIds) {
+    const { order, rowOffsets } = layout;
+    equipmentIds.forEach((equipmentId, row) => {
+        const from = rowOffsets[row];
+        const to = rowOffsets[row + 1];
+        // Own array: state.bookings changes by splicing
+        const rowBookings = new Array(to - from);
+        for (let k = from; k < to; k++) {
+            rowBookings[k - from] = bookings[order[k]];
         }
-        
-        header.innerHTML = `
-            <span class="date-main">${date.getDate()}.${date.getMonth() + 1}.</span>
-            <span class="day-name">${dayOfWeek}</span>
-        `;
-        
-        grid.appendChild(header);
+        state.bookingIndex.set(equipmentId, {
+            bookings: rowBookings,
+            start: layout.start.subarray(from, to),
+            end: layout.end.subarray(from, to),
+            lane: layout.lane.subarray(from, to),
+            lanes: layout.lanes[row],
+            maxLength: layout.maxLength[row]
+        });
     });
 }
 
-function renderGridCells(grid) {
-    const today = normalizeDate(new Date());
-    const todayTime = today.getTime();
-    
-    state.equipment.forEach(() => {
-        state.yearDates.forEach(date => {
-            const cell = document.createElement('div');
-            cell.className = 'grid-cell';
-            
-            const normalized = normalizeDate(date);
-            const dayOfWeek = date.toLocaleDateString('cs-CZ', { weekday: 'short' });
-            
-            if (['so', 'ne'].includes(dayOfWeek)) {
-                cell.classList.add('weekend');
-            }
-            
-            if (normalized.getTime() === todayTime) {
-                cell.classList.add('today');
-            }
-            
-            grid.appendChild(cell);
+function getRowHeight(equipmentId) {
+    const row = state.bookingIndex.get(equipmentId);
+    return Math.max(CONFIG.BASE_ROW_HEIGHT, (row ? row.lanes : 0) * CONFIG.LANE_HEIGHT);
+}
+
+/**
+ * Bookings of one equipment_id overlapping day indexes [first, last].
+ */
+function bookingsInRange(equipmentId, first, last) {
+    const row = state.bookingIndex.get(equipmentId);
+    if (!row) return [];
+    const result = [];
+    // Earlier starts cannot reach `first`
+    for (let k = lowerBound(row.start, first - row.maxLength); k < row.bookings.length; k++) {
+        if (row.start[k] > last) break;
+        if (row.end[k] >= first) {
+            result.push({ booking: row.bookings[k], start: row.start[k], end: row.end[k], lane: row.lane[k] });
+        }
+    }
+    return result;
+}
+
+function lowerBound(sorted, value) {
+    let lo = 0;
+    let hi = sorted.length;
+    while (lo < hi) {
+        const mid = (lo + hi) >> 1;
+        if (sorted[mid] < value) lo = mid + 1;
+        else hi = mid;
+    }
+    return lo;
+}
+
+/**
+ * Day and equipment row ranges in or near the viewport (with overscan).
+ */
+function getVisibleRange(grid) {
+    const viewport = grid.closest('.timeline-viewport');
+    const gridRect = grid.getBoundingClientRect();
+    const viewRect = viewport ? viewport.getBoundingClientRect() : { left: 0, top: 0 };
+    const width = viewport ? viewport.clientWidth : window.innerWidth;
+    const height = viewport ? viewport.clientHeight : window.innerHeight;
+    const left = Math.max(0, viewRect.left - gridRect.left);
+    const top = Math.max(0, viewRect.top - gridRect.top);
+    
+    const lastDay = state.yearDates.length - 1;
+    const lastRow = state.rowTops.length - 1;
+    return {
+        firstColumn: Math.max(0, Math.floor(left / CONFIG.DAY_WIDTH) - CONFIG.OVERSCAN_COLUMNS),
+        lastColumn: Math.min(lastDay, Math.floor((left + width) / CONFIG.DAY_WIDTH) + CONFIG.OVERSCAN_COLUMNS),
+        firstRow: Math.max(0, findRowAt(top) - CONFIG.OVERSCAN_ROWS),
+        lastRow: Math.min(lastRow, findRowAt(top + height) + CONFIG.OVERSCAN_ROWS)
+    };
+}
+
+/**
+ * Index of the equipment row at grid offset y (clamped to existing rows).
+ */
+function findRowAt(y) {
+    return Math.max(0, lowerBound(state.rowTops, y + 1) - 1);
+}
+
+/**
+ * Render the visible window: reuse nodes already showing the same key,
+ * hide nodes that scrolled away and refill them for newly visible keys.
+ */
+function renderViewport() {
+    view.frame = null;
+    const grid = view.grid;
+    if (!grid || state.yearDates.length === 0) return;
+    
+    const range = getVisibleRange(grid);
+    const headers = new Map();
+    const columns = new Map();
+    for (let day = range.firstColumn; day <= range.lastColumn; day++) {
+        headers.set(day, day);
+        columns.set(day, day);
+    }
+    const rows = new Map();
+    const barRows = new Map();
+    for (let index = range.firstRow; index <= range.lastRow && index < state.equipment.length; index++) {
+        rows.set(index, index);
+        const bars = new Map();
+        bookingsInRange(state.equipment[index].id, range.firstColumn, range.lastColumn).forEach(item => {
+            bars.set(String(item.booking.id), { ...item, top: state.rowTops[index] + item.lane * CONFIG.LANE_HEIGHT });
         });
+        barRows.set(state.equipment[index].id, bars);
+    }
+    // A dragged bar must survive scrolling until the drop
+    if (state.draggedBooking) {
+        const equipmentId = state.draggedBooking.equipment_id;
+        const dragged = String(state.draggedBooking.id);
+        const rendered = view.bars.get(equipmentId);
+        if (rendered && rendered.has(dragged)) {
+            if (!barRows.has(equipmentId)) barRows.set(equipmentId, new Map());
+            const bars = barRows.get(equipmentId);
+            if (!bars.has(dragged)) bars.set(dragged, null);  // Already rendered, never refilled
+        }
+    }
+    
+    reconcileNodes(view.headers, view.pools.headers, headers, view.headerRow, fillDateHeader);
+    reconcileNodes(view.columns, view.pools.columns, columns, grid, fillDayColumn);
+    reconcileNodes(view.rows, view.pools.rows, rows, grid, fillEquipmentRow);
+    view.bars.forEach((nodes, equipmentId) => {
+        if (!barRows.has(equipmentId)) releaseRowBars(equipmentId);
+    });
+    barRows.forEach((bars, equipmentId) => {
+        let nodes = view.bars.get(equipmentId);
+        if (!nodes) {
+            nodes = new Map();
+            view.bars.set(equipmentId, nodes);
+        }
+        reconcileNodes(nodes, view.pools.bars, bars, grid, fillBookingBar);
     });
 }
 
+function reconcileNodes(nodes, pool, wanted, parent, fill) {
+    nodes.forEach((el, key) => {
+        if (!wanted.has(key)) {
+            releaseNode(el, pool);
+            nodes.delete(key);
+        }
+    });
+    wanted.forEach((item, key) => {
+        if (nodes.has(key)) return;
+        let el = pool.pop();
+        if (!el) {
+            el = document.createElement('div');
+            parent.appendChild(el);
+        }
+        el.style.display = '';
+        fill(el, item);
+        nodes.set(key, el);
+    });
+}
+
+function releaseNode(el, pool) {
+    el.style.display = 'none';
+    pool.push(el);
+}
+
+/**
+ * Hide and pool all rendered bars of one equipment row.
+ */
+function releaseRowBars(equipmentId) {
+    const nodes = view.bars.get(equipmentId);
+    if (!nodes) return;
+    nodes.forEach(el => releaseNode(el, view.pools.bars));
+    view.bars.delete(equipmentId);
+}
+
+function scheduleViewportRender() {
+    if (view.frame === null) {
+        view.frame = requestAnimationFrame(renderViewport);
+    }
+}
+
+function fillDateHeader(el, day) {
+    const info = state.dayInfo[day];
+    el.className = 'date-header';
+    el.classList.toggle('weekend', info.weekend);
+    el.classList.toggle('today', info.today);
+    el.style.left = `${day * CONFIG.DAY_WIDTH}px`;
+    el.style.width = `${CONFIG.DAY_WIDTH}px`;
+    el.innerHTML = `
+        <span class="date-main">${info.label}</span>
+        <span class="day-name">${info.dayName}</span>
+    `;
+}
+
+function fillDayColumn(el, day) {
+    const info = state.dayInfo[day];
+    el.className = 'grid-column';
+    el.classList.toggle('weekend', info.weekend);
+    el.classList.toggle('today', info.today);
+    el.style.left = `${day * CONFIG.DAY_WIDTH}px`;
+    el.style.width = `${CONFIG.DAY_WIDTH}px`;
+    el.style.top = `${CONFIG.HEADER_HEIGHT}px`;
+    el.style.bottom = '0';
+}
+
+function fillEquipmentRow(el, index) {
+    el.className = 'grid-row';
+    el.style.top = `${state.rowTops[index]}px`;
+    el.style.height = `${state.rowHeights[index]}px`;
+}
+
+/**
+ * Re-render all booking bars after booking changes (days and equipment stay).
+ */
 function renderBookings(grid) {
-    // Remove existing bookings
-    grid.querySelectorAll('.booking-bar').forEach(el => el.remove());
+    if (view.grid !== grid || state.yearDates.length === 0) return renderCalendar();
     
-    if (state.yearDates.length === 0) return;
-    
-    const firstDate = state.yearDates[0];
-    let cumulativeTop = CONFIG.HEADER_HEIGHT;
-    
-    state.equipment.forEach((equip, equipIndex) => {
-        const equipBookings = state.bookings.filter(b => b.equipment_id === equip.id);
-        
-        equipBookings.forEach(booking => {
-            const bookingEl = createBookingElement(booking, firstDate, cumulativeTop);
-            if (bookingEl) {
-                grid.appendChild(bookingEl);
-            }
-        });
-        
-        cumulativeTop += state.rowHeights[equipIndex];
-    });
+    indexBookings();
+    refreshRows(new Set(state.equipment.map(equip => equip.id)));
 }
 
-function createBookingElement(booking, firstDate, equipmentTop) {
-    const bookingStart = normalizeDate(new Date(booking.start_date));
-    const bookingEnd = normalizeDate(new Date(booking.end_date));
+/**
+ * Re-index and re-stack only the given equipment rows from state.bookings;
+ * bars of other rows stay in the DOM as they are.
+ */
+function updateBookingRows(equipmentIds) {
+    if (!view.grid || state.yearDates.length === 0) return renderCalendar();
     
-    const startIndex = diffInDays(firstDate, bookingStart);
-    const durationDays = diffInDays(bookingStart, bookingEnd) + 1;
+    const rowIds = [...equipmentIds];
+    const bookings = state.bookings.filter(booking => equipmentIds.has(booking.equipment_id));
+    applyLayout(computeLayout(bookings, rowIds, state.yearDates[0].getFullYear()), bookings, rowIds);
+    refreshRows(equipmentIds);
+}
+
+/**
+ * Refill the bars of re-laid-out rows. A row whose lane count changed its
+ * height moves every row below it, so then all rows and bars are refilled.
+ */
+function refreshRows(equipmentIds) {
+    let resized = false;
+    state.equipment.forEach((equip, index) => {
+        if (!equipmentIds.has(equip.id)) return;
+        const height = getRowHeight(equip.id);
+        if (height !== state.rowHeights[index]) {
+            state.rowHeights[index] = height;
+            resized = true;
+        }
+    });
     
-    if (startIndex < -durationDays || startIndex >= state.yearDates.length) {
-        return null;
+    if (resized) {
+        view.grid.style.height = `${computeRowTops()}px`;
+        const sidebar = document.getElementById('equipment-sidebar');
+        if (sidebar) renderEquipmentSidebar(sidebar);
+        view.rows.forEach(el => releaseNode(el, view.pools.rows));
+        view.rows.clear();
+        [...view.bars.keys()].forEach(releaseRowBars);
+    } else {
+        equipmentIds.forEach(releaseRowBars);
     }
-    
-    const bookingBar = document.createElement('div');
-    bookingBar.className = 'booking-bar';
-    bookingBar.draggable = true;
-    bookingBar.dataset.bookingId = booking.id;
-    bookingBar.title = booking.description;
+    renderViewport();
+}
+
+function fillBookingBar(el, item) {
+    el.className = 'booking-bar';
+    el.draggable = true;
+    const { booking, start, end, top } = item;
+    el.dataset.bookingId = booking.id;
+    el.title = booking.description;
     
     // Position and size
-    bookingBar.style.left = `${startIndex * CONFIG.DAY_WIDTH}px`;
-    bookingBar.style.width = `${durationDays * CONFIG.DAY_WIDTH}px`;
-    bookingBar.style.top = `${equipmentTop + CONFIG.LANE_HEIGHT * 0.1}px`;
-    bookingBar.style.height = `${CONFIG.LANE_HEIGHT * 0.8}px`;
+    el.style.left = `${start * CONFIG.DAY_WIDTH}px`;
+    el.style.width = `${(end - start + 1) * CONFIG.DAY_WIDTH}px`;
+    el.style.top = `${top + CONFIG.LANE_HEIGHT * 0.1}px`;
+    el.style.height = `${CONFIG.LANE_HEIGHT * 0.8}px`;
+    el.style.opacity = '';
     
     // Background color
-    bookingBar.style.backgroundColor = booking.project_color || '#4a90e2';
+    el.style.backgroundColor = booking.project_color || '#4a90e2';
     
     // Content
     const mainLine = document.createElement('div');
     mainLine.className = 'booking-main';
+    mainLine.textContent = getBookingMainText(booking);
     
+    if (booking.note) {
+        const noteLine = document.createElement('div');
+        noteLine.className = 'booking-note';
+        noteLine.textContent = booking.note;
+        el.replaceChildren(mainLine, noteLine);
+    } else {
+        el.replaceChildren(mainLine);
+    }
+}
+
+function getBookingMainText(booking) {
     let mainText = '';
     if (booking.tma_number) {
         mainText = `EU-SVA-${booking.tma_number}-${new Date(booking.start_date).getFullYear().toString().slice(-2)}`;
@@ -230,29 +726,21 @@ function createBookingElement(booking, firstDate, equipmentTop) {
     if (!mainText) {
         mainText = booking.description || 'Rezervace';
     }
-    
-    mainLine.textContent = mainText;
-    bookingBar.appendChild(mainLine);
-    
-    if (booking.note) {
-        const noteLine = document.createElement('div');
-        noteLine.className = 'booking-note';
-        noteLine.textContent = booking.note;
-        bookingBar.appendChild(noteLine);
-    }
-    
-    // Setup drag & drop
-    setupBookingDragDrop(bookingBar, booking);
-    
-    return bookingBar;
+    return mainText;
 }
 
 // ============================================================================
 // NATIVE HTML5 DRAG & DROP
 // ============================================================================
 
-function setupBookingDragDrop(element, booking) {
-    element.addEventListener('dragstart', (e) => {
+// Bars are recycled while scrolling, so their events are delegated to the grid
+function setupBookingDragDrop(grid) {
+    const barOf = (e) => e.target.closest && e.target.closest('.booking-bar');
+    
+    grid.addEventListener('dragstart', (e) => {
+        const element = barOf(e);
+        const booking = element && state.bookingById.get(element.dataset.bookingId);
+        if (!booking) return;
         state.draggedBooking = booking;
         element.style.opacity = '0.5';
         
@@ -264,13 +752,18 @@ function setupBookingDragDrop(element, booking) {
         e.dataTransfer.setData('text/plain', booking.id);
     });
     
-    element.addEventListener('dragend', (e) => {
-        element.style.opacity = '1';
+    grid.addEventListener('dragend', (e) => {
+        const element = barOf(e);
+        if (element) element.style.opacity = '1';
         state.draggedBooking = null;
         state.dragStartDay = null;
+        scheduleViewportRender();
     });
     
-    element.addEventListener('dblclick', () => {
+    grid.addEventListener('dblclick', (e) => {
+        const element = barOf(e);
+        const booking = element && state.bookingById.get(element.dataset.bookingId);
+        if (!booking) return;
         console.log('Double click - open modal for editing:', booking);
         // TODO: Open modal for editing
     });
@@ -281,6 +774,8 @@ function setupGridDropZones() {
     const grid = document.getElementById('timeline-grid');
     if (!grid) return;
     
+    setupBookingDragDrop(grid);
+    
     grid.addEventListener('dragover', (e) => {
         e.preventDefault();
         e.dataTransfer.dropEffect = 'move';
@@ -322,21 +817,19 @@ function setupGridDropZones() {
         };
         
         console.log('Updating booking:', updatedBooking);
+        // Show the move right away (source and target rows only); the
+        // server change confirms it, a failed update reloads the data.
+        // The server lane no longer applies, the target row is re-stacked
+        const moved = { ...updatedBooking, lane: null };
+        applyBookingChanges([{ op: 'update', key: String(moved.id), data: moved }]);
         await updateBookingInDB(updatedBooking);
     });
 }
 
 function findEquipmentIndex(y) {
-    let cumulativeHeight = CONFIG.HEADER_HEIGHT;
-    
-    for (let i = 0; i < state.rowHeights.length; i++) {
-        if (y >= cumulativeHeight && y < cumulativeHeight + state.rowHeights[i]) {
-            return i;
-        }
-        cumulativeHeight += state.rowHeights[i];
-    }
-    
-    return -1;
+    if (y < CONFIG.HEADER_HEIGHT || state.rowTops.length === 0) return -1;
+    const index = findRowAt(y);
+    return y < state.rowTops[index] + state.rowHeights[index] ? index : -1;
 }
 
 // ============================================================================
@@ -356,13 +849,14 @@ async function updateBookingInDB(booking) {
             throw new Error(error.error || 'Update failed');
         }
         
-        // Reload data and re-render
-        await loadData();
+        // Apply only what changed since our version
+        await syncChanges();
         
     } catch (error) {
         console.error('Failed to update booking:', error);
         alert(`Chyba při aktualizaci: ${error.message}`);
-        // Reload to reset state
+        // Reload to reset state (also undoes the optimistic move)
+        state.dataEtag = null;
         await loadData();
     }
 }
@@ -385,6 +879,10 @@ function getDatesForYear(year) {
     return dates;
 }
 
+function getCalendarRange(year) {
+    return { from: `${year}-01-01`, to: `${year}-12-31` };
+}
+
 function normalizeDate(date) {
     return new Date(date.getFullYear(), date.getMonth(), date.getDate());
 }
@@ -411,15 +909,28 @@ document.addEventListener('DOMContentLoaded', () => {
     console.log('Booking Planner v3.0 - Initializing...');
     
     setupGridDropZones();
-    loadData();
+    setupViewportScrolling();
     
     // Setup navigation buttons (if they exist)
     const todayBtn = document.getElementById('today-btn');
     if (todayBtn) {
         todayBtn.addEventListener('click', scrollToToday);
     }
+    
+    // static/benchmark.html renders synthetic data instead
+    if (window.BOOKING_PLANNER_BENCHMARK) return;
+    loadData();
+    connectChangeStream();
 });
 
+function setupViewportScrolling() {
+    const viewport = document.querySelector('.timeline-viewport');
+    if (viewport) {
+        viewport.addEventListener('scroll', scheduleViewportRender, { passive: true });
+    }
+    window.addEventListener('resize', scheduleViewportRender);
+}
+
 function scrollToToday() {
     const today = normalizeDate(new Date());
     const todayTime = today.getTime();
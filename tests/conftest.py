@@ -0,0 +1,13 @@
+"""
+Shared test setup: the app runs on a temporary database.
+
+config.py reads BOOKING_PLANNER_DB at import time, so the variable is set
+here, before any test module imports the app.
+"""
+
+import os
+import sys
+import tempfile
+
+os.environ['BOOKING_PLANNER_DB'] = os.path.join(tempfile.mkdtemp(), 'test.db')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
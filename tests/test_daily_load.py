@@ -0,0 +1,33 @@
+"""
+equipment_daily_load rebuild next to a live server.
+"""
+
+import sqlite3
+import threading
+import app_main  # noqa: F401  (creates the tables)
+import db
+from config import DB_PATH
+
+
+def test_rebuild_keeps_booking_committed_during_aggregation(monkeypatch):
+    aggregate = db._expected_daily_load
+    writer = threading.Thread(target=db.create_booking, args=({
+        'description': 'Concurrent', 'equipment_id': 'EKV-2000',
+        'start_date': '2031-05-04', 'end_date': '2031-05-06', 'is_blocker': False
+    },))
+
+    def aggregate_while_writing(cursor):
+        expected = aggregate(cursor)
+        writer.start()
+        writer.join(timeout=0.3)  # Blocked by the rebuild's write lock
+        return expected
+
+    monkeypatch.setattr(db, '_expected_daily_load', aggregate_while_writing)
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        db.rebuild_daily_load(conn)
+        writer.join()
+        monkeypatch.undo()
+        assert db.find_daily_load_mismatches(conn) == []
+    finally:
+        conn.close()
@@ -0,0 +1,26 @@
+"""
+populate_test_data.py must be visible to running servers: new /api/data
+version (ETag) and the rows in /api/changes.
+"""
+
+from app_main import app
+from populate_test_data import populate_sample_data
+
+
+def test_populate_sample_data_publishes_new_data_version():
+    client = app.test_client()
+    before = client.get('/api/data')
+    version = before.get_json()['version']
+
+    populate_sample_data()
+
+    after = client.get('/api/data', headers={'If-None-Match': before.headers['ETag']})
+    assert after.status_code == 200
+    assert after.headers['ETag'] != before.headers['ETag']
+    names = {item['name'] for item in after.get_json()['equipment']}
+    assert {'EKV-2000', 'EKV-3000', 'VTS-100', 'VTS-200'} <= names
+
+    changes = client.get(f'/api/changes?since={version}').get_json()
+    changed = {(change['entity'], change['key']) for change in changes['changes']}
+    assert ('equipment', 'VTS-200') in changed
+    assert ('project', 'Test XYZ') in changed
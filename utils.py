@@ -3,14 +3,22 @@ Utility functions for booking validation and collision detection.
 
 Functions:
 - validate_booking_data: Validates booking data before saving
-- check_collision: Checks if booking conflicts with existing bookings
+- parse_date_window: Parses from/to query parameters of list endpoints
+- find_collision_days_db: Lists days on which a booking would exceed capacity (equipment_daily_load)
+- BatchCollisionChecker: Checks a batch of new bookings against the DB and each other
 - get_effective_capacity: Gets equipment capacity with temporary overrides
+- get_effective_capacity_range: Per-day capacity for a date range from the reference cache
+- get_effective_capacity_segments: Same capacity as constant-capacity segments
+- reference_capacity_segments: Same from a given reference data snapshot
+- find_available_windows: Earliest free windows of N days across equipment
 """
 
 import datetime
 import sqlite3
 from typing import Dict, List, Any, Tuple, Optional
-from config import MAX_DESCRIPTION_LENGTH, DB_PATH
+from config import MAX_DESCRIPTION_LENGTH
+from db import get_db_connection, get_reference_data, lab_index, ReferenceData
+from occupancy import base_name_of, find_free_windows, parse_interval
 
 def validate_booking_data(booking_data: Dict[str, Any]) -> Tuple[bool, str]:
     """
@@ -40,6 +48,136 @@ def validate_booking_data(booking_data: Dict[str, Any]) -> Tuple[bool, str]:
     return True, ""
 
 
+def parse_date_window(date_from: Optional[str], date_to: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Parse optional 'from'/'to' query parameters of list endpoints.
+    
+    Args:
+        date_from: First day of the window (YYYY-MM-DD) or None
+        date_to: Last day of the window (YYYY-MM-DD) or None
+        
+    Returns:
+        Tuple of normalized ISO dates (None where the bound is open)
+        
+    Raises:
+        ValueError: With user-facing message if a date is invalid
+    """
+    bounds = []
+    for value in (date_from, date_to):
+        if not value:
+            bounds.append(None)
+            continue
+        try:
+            bounds.append(datetime.date.fromisoformat(value))
+        except ValueError:
+            raise ValueError(f"Neplatný formát data: {value}")
+    
+    if bounds[0] and bounds[1] and bounds[1] < bounds[0]:
+        raise ValueError("Datum 'to' nemůže být před datem 'from'")
+    
+    return tuple(bound.isoformat() if bound else None for bound in bounds)
+
+
+def reference_capacity_segments(reference: ReferenceData, equipment_name: str,
+                                first: int, last: int) -> Optional[List[Tuple[int, int, int]]]:
+    """
+    Constant-capacity segments of one equipment over an ordinal range.
+    
+    Args:
+        reference: Reference data snapshot (equipment and capacity overrides)
+        equipment_name: Name of the equipment
+        first: First day (date ordinal)
+        last: Last day (date ordinal)
+        
+    Returns:
+        List of (first_ordinal, last_ordinal, max_tests), or None if equipment not found
+    """
+    equipment = reference.equipment.get(equipment_name)
+    if equipment is None or equipment['max_tests'] is None:
+        return None  # Equipment not found
+    
+    # Overrides in ascending id order, clipped to the range
+    overrides = []
+    for override_start, override_end, max_tests in reference.overrides.get(equipment_name, ()):
+        try:
+            override_first = datetime.date.fromisoformat(override_start).toordinal()
+            override_last = datetime.date.fromisoformat(override_end).toordinal()
+        except (TypeError, ValueError):
+            continue
+        if override_first <= last and override_last >= first:
+            overrides.append((max(override_first, first), min(override_last, last), max_tests))
+    
+    points = {first}
+    for override_first, override_last, _ in overrides:
+        points.add(override_first)
+        if override_last < last:
+            points.add(override_last + 1)
+    points = sorted(points)
+    
+    segments: List[Tuple[int, int, int]] = []
+    for index, point in enumerate(points):
+        segment_last = points[index + 1] - 1 if index + 1 < len(points) else last
+        capacity = equipment['max_tests']
+        for override_first, override_last, max_tests in overrides:
+            if override_first <= point <= override_last:
+                capacity = max_tests  # Latest override wins
+        if segments and segments[-1][2] == capacity:
+            segments[-1] = (segments[-1][0], segment_last, capacity)
+        else:
+            segments.append((point, segment_last, capacity))
+    return segments
+
+
+def get_effective_capacity_segments(equipment_name: str, start_date: datetime.date,
+                                    end_date: datetime.date) -> Optional[List[Tuple[int, int, int]]]:
+    """
+    Get effective equipment capacity over a date range as constant segments.
+    
+    Base capacity and overrides come from the reference cache (db.py).
+    When several overrides cover the same day the latest one (highest id)
+    wins, same as get_effective_capacity.
+    
+    Args:
+        equipment_name: Name of the equipment
+        start_date: First day of the range
+        end_date: Last day of the range
+        
+    Returns:
+        List of (first_ordinal, last_ordinal, max_tests) covering the range,
+        or None if equipment not found
+    """
+    if end_date < start_date:
+        return []
+    try:
+        reference = get_reference_data()
+    except sqlite3.Error:
+        return None
+    return reference_capacity_segments(reference, equipment_name, start_date.toordinal(), end_date.toordinal())
+
+
+def get_effective_capacity_range(equipment_name: str, start_date: datetime.date,
+                                 end_date: datetime.date) -> Optional[List[int]]:
+    """
+    Get effective equipment capacity for every day of an inclusive date range.
+    
+    Args:
+        equipment_name: Name of the equipment
+        start_date: First day of the range
+        end_date: Last day of the range
+        
+    Returns:
+        List[int]: Capacity per day (index 0 = start_date),
+        or None if equipment not found
+    """
+    segments = get_effective_capacity_segments(equipment_name, start_date, end_date)
+    if segments is None:
+        return None
+    capacities: List[int] = []
+    for first, last, max_tests in segments:
+        capacities.extend([max_tests] * (last - first + 1))
+    return capacities
+
+
 def get_effective_capacity(equipment_name: str, check_date: datetime.date) -> Optional[int]:
     """
     Get effective equipment capacity for a specific date.
@@ -52,102 +190,239 @@ def get_effective_capacity(equipment_name: str, check_date: datetime.date) -> Op
     Returns:
         int: Effective max_tests capacity, or None if equipment not found
     """
-    try:
-        conn = sqlite3.connect(DB_PATH)
-        c = conn.cursor()
-        
-        # Check for capacity override for this date
-        c.execute('''
-            SELECT max_tests 
-            FROM equipment_capacity_overrides
-            WHERE equipment_name = ? 
-            AND ? BETWEEN start_date AND end_date
-            ORDER BY id DESC
-            LIMIT 1
-        ''', (equipment_name, check_date.isoformat()))
-        
-        override = c.fetchone()
-        if override:
-            conn.close()
-            return override[0]
-        
-        # No override, get base capacity
-        c.execute('SELECT max_tests FROM equipment WHERE name = ?', (equipment_name,))
-        result = c.fetchone()
-        conn.close()
-        
-        return result[0] if result else None
-        
-    except sqlite3.Error:
-        return None
+    capacities = get_effective_capacity_range(equipment_name, check_date, check_date)
+    return capacities[0] if capacities else None
 
 
-def check_collision(new_booking: Dict[str, Any], all_bookings: List[Dict[str, Any]], 
-                   all_equipment: List[Dict[str, Any]]) -> bool:
+def find_collision_days_db(new_booking: Dict[str, Any]) -> List[datetime.date]:
     """
-    Check if new booking collides with existing bookings.
-    Now supports dynamic capacity overrides - checks each day individually.
+    Find days on which a booking would exceed capacity, using stored daily load.
     
-    Collision occurs when:
-    - Bookings overlap in time
-    - Equipment capacity is exceeded (considering temporary overrides)
-    - Blocker reservations don't count towards capacity
+    Existing occupancy comes from one indexed range query on
+    equipment_daily_load instead of the full booking list.
+    
+    Rules:
+    - Blocker reservations don't count towards capacity and never collide
+    - When updating (booking has 'id'), the stored booking's own
+      contribution is subtracted first
+    - Capacity is resolved per day, including temporary overrides
     
     Args:
-        new_booking: New booking to check
-        all_bookings: List of all existing bookings
-        all_equipment: List of all equipment with capacities
+        new_booking: Booking to check
         
     Returns:
-        True if collision detected, False otherwise
+        List of dates where capacity would be exceeded (empty if none)
+        
+    Raises:
+        ValueError: If equipment is unknown or booking dates are invalid
     """
     try:
         equipment_id = new_booking['equipment_id']
-        base_equipment_name = equipment_id.split(' - ')[0].strip()
-        equipment_details = next((e for e in all_equipment if e['name'] == base_equipment_name), None)
-        if not equipment_details:
-            return True
-        
+        base_equipment_name = base_name_of(equipment_id)
         new_start = datetime.date.fromisoformat(new_booking['start_date'])
         new_end = datetime.date.fromisoformat(new_booking['end_date'])
-    except (IndexError, KeyError, AttributeError, ValueError):
-        return True
+    except (IndexError, KeyError, AttributeError, TypeError) as e:
+        raise ValueError(f"Invalid booking data: {e}") from e
+    
+    capacities = get_effective_capacity_range(base_equipment_name, new_start, new_end)
+    if capacities is None:
+        raise ValueError(f"Unknown equipment: {base_equipment_name}")
     
     # If new booking is blocker, it doesn't consume capacity
-    is_new_blocker = new_booking.get('is_blocker', False)
-    
-    # Check each day in the booking period
-    current_date = new_start
-    while current_date <= new_end:
-        # Get effective capacity for this specific date
-        max_tests = get_effective_capacity(base_equipment_name, current_date)
-        if max_tests is None:
-            return True  # Equipment not found
-        
-        # Count overlapping bookings on this date
-        overlapping_count = 0
-        for booking in all_bookings:
-            # Skip self when updating
-            if 'id' in new_booking and new_booking['id'] == booking['id']:
+    if new_booking.get('is_blocker', False):
+        return []
+    
+    days = len(capacities)
+    loads = [0] * days
+    with get_db_connection() as conn:
+        c = conn.cursor()
+        c.execute('''
+            SELECT day, load FROM equipment_daily_load
+            WHERE equipment_id = ? AND day BETWEEN ? AND ? AND load > 0
+        ''', (equipment_id, new_start.isoformat(), new_end.isoformat()))
+        for day, load in c.fetchall():
+            loads[(datetime.date.fromisoformat(day) - new_start).days] = load
+        
+        # Skip self when updating
+        if 'id' in new_booking:
+            c.execute('''
+                SELECT start_date, end_date FROM bookings
+                WHERE id = ? AND equipment_id = ? AND NOT COALESCE(is_blocker, 0)
+            ''', (new_booking['id'], equipment_id))
+            own = c.fetchone()
+            if own:
+                interval = parse_interval({'start_date': own[0], 'end_date': own[1]})
+                if interval:
+                    first = interval[0] - new_start.toordinal()
+                    last = interval[1] - new_start.toordinal()
+                    for offset in range(max(first, 0), min(last, days - 1) + 1):
+                        loads[offset] -= 1
+    
+    return [new_start + datetime.timedelta(days=offset)
+            for offset, (load, max_tests) in enumerate(zip(loads, capacities))
+            if load >= max_tests]
+
+
+class BatchCollisionChecker:
+    """
+    Capacity checks for a batch of new bookings in one pass.
+    
+    Stored daily load and effective capacity are loaded once per
+    equipment_id for the window the whole batch covers. Bookings accepted
+    with add() count towards the load seen by later checks, so the batch is
+    checked against the database and against itself. Same rules as
+    find_collision_days_db.
+    """
+    
+    def __init__(self, bookings: List[Dict[str, Any]]):
+        """
+        Args:
+            bookings: The batch; items with invalid data are ignored here
+                and rejected by check()
+        """
+        windows: Dict[str, List[datetime.date]] = {}
+        for booking in bookings:
+            try:
+                equipment_id, start, end = self._parse(booking)
+            except ValueError:
                 continue
+            window = windows.setdefault(equipment_id, [start, end])
+            window[0] = min(window[0], start)
+            window[1] = max(window[1], end)
+        
+        self._starts: Dict[str, datetime.date] = {}
+        self._loads: Dict[str, List[int]] = {}
+        self._capacities: Dict[str, Optional[List[int]]] = {}
+        with get_db_connection() as conn:
+            c = conn.cursor()
+            for equipment_id, (start, end) in windows.items():
+                base_equipment_name = base_name_of(equipment_id)
+                self._capacities[equipment_id] = get_effective_capacity_range(base_equipment_name, start, end)
+                loads = [0] * ((end - start).days + 1)
+                c.execute('''
+                    SELECT day, load FROM equipment_daily_load
+                    WHERE equipment_id = ? AND day BETWEEN ? AND ? AND load > 0
+                ''', (equipment_id, start.isoformat(), end.isoformat()))
+                for day, load in c.fetchall():
+                    loads[(datetime.date.fromisoformat(day) - start).days] = load
+                self._starts[equipment_id] = start
+                self._loads[equipment_id] = loads
+    
+    @staticmethod
+    def _parse(booking: Dict[str, Any]) -> Tuple[str, datetime.date, datetime.date]:
+        """Extract equipment_id and dates, raising ValueError if invalid."""
+        try:
+            equipment_id = booking['equipment_id']
+            start = datetime.date.fromisoformat(booking['start_date'])
+            end = datetime.date.fromisoformat(booking['end_date'])
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"Invalid booking data: {e}") from e
+        if not isinstance(equipment_id, str):
+            raise ValueError("Invalid booking data: equipment_id")
+        return equipment_id, start, end
+    
+    def _offsets(self, booking: Dict[str, Any]) -> Tuple[str, range]:
+        """Day offsets of a booking within its equipment's preloaded window."""
+        equipment_id, start, end = self._parse(booking)
+        window_start = self._starts.get(equipment_id)
+        if window_start is None:
+            raise ValueError(f"Booking outside of the batch: {equipment_id}")
+        return equipment_id, range((start - window_start).days, (end - window_start).days + 1)
+    
+    def check(self, booking: Dict[str, Any]) -> List[datetime.date]:
+        """
+        Find days on which a booking would exceed capacity.
+        
+        Args:
+            booking: Booking from the batch passed to the constructor
             
-            if booking['equipment_id'] == equipment_id:
-                try:
-                    existing_start = datetime.date.fromisoformat(booking['start_date'])
-                    existing_end = datetime.date.fromisoformat(booking['end_date'])
-                    
-                    # Check if this booking overlaps current_date
-                    if existing_start <= current_date <= existing_end:
-                        # Blockers don't count towards capacity
-                        if not booking.get('is_blocker', False):
-                            overlapping_count += 1
-                except ValueError:
-                    continue
+        Returns:
+            List of dates where capacity would be exceeded (empty if none)
+            
+        Raises:
+            ValueError: If equipment is unknown or booking data is invalid
+        """
+        equipment_id, offsets = self._offsets(booking)
+        capacities = self._capacities[equipment_id]
+        if capacities is None:
+            raise ValueError(f"Unknown equipment: {base_name_of(equipment_id)}")
+        
+        # If new booking is blocker, it doesn't consume capacity
+        if booking.get('is_blocker', False):
+            return []
+        
+        loads = self._loads[equipment_id]
+        window_start = self._starts[equipment_id]
+        return [window_start + datetime.timedelta(days=offset)
+                for offset in offsets if loads[offset] >= capacities[offset]]
+    
+    def add(self, booking: Dict[str, Any]) -> None:
+        """
+        Count an accepted booking towards the load of later checks.
         
-        # Check if capacity would be exceeded on this date
-        if not is_new_blocker and overlapping_count >= max_tests:
-            return True  # Collision detected
+        Args:
+            booking: Booking that passed check()
+        """
+        if booking.get('is_blocker', False):
+            return
+        equipment_id, offsets = self._offsets(booking)
+        loads = self._loads[equipment_id]
+        for offset in offsets:
+            loads[offset] += 1
+
+
+def find_available_windows(days: int, after: datetime.date, until: datetime.date,
+                           count: int, category: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Find the earliest windows where a new booking of `days` days fits.
+    
+    Uses the same rules as the collision check (capacity with overrides,
+    blockers don't consume capacity), so a booking created in a returned
+    window does not get 409. Each active equipment is swept over
+    constant-load and constant-capacity segments from the shared LabIndex,
+    so the cost depends on the number of bookings, not on days.
+    
+    The horizon is searched from a short span, doubled until `count`
+    windows are found: a shorter span finds exactly the windows that fit
+    inside it, which are earlier than any window found later.
+    
+    Args:
+        days: Booking length in days
+        after: First day a window may start
+        until: Last day a window may end (search horizon)
+        count: Maximum number of windows to return
+        category: Only equipment of this category (all if None)
         
-        current_date += datetime.timedelta(days=1)
+    Returns:
+        Windows sorted by start date: equipment_id, category, start_date,
+        end_date and free_until (last day of the free run within the span)
+    """
+    first = after.toordinal()
+    last = until.toordinal()
+    reference = get_reference_data()
+    with lab_index() as index:
+        candidates = [equipment for equipment in index.equipment.values()
+                      if (category is None or equipment['category'] == category)
+                      and (equipment.get('status') or 'active') == 'active']
+        span_last = min(first + max(4 * days, 90) - 1, last)
+        while True:
+            windows = []
+            for equipment in candidates:
+                capacity_segments = reference_capacity_segments(reference, equipment['name'], first, span_last)
+                if not capacity_segments:
+                    continue
+                load_segments = index.occupancy(equipment['name']).load_segments(first, span_last)
+                for start, run_last in find_free_windows(load_segments, capacity_segments, days, count):
+                    windows.append((start, equipment, run_last))
+            if len(windows) >= count or span_last >= last:
+                break
+            span_last = min(first + 2 * (span_last - first + 1) - 1, last)
     
-    return False  # No collision
+    windows.sort(key=lambda window: (window[0], window[1]['name']))
+    return [{
+        'equipment_id': equipment['name'],
+        'category': equipment['category'],
+        'start_date': datetime.date.fromordinal(start).isoformat(),
+        'end_date': datetime.date.fromordinal(start + days - 1).isoformat(),
+        'free_until': datetime.date.fromordinal(run_last).isoformat()
+    } for start, equipment, run_last in windows[:count]]
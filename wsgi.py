@@ -0,0 +1,45 @@
+"""
+Production entry point for Booking Planner.
+
+Serves the same Flask `app` as app_main.py, but under a multi-threaded
+WSGI server instead of the Werkzeug development server.
+
+Usage:
+    python wsgi.py                          # waitress, SERVER_THREADS threads (Windows/Linux)
+    gunicorn -c gunicorn.conf.py wsgi:app   # SERVER_WORKERS processes x SERVER_THREADS (Linux/macOS)
+
+Host and port come from config (BOOKING_PLANNER_HOST/PORT). Every process
+opens its own SQLite connections and /api/stream follows the change log in
+the database, so live updates reach clients of all workers.
+"""
+
+import logging
+import sys
+from app_main import app
+from config import APP_HOST, APP_PORT, SERVER_THREADS, SERVER_CONNECTION_LIMIT
+
+logger = logging.getLogger(__name__)
+
+
+def main() -> int:
+    """
+    Serve the app with waitress.
+    
+    Returns:
+        int: Process exit code (1 if waitress is not installed)
+    """
+    try:
+        from waitress import serve
+    except ImportError:
+        print('Chybí balíček waitress: pip install waitress '
+              '(nebo na Linuxu: gunicorn -c gunicorn.conf.py wsgi:app)', file=sys.stderr)
+        return 1
+    
+    logger.info(f"Serving on {APP_HOST}:{APP_PORT} with {SERVER_THREADS} threads")
+    serve(app, host=APP_HOST, port=APP_PORT, threads=SERVER_THREADS,
+          connection_limit=SERVER_CONNECTION_LIMIT, ident='booking-planner')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())